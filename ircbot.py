@@ -3,75 +3,900 @@
 IRC Bot for #gentoo-weed on irc.libera.chat
 """
 
+import re
+import selectors
 import socket
+import struct
+import sys
 import time
 import threading
-import json
+import queue
 import os
+import signal
 import logging
+from logging.handlers import RotatingFileHandler
 import pickle
+import random
 from datetime import datetime
-import pytz
+from typing import Optional
+from zoneinfo import ZoneInfo
+import base64
+import bisect
+import contextlib
+import functools
+import mmap
+from collections import defaultdict, deque
+import msgspec
 try:
-    from zoneinfo import ZoneInfo
+    import ahocorasick
 except ImportError:
-    # For Python < 3.9, use pytz as fallback
-    ZoneInfo = None
-import base64
-from collections import defaultdict
-from midi_player import MidiManager
+    # Partial location matches fall back to word n-gram lookups
+    ahocorasick = None
+from midi_player import MidiComposition, MidiManager
+
+LEGACY_TOKE_FILE = 'toke_data.pkl'
+TOKE_FLUSH_INTERVAL = 5  # Seconds between writes of pending toke data
+TOKE_JOURNAL_FILE = 'toke_data.journal'
+TOKE_JOURNAL_LIMIT = 1 << 20  # Journal bytes before it is folded into a new snapshot
+JOURNAL_LENGTH = struct.Struct('<I')  # Length prefix of each journal record
+TIME_TARGET = datetime(2025, 12, 4, 0, 0, 0)  # !time countdown target (local time)
+TIME_TARGET_TS = int(TIME_TARGET.timestamp())
+# The same date as midnight Eastern, for !z6
+TIME_TARGET_ET_TS = datetime(2025, 12, 4, 0, 0, 0, tzinfo=ZoneInfo('America/New_York')).timestamp()
+DAY_SECONDS = 24 * 3600
+WEEK_SECONDS = 7 * DAY_SECONDS
+YEAR_SECONDS = int(365.25 * DAY_SECONDS)
+MONTH_SECONDS = int(30.44 * DAY_SECONDS)  # Approximate month (30.44 days)
+# ((singular, plural), seconds) pairs for the !time breakdown, largest first
+COUNTDOWN_UNITS = (
+    (("month", "months"), MONTH_SECONDS),
+    (("week", "weeks"), WEEK_SECONDS),
+    (("day", "days"), DAY_SECONDS),
+    (("hour", "hours"), 3600),
+    (("minute", "minutes"), 60),
+    (("second", "seconds"), 1),
+)
+# ((singular, plural), seconds, emoji, overall rating) for the abstinence
+# breakdown, largest first
+ABSTINENCE_UNITS = (
+    (("decade", "decades"), 10 * YEAR_SECONDS, "👑🏆", "👑 LEGENDARY ABSTINENCE DEITY"),
+    (("year", "years"), YEAR_SECONDS, "🏆", "🏆 EPIC ABSTINENCE MASTER"),
+    (("month", "months"), MONTH_SECONDS, "🥇", "🥇 MASTER ABSTAINER"),
+    (("week", "weeks"), WEEK_SECONDS, "🥈", "🥈 EXPERT RESTRAINT"),
+    (("day", "days"), DAY_SECONDS, "🥉", "🥉 SKILLED PATIENCE"),
+    (("hour", "hours"), 3600, "⭐", "⭐ DECENT CONTROL"),
+    (("minute", "minutes"), 60, "💫", "💫 BASIC WILLPOWER"),
+    (("second", "seconds"), 1, "🔹", "🔹 ROOKIE STATUS"),
+)
+# Precision ranks: PRECISION_RANKS[i] covers seconds off up to PRECISION_LIMITS[i]
+PRECISION_LIMITS = (0, 5, 15, 30, 60, 120)
+PRECISION_RANKS = (
+    "🏆 PERFECT CHRONOS", "🥇 MASTER TIMER", "🥈 EXPERT PRECISION", "🥉 SKILLED TIMING",
+    "⭐ DECENT ACCURACY", "💫 BASIC ATTEMPT", "🔹 ROOKIE TIMING",
+)
+# Minimum cycle streak / perfect cycle count for each precision rank title
+# (titles carry their separator so they prefix the base rank directly)
+STREAK_LEVELS = (3, 5, 7)
+STREAK_TITLES = ("⚡ LIGHTNING STREAK - ", "🔥 FIRE STREAK CHAMPION - ", "👑 LEGENDARY CYCLE MASTER - ")
+CYCLE_LEVELS = (1, 5, 10)
+CYCLE_TITLES = ("🔄 CYCLE KEEPER - ", "🌀 CYCLONE MASTER - ", "🌌 COSMIC SYNCHRONIZER - ")
+# Humorous stoner abstinence rankings: STONER_RANKS[i + 1] starts at
+# STONER_RANK_SECONDS[i] (longest = highest rank)
+STONER_RANK_SECONDS = (
+    60, 5 * 60, 15 * 60, 30 * 60,
+    3600, 3 * 3600, 6 * 3600, 12 * 3600,
+    DAY_SECONDS, 3 * DAY_SECONDS, WEEK_SECONDS, 2 * WEEK_SECONDS,
+    30 * DAY_SECONDS, 90 * DAY_SECONDS, 180 * DAY_SECONDS, 365 * DAY_SECONDS,
+)
+STONER_RANKS = (
+    "🍃 FRESH TOKER",  # Under 1 minute
+    "🔹 MINUTE-MAN ROOKIE", "🚀 FIVE-MINUTE FIGHTER", "🔕 QUARTER-HOUR QUITTER", "💫 HALF-HOUR HUSTLER",
+    "⏰ HOURLY HOLDOUT", "🕰️ THREE-HOUR TROUPER", "🌅 SUNRISE SURVIVOR", "⭐ HALF-DAY HERO",
+    "🥉 SOBER SOLDIER", "🥈 ABSTINENCE APPRENTICE", "🥇 WILLPOWER WARRIOR", "🏆 T-BREAK TITAN",
+    "🌱 CANNABIS CLEANSE CHAMPION", "🧘 ZEN MASTER OF RESTRAINT", "🧿 ENLIGHTENED MONK OF SOBRIETY",
+    "👑 LEGENDARY SOBER SAGE",
+)
+# One IRC line: optional ":prefix " (nick captured only from nick!user@host),
+# command, target, then optional " :trailing"; other params are ignored
+IRC_LINE_RE = re.compile(rb'(?::(?:([^ !]*)![^ ]*|[^ ]*) |(?!:))([^ ]*) ([^ ]*)(?: :(.*)| .*)?\Z', re.S)
+LISTEN_POLL_INTERVAL = 1  # Seconds the listen loop waits before rechecking connected
+SEND_TIMEOUT = 30  # Seconds a send may block before the connection is treated as dead
+SEND_BURST = 5  # PRIVMSG lines that may go out back-to-back before pacing starts
+SEND_INTERVAL = 0.5  # Seconds per PRIVMSG line once the burst is used up
+HAS_SENDMSG = hasattr(socket.socket, 'sendmsg')  # Scatter/gather send (POSIX only)
+JOIN_BATCH = 5  # Channels named per comma-separated JOIN line
+NO_ARGS = ()  # Args passed to handlers for a bare command
+# Commands that silently record a toke
+TOKE_ALIASES = frozenset({
+    "toke", "pass", "joint", "dab", "blunt", "bong", "vape",
+    "doombong", "olddoombong", "kylebong",
+})
+# Pi in high precision decimal (fractional digits), expanded to base 64 for !pi
+PI_DECIMALS = "1415926535897932384626433832795028841971693993751058209749445923078164062862089986280348253421170679821480865132823066470938446095505822317253594081284811174502841027019385211055596446229489549303819644288109756659334461284756482337867831652712019091456485669234603486104543266482133936072602491412737245870066063155881748815209209628292540917153643678925903600113305305488204665213841469519415116094330572703657595919530921861173819326117931051185480744623799627495673518857527248912279381830119491298336733624406566430860213949463952247371907021798609437027705392171762931767523846748184676694051320005681271452635608277857713427577896091736371787214684409012249534301465495853710507922796892589235420199561121290219608640344181598136297747713099605187072113499999983729780499510597317328160963185950244594553469083026425223082533446850352619311881710100031378387528865875332083814206171776691473035982534904287554687311595628638823537875937519577818577805321712268066130019278766111959092164201989"
+PI_BASE64_DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz{|"
+DIE_VALUES = range(1, 7)  # Faces of one craps die
+DIE_FACES = (None, "⚀", "⚁", "⚂", "⚃", "⚄", "⚅")  # Emoji for each die value, by index
+
+# Random subliminal weed poetry couplets for !stoned
+STONED_COUPLETS = (
+    "Smoke rises high, thoughts float free / In this moment, just the herb and me 🌿✨",
+    "Green leaves burn, minds expand wide / Riding cosmic waves on this elevated tide 🌊🚀",
+    "Time melts away like morning dew / Reality shifts to a different hue 🎨🍃",
+    "Ancient plant wisdom fills the air / Consciousness dancing without a care 💫🌬️",
+    "Rolling papers hold sacred gold / Stories of peace, forever told 📜✨",
+    "Inhale the earth, exhale the stress / Finding zen in the greenness 🧘💚",
+    "Purple haze and lazy days / Lost in the aromatic maze 🌸🌀",
+    "Trichomes glisten like morning frost / In their beauty, I am lost ❄️🔬",
+    "Clouds of thought drift through my brain / Washing worries down the drain ☁️🧠",
+    "Sacred smoke curls toward the sky / Watching mundane problems fly 🕊️💨",
+    "Green goddess whispers ancient tales / Through valleys of consciousness, on herbal trails 🏔️🌿",
+    "Burning bridges to the mundane / Elevating far above the plain 🌉🎈",
+    "Sticky fingers, happy mind / Leaving earthly cares behind 🤲💭",
+    "Cannabis dreams in technicolor bright / Painting reality with different light 🎨🌈",
+    "From seed to smoke, the journey's long / But in this moment, I belong 🌱🔥",
+    "Couch-locked but mind is free / Exploring infinity internally ♾️🛋️",
+    "Munchies call with siren song / But this high won't last too long 🍕⏰",
+    "Red-eyed visions, giggling spells / In this state, all is well 😂👁️",
+    "The grinder spins, the ritual begins / Transcending ordinary sins ⚙️✨",
+    "Mary Jane, my faithful friend / On you, I can depend 🤝💚",
+    "Terpenes dance upon my tongue / Feeling forever young 👅🎵",
+    "Slow motion thoughts cascade like rain / Washing clean the daily pain 🌧️💆",
+    "In the garden of the mind I roam / This altered state feels like home 🏡🧠",
+    "Contemplating universe's mysteries / Through these herbal chemistries 🌌🔬",
+    "Every puff a tiny prayer / Sending gratitude through the air 🙏💨",
+    "Crystal trichomes catch the light / Everything feels just right 💎✨",
+    "Botanical bliss in every breath / Dancing with life, forgetting death 🎭💃",
+    "The Buddha smiled when he got high / Understanding earth and sky 😌🌍",
+    "Giggling at things that aren't that funny / Life tastes sweeter than honey 🍯😄",
+    "Paranoia knocks but I won't answer / Too busy being a cosmic dancer 💃🌟",
+    "Sativa thoughts race like the wind / While indica keeps me grinned 🌪️😊",
+    "Papers twist, the cone takes shape / Portal to the mind's landscape 🌀🗺️",
+    "In the smoke I see the truth / Reclaiming my eternal youth ⏳💫",
+    "Gravity feels optional today / As worries simply float away 🎈🌬️",
+    "Philosophy becomes so clear / When the herb is near 💡🌿",
+    "Creative sparks ignite the brain / Thoughts form patterns like the rain 🧠⚡",
+    "Every strain a different key / Unlocking what I'm meant to be 🔑🚪",
+    "The clock moves slow, the mind moves fast / Present moment, vast and vast ⏰🌊",
+    "Laughter echoes through the room / Dispelling every bit of gloom 🎭✨",
+    "Nature's remedy, ancient and true / Making everything feel new 🏛️🌱",
+    "Smoke signals to the universe / Composing my herbal verse 📡📝",
+    "Sublime relaxation takes its hold / Worth its weight in green gold 💰🌿",
+    "The ritual soothes my weary soul / Making broken pieces whole 🧩💚",
+    "Perception shifts with every toke / Reality's just cosmic smoke 🔮💨",
+    "In this space between the thoughts / Wisdom can't be bought or taught 🧘💭",
+    "Floating on a sea of calm / Nature's perfect healing balm 🌊💚",
+    "The plant speaks in silent ways / Guiding through the mental maze 🌿🧩",
+    "Time becomes a fluid thing / As consciousness takes wing ⏰🦋",
+    "Colors brighter, sounds more clear / In this elevated sphere 🎨🎵",
+    "Sacred herb of peace and light / Making everything alright 🕊️💡",
+    "Mind expands beyond the brain / Washing clear like gentle rain 🧠🌧️"
+)
+
+# Funny weed wisdom for !edible
+EDIBLE_PHRASES = (
+    "Eating your way to enlightenment, one gummy at a time 🍬✨",
+    "When smoking is too mainstream for your consciousness 🍪🧠",
+    "The slow-release capsule of cosmic understanding ⏰💊",
+    "Digestive system? More like dimension portal 🚪🌌",
+    "Brownies: because adulting needs delicious distractions 🧁",
+    "Metabolizing molecules of mysticism 🍫🔬",
+    "Grandma's recipe meets quantum physics 👵⚛️",
+    "Oral fixation meets orbital elevation 🛸",
+    "The patient path to profound perspective 🧘",
+    "When you want to get high AND satisfy your munchies simultaneously 🎯🍕",
+    "Baked goods for getting baked: a delicious paradox 🥨♾️",
+    "Confections for consciousness expansion 🍰🌠"
+)
+
+# Sublime rotating quotes for !blaze
+SUBLIME_QUOTES = (
+    "Ignite the sacred leaf and transcend the mundane 🔥🌿",
+    "Through smoke we find clarity, through fire we find peace ✨💨",
+    "The flame awakens what sleep has concealed 🕯️🧠",
+    "Burning away illusions, one ember at a time 🔥💫",
+    "In the glow of the cherry, wisdom blooms 🌸🔥",
+    "Blazing trails through consciousness itself 🛤️✨",
+    "Fire transforms the plant, smoke transforms the mind 🌿➡️☁️",
+    "The ritual of flame, the sacrament of smoke 🕯️🙏",
+    "Combustion unlocks the ancient secrets within 🔓🔥",
+    "Lighting the path to inner worlds unexplored 🗺️💨",
+    "When the herb meets fire, magic manifests 🪄🔥",
+    "Smoke signals to higher dimensions 📡🌌",
+    "The sacred flame purifies and elevates 🔥⬆️",
+    "Burning bright, thinking deeper 💡🔥",
+    "Through the blaze, we pierce the veil 🎭🔥",
+    "Fire is the messenger, smoke is the message 📨💨",
+    "Blazing into realms beyond ordinary perception 🚀🔥",
+    "The alchemist's flame transmutes the mundane 🧪🔥",
+    "Ignition of the spirit, liberation of the mind 🕊️🔥",
+    "Where there's smoke, there's enlightenment 💡💨",
+    "The eternal dance of flame and flower 💃🌸🔥",
+    "Blazing bridges to the infinite 🌉♾️",
+    "Fire speaks in languages older than words 🗣️🔥",
+    "The glow that guides us inward 🧭✨",
+    "Combustible contemplation, flammable philosophy 💭🔥",
+    "Burning through barriers of perception 🚧🔥",
+    "The flame that illuminates inner truth 💡🕯️",
+    "Blazing with the fury of a thousand suns, yet peaceful 🌞😌",
+    "Fire transforms matter, smoke transforms mind 🌿➡️🧠",
+    "The ancient art of elevated existence 🎨🔥",
+    "Kindle the consciousness, stoke the soul 🔥👤",
+    "Where flame kisses flower, freedom follows 💋🌸🕊️",
+    "The phoenix rises on clouds of smoke 🐦‍🔥☁️",
+    "Blazing trails where others see only haze 🛤️🌫️",
+    "Fire: nature's way of saying 'let's get deep' 🌲🔥",
+    "Smoke sculptures of shifting consciousness ☁️🗿",
+    "The ember glows with primordial wisdom 🔥🦕",
+    "Burning questions lead to glowing answers 🔥❓➡️💡",
+    "Through fire and smoke, we become un-woke... wait, MORE woke 🔥👁️",
+    "The lighter's click: gateway to the infinite 🔓♾️",
+    "Blaze on, space cadet, blaze on 🚀🔥",
+    "When in doubt, blaze it out 💨💭",
+    "The sacred lighter illuminates the way 🔥🛤️",
+    "Combustion: because enlightenment shouldn't be boring 🔥🎉",
+    "Fire cleanses, smoke ascends, mind transcends 🔥☁️🧠",
+    "Blazing like the cosmos intended 🌌🔥",
+    "The ceremonial ignition of infinite possibilities 🕯️♾️",
+    "Flame on, tune in, blaze out 🔥📻💨",
+    "Through the sacred blaze, we become unphased 🔥😎",
+    "Let the herb burn, let the mind learn 🌿🔥🧠"
+)
+
+# Cannabis strain database for !strain - Comprehensive collection of 150+ strains
+STRAIN_INFO = {
+    # Classic & Legendary Strains
+    "blue dream": "Hybrid 🌿 Blue Dream is a sativa-dominant hybrid with balanced full-body relaxation and gentle cerebral invigoration. Perfect for daytime use with creative energy. THC: 17-24% | Effects: Happy, Relaxed, Euphoric, Creative | Flavors: Sweet berry, blueberry",
+    "og kush": "Hybrid 🌿 OG Kush is a legendary strain with distinct earthy, pine and woody flavors. Delivers heavy-hitting euphoria and relaxation. THC: 20-26% | Effects: Euphoric, Happy, Relaxed, Uplifted | Flavors: Earthy, pine, woody",
+    "sour diesel": "Sativa 🌿 Sour Diesel (Sour D) is a fast-acting energizing strain with dreamy cerebral effects. Great for stress relief. THC: 20-25% | Effects: Energetic, Creative, Euphoric, Uplifted | Flavors: Diesel, pungent, citrus",
+    "girl scout cookies": "Hybrid 🌿 GSC delivers euphoria and full-body relaxation. Known for sweet and earthy aromas. THC: 25-28% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Sweet, earthy, mint",
+    "gsc": "Hybrid 🌿 GSC delivers euphoria and full-body relaxation. Known for sweet and earthy aromas. THC: 25-28% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Sweet, earthy, mint",
+    "granddaddy purple": "Indica 🌿 Granddaddy Purple (GDP) combines Mendo Purps, Skunk, and Afghan genetics for potent indica effects. Deep relaxation. THC: 17-24% | Effects: Relaxed, Sleepy, Euphoric, Happy | Flavors: Grape, berry, sweet",
+    "gdp": "Indica 🌿 Granddaddy Purple (GDP) combines Mendo Purps, Skunk, and Afghan genetics for potent indica effects. Deep relaxation. THC: 17-24% | Effects: Relaxed, Sleepy, Euphoric, Happy | Flavors: Grape, berry, sweet",
+    "white widow": "Hybrid 🌿 White Widow is a balanced hybrid with powerful bursts of euphoria and energy. Legendary since the 90s. THC: 18-25% | Effects: Energetic, Euphoric, Creative, Uplifted | Flavors: Earthy, woody, pine",
+    "northern lights": "Indica 🌿 Northern Lights is a pure indica with fast-acting psychoactive effects. One of the most famous strains. THC: 16-21% | Effects: Relaxed, Sleepy, Euphoric, Happy | Flavors: Sweet, spicy, earthy",
+    "jack herer": "Sativa 🌿 Jack Herer is a blissful, clear-headed and creative sativa strain. Named after the cannabis activist. THC: 18-24% | Effects: Energetic, Creative, Euphoric, Uplifted | Flavors: Earthy, pine, woody",
+    "green crack": "Sativa 🌿 Green Crack provides invigorating mental buzz and sharp energy. Great for daytime use. THC: 15-25% | Effects: Energetic, Focused, Creative, Happy | Flavors: Sweet, citrus, fruity",
+    "ak-47": "Hybrid 🌿 AK-47 is a sativa-dominant hybrid that delivers steady cerebral buzz with mellow relaxation. Long-lasting. THC: 13-20% | Effects: Relaxed, Happy, Euphoric, Creative | Flavors: Earthy, sweet, pungent",
+    "durban poison": "Sativa 🌿 Durban Poison is a pure sativa with energetic, uplifting effects. Perfect for staying productive. THC: 15-25% | Effects: Energetic, Happy, Focused, Creative | Flavors: Sweet, earthy, pine",
+    "pineapple express": "Hybrid 🌿 Pineapple Express delivers long-lasting energetic buzz. Made famous by the movie. THC: 17-24% | Effects: Energetic, Happy, Euphoric, Creative | Flavors: Tropical, pineapple, citrus",
+    "acapulco gold": "Sativa 🌿 Acapulco Gold is a legendary strain with euphoric, energizing effects. Rare and potent. THC: 15-24% | Effects: Energetic, Euphoric, Happy, Creative | Flavors: Earthy, sweet, toffee",
+    "maui wowie": "Sativa 🌿 Maui Wowie brings tropical euphoria and creative energy. Classic Hawaiian strain. THC: 13-19% | Effects: Energetic, Creative, Happy, Euphoric | Flavors: Tropical, pineapple, sweet",
+    "purple haze": "Sativa 🌿 Purple Haze delivers dreamy cerebral high with creativity. Made famous by Jimi Hendrix. THC: 15-20% | Effects: Energetic, Creative, Euphoric, Happy | Flavors: Sweet, berry, earthy",
+    
+    # Modern Hybrids & Crosses
+    "gorilla glue": "Hybrid 🌿 Gorilla Glue #4 delivers heavy-handed euphoria and relaxation. Very potent and sticky. THC: 25-30% | Effects: Relaxed, Euphoric, Happy, Sleepy | Flavors: Earthy, pungent, pine",
+    "gg4": "Hybrid 🌿 Gorilla Glue #4 delivers heavy-handed euphoria and relaxation. Very potent and sticky. THC: 25-30% | Effects: Relaxed, Euphoric, Happy, Sleepy | Flavors: Earthy, pungent, pine",
+    "gelato": "Hybrid 🌿 Gelato is a sweet, dessert-like strain with euphoric and relaxing effects. Very flavorful. THC: 20-26% | Effects: Euphoric, Relaxed, Happy, Creative | Flavors: Sweet, berry, lavender",
+    "wedding cake": "Indica 🌿 Wedding Cake provides calming and euphoric effects. Rich, tangy flavor profile. THC: 21-27% | Effects: Relaxed, Euphoric, Happy, Calm | Flavors: Sweet, earthy, vanilla",
+    "runtz": "Hybrid 🌿 Runtz provides euphoric high with fruity, candy-like flavors. Evenly balanced. THC: 19-29% | Effects: Relaxed, Euphoric, Happy, Calm | Flavors: Fruity, sweet, tropical",
+    "zkittlez": "Indica 🌿 Zkittlez offers fruity, tropical flavors with calming, happy effects. Award-winning strain. THC: 15-23% | Effects: Relaxed, Happy, Euphoric, Calm | Flavors: Fruity, tropical, sweet",
+    "mac": "Hybrid 🌿 Miracle Alien Cookies (MAC) delivers uplifting and balancing effects. Unique flavor. THC: 20-25% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Citrus, floral, herbal",
+    "do-si-dos": "Indica 🌿 Do-Si-Dos delivers heavy stoning body high and cerebral euphoria. Very potent. THC: 19-30% | Effects: Relaxed, Euphoric, Sleepy, Happy | Flavors: Sweet, earthy, floral",
+    "wedding crasher": "Hybrid 🌿 Wedding Crasher blends Wedding Cake and Purple Punch for sweet relaxation. THC: 18-25% | Effects: Relaxed, Happy, Euphoric, Sleepy | Flavors: Grape, vanilla, sweet",
+    "ice cream cake": "Indica 🌿 Ice Cream Cake delivers sedating effects with creamy vanilla flavors. Very relaxing. THC: 20-25% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Vanilla, cream, sweet",
+    "biscotti": "Indica 🌿 Biscotti provides powerful relaxation with sweet, spicy cookie flavors. THC: 21-25% | Effects: Relaxed, Euphoric, Happy, Calm | Flavors: Sweet, spicy, nutty",
+    "london pound cake": "Indica 🌿 London Pound Cake delivers relaxing body high with sweet berry flavors. THC: 20-26% | Effects: Relaxed, Happy, Sleepy, Euphoric | Flavors: Berry, sweet, lemon",
+    "jealousy": "Hybrid 🌿 Jealousy combines Gelato 41 with Sherbet for balanced euphoric effects. THC: 20-28% | Effects: Euphoric, Relaxed, Happy, Creative | Flavors: Sweet, earthy, citrus",
+    
+    # Kush Family
+    "bubba kush": "Indica 🌿 Bubba Kush delivers tranquilizing relaxation with sweet hashish flavors. Heavy indica. THC: 14-22% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Earthy, sweet, hash",
+    "skywalker og": "Indica 🌿 Skywalker OG blends potent OG Kush with Skywalker for heavy relaxation. Strong indica. THC: 20-26% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Spicy, herbal, earthy",
+    "pink kush": "Indica 🌿 Pink Kush delivers powerful body high with sweet vanilla and floral flavors. THC: 18-25% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Sweet, vanilla, floral",
+    "critical kush": "Indica 🌿 Critical Kush combines OG Kush and Critical Mass for sedating body effects. THC: 20-25% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Earthy, spicy, pine",
+    "banana kush": "Hybrid 🌿 Banana Kush blends Ghost OG and Skunk Haze for tropical relaxation. THC: 18-25% | Effects: Happy, Euphoric, Relaxed, Uplifted | Flavors: Banana, tropical, sweet",
+    "master kush": "Indica 🌿 Master Kush is a Dutch classic with sharp earthy, citrus flavors and full-body relaxation. THC: 20-24% | Effects: Relaxed, Happy, Sleepy, Euphoric | Flavors: Earthy, citrus, pungent",
+    "platinum kush": "Indica 🌿 Platinum Kush delivers strong sedation with earthy, hashy flavors. Very potent. THC: 18-24% | Effects: Relaxed, Sleepy, Happy, Calm | Flavors: Earthy, hash, spicy",
+    "hindu kush": "Indica 🌿 Hindu Kush is a pure landrace indica from the Hindu Kush mountains. Deep relaxation. THC: 15-20% | Effects: Relaxed, Sleepy, Happy, Calm | Flavors: Earthy, sweet, sandalwood",
+    "purple kush": "Indica 🌿 Purple Kush is a pure indica with long-lasting physical relaxation and blissful effects. THC: 17-27% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Grape, earthy, sweet",
+    "kosher kush": "Indica 🌿 Kosher Kush is a potent indica with rich earthy and fruity flavors. Award winner. THC: 20-25% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Earthy, fruity, pine",
+    
+    # Cookies & Dessert Strains
+    "cookies": "Hybrid 🌿 Cookies family strains deliver euphoria and full-body relaxation. Sweet earthy flavors. THC: 20-28% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Sweet, earthy, nutty",
+    "thin mint cookies": "Hybrid 🌿 Thin Mint GSC delivers minty, sweet flavors with powerful euphoric effects. THC: 20-24% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Mint, sweet, earthy",
+    "animal cookies": "Hybrid 🌿 Animal Cookies crosses GSC with Fire OG for powerful sedating effects. THC: 20-27% | Effects: Relaxed, Happy, Euphoric, Sleepy | Flavors: Sweet, sour, earthy",
+    "cereal milk": "Hybrid 🌿 Cereal Milk tastes like sweet milk and ice cream with balanced hybrid effects. THC: 18-23% | Effects: Happy, Relaxed, Euphoric, Calm | Flavors: Cream, sweet, berry",
+    "birthday cake": "Hybrid 🌿 Birthday Cake delivers euphoric relaxation with sweet vanilla and creamy flavors. THC: 21-26% | Effects: Relaxed, Happy, Euphoric, Creative | Flavors: Vanilla, sweet, cream",
+    
+    # Purple & Berry Strains
+    "purple punch": "Indica 🌿 Purple Punch delivers sedating body high with sweet grape and blueberry flavors. THC: 18-25% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Grape, blueberry, sweet",
+    "cherry pie": "Hybrid 🌿 Cherry Pie combines sweet cherry and earthy flavors with relaxing, euphoric effects. THC: 16-24% | Effects: Relaxed, Happy, Euphoric, Creative | Flavors: Cherry, sweet, earthy",
+    "forbidden fruit": "Indica 🌿 Forbidden Fruit brings deep relaxation with cherry, lemon and tropical flavors. THC: 18-26% | Effects: Relaxed, Euphoric, Happy, Sleepy | Flavors: Cherry, lemon, tropical",
+    "blueberry": "Indica 🌿 Blueberry is a legendary strain with sweet berry flavors and relaxing body effects. THC: 16-24% | Effects: Relaxed, Happy, Euphoric, Sleepy | Flavors: Blueberry, sweet, berry",
+    "blackberry kush": "Indica 🌿 Blackberry Kush delivers powerful body effects with sweet berry and diesel flavors. THC: 16-20% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Berry, diesel, earthy",
+    "grape ape": "Indica 🌿 Grape Ape provides deep relaxation with distinct grape and berry flavors. THC: 18-25% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Grape, berry, sweet",
+    "strawberry cough": "Sativa 🌿 Strawberry Cough delivers energetic cerebral high with sweet strawberry flavor. THC: 15-20% | Effects: Energetic, Happy, Euphoric, Uplifted | Flavors: Strawberry, sweet, berry",
+    
+    # Citrus & Haze Strains
+    "tangie": "Sativa 🌿 Tangie provides uplifting euphoria with refreshing citrus tangerine flavors. THC: 19-22% | Effects: Energetic, Happy, Creative, Euphoric | Flavors: Citrus, tangerine, sweet",
+    "super lemon haze": "Sativa 🌿 Super Lemon Haze provides energetic, talkative euphoria with zesty citrus flavor. THC: 16-22% | Effects: Energetic, Happy, Euphoric, Uplifted | Flavors: Lemon, citrus, sweet",
+    "lemon haze": "Sativa 🌿 Lemon Haze delivers creative energy with strong lemon and citrus flavors. THC: 15-21% | Effects: Energetic, Happy, Euphoric, Creative | Flavors: Lemon, citrus, sweet",
+    "amnesia haze": "Sativa 🌿 Amnesia Haze is a potent sativa with uplifting cerebral effects and citrus flavors. THC: 20-25% | Effects: Energetic, Euphoric, Creative, Happy | Flavors: Citrus, earthy, spicy",
+    "orange cookies": "Hybrid 🌿 Orange Cookies blends Orange Juice with GSC for citrus-sweet relaxation. THC: 20-25% | Effects: Happy, Relaxed, Euphoric, Creative | Flavors: Orange, sweet, citrus",
+    "mimosa": "Sativa 🌿 Mimosa delivers uplifting effects with sweet citrus and tropical fruit flavors. THC: 19-27% | Effects: Energetic, Happy, Euphoric, Focused | Flavors: Citrus, tropical, sweet",
+    "clementine": "Sativa 🌿 Clementine provides energetic focus with sweet orange and citrus flavors. THC: 17-27% | Effects: Energetic, Focused, Happy, Creative | Flavors: Citrus, orange, sweet",
+    
+    # Diesel & Chem Strains
+    "chemdog": "Hybrid 🌿 Chemdog delivers powerful cerebral effects with diesel, chemical aromas. Legendary genetics. THC: 20-25% | Effects: Euphoric, Relaxed, Creative, Happy | Flavors: Diesel, pungent, earthy",
+    "chemdawg": "Hybrid 🌿 Chemdawg delivers powerful cerebral effects with diesel, chemical aromas. Legendary genetics. THC: 20-25% | Effects: Euphoric, Relaxed, Creative, Happy | Flavors: Diesel, pungent, earthy",
+    "stardawg": "Hybrid 🌿 Stardawg blends Chemdawg 4 with Tres Dawg for potent diesel effects. THC: 18-23% | Effects: Energetic, Euphoric, Happy, Uplifted | Flavors: Diesel, pungent, pine",
+    "headband": "Hybrid 🌿 Headband crosses OG Kush with Sour Diesel for unique pressure-like effects. THC: 20-27% | Effects: Relaxed, Euphoric, Happy, Creative | Flavors: Lemon, diesel, earthy",
+    "nyc diesel": "Sativa 🌿 NYC Diesel provides energizing effects with grapefruit and diesel flavors. THC: 14-21% | Effects: Energetic, Euphoric, Creative, Happy | Flavors: Diesel, grapefruit, citrus",
+    
+    # Exotic & Tropical Strains
+    "banana og": "Indica 🌿 Banana OG provides peaceful, laid-back effects with tropical banana flavor. THC: 16-23% | Effects: Relaxed, Happy, Euphoric, Sleepy | Flavors: Banana, tropical, sweet",
+    "sunset sherbet": "Indica 🌿 Sunset Sherbet provides full-body relaxation with sweet berry and citrus flavors. THC: 15-24% | Effects: Relaxed, Happy, Euphoric, Creative | Flavors: Sweet, berry, citrus",
+    "tropicana cookies": "Hybrid 🌿 Tropicana Cookies delivers uplifting effects with tropical citrus and cookie flavors. THC: 22-28% | Effects: Energetic, Happy, Euphoric, Creative | Flavors: Citrus, tropical, sweet",
+    "mango kush": "Hybrid 🌿 Mango Kush blends mango and banana flavors with euphoric, relaxing effects. THC: 11-20% | Effects: Happy, Euphoric, Relaxed, Uplifted | Flavors: Mango, banana, tropical",
+    "pineapple kush": "Hybrid 🌿 Pineapple Kush delivers tropical euphoria with sweet pineapple flavors. THC: 16-25% | Effects: Happy, Relaxed, Euphoric, Creative | Flavors: Pineapple, tropical, sweet",
+    "papaya": "Indica 🌿 Papaya provides sweet tropical relaxation with fruity papaya flavors. THC: 18-25% | Effects: Relaxed, Happy, Euphoric, Sleepy | Flavors: Tropical, fruity, sweet",
+    
+    # High THC Powerhouses
+    "god's gift": "Indica 🌿 God's Gift delivers powerful body effects with grape, citrus and hash flavors. THC: 18-27% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Grape, citrus, hash",
+    "death star": "Indica 🌿 Death Star provides powerful euphoria and deep relaxation. Diesel and earthy flavors. THC: 20-27% | Effects: Relaxed, Euphoric, Happy, Sleepy | Flavors: Diesel, earthy, pungent",
+    "the white": "Hybrid 🌿 The White is covered in trichomes and delivers potent euphoric effects. THC: 20-28% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Earthy, woody, pine",
+    "white fire og": "Hybrid 🌿 White Fire OG (WiFi OG) provides potent euphoria with sour, earthy flavors. THC: 22-30% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Sour, earthy, diesel",
+    "ghost train haze": "Sativa 🌿 Ghost Train Haze is one of the most potent sativas with citrus and floral notes. THC: 25-28% | Effects: Energetic, Euphoric, Creative, Happy | Flavors: Citrus, floral, pine",
+    "bruce banner": "Hybrid 🌿 Bruce Banner delivers powerful euphoric effects. Named after the Hulk. Very strong. THC: 24-30% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Diesel, sweet, earthy",
+    
+    # Balanced & Medicinal
+    "harlequin": "Sativa 🌿 Harlequin is a high-CBD strain with clear-headed, relaxed effects. Great for pain. THC: 7-15% CBD: 10-16% | Effects: Relaxed, Focused, Happy, Calm | Flavors: Earthy, mango, sweet",
+    "cannatonic": "Hybrid 🌿 Cannatonic is a high-CBD strain with mild euphoria and deep relaxation. THC: 7-15% CBD: 12-17% | Effects: Relaxed, Happy, Calm, Focused | Flavors: Earthy, citrus, pine",
+    "acdc": "Sativa 🌿 ACDC is a high-CBD strain with minimal psychoactive effects. Great for daytime. THC: 1-6% CBD: 16-24% | Effects: Relaxed, Focused, Calm, Clear | Flavors: Earthy, woody, pine",
+    "charlotte's web": "Sativa 🌿 Charlotte's Web is famous high-CBD strain with minimal THC. Medicinal powerhouse. THC: 0.3% CBD: 17-20% | Effects: Relaxed, Calm, Clear, Focused | Flavors: Earthy, pine, sweet",
+    
+    # Classic Landrace & Old School
+    "thai stick": "Sativa 🌿 Thai Stick is a pure landrace sativa from Thailand with energetic, cerebral effects. THC: 16-24% | Effects: Energetic, Euphoric, Creative, Happy | Flavors: Earthy, citrus, tropical",
+    "afghan kush": "Indica 🌿 Afghan Kush is a pure indica landrace with heavy sedation and earthy flavors. THC: 17-22% | Effects: Relaxed, Sleepy, Happy, Calm | Flavors: Earthy, sweet, spicy",
+    "panama red": "Sativa 🌿 Panama Red is a classic landrace with uplifting, psychedelic effects. THC: 14-18% | Effects: Energetic, Euphoric, Creative, Happy | Flavors: Earthy, spicy, sweet",
+    "lambs bread": "Sativa 🌿 Lamb's Bread (Lamb's Breath) is a Jamaican landrace with energizing effects. THC: 16-21% | Effects: Energetic, Euphoric, Creative, Happy | Flavors: Earthy, cheese, herbal",
+    "colombian gold": "Sativa 🌿 Colombian Gold is a classic landrace sativa with uplifting, creative effects. THC: 15-20% | Effects: Energetic, Happy, Creative, Euphoric | Flavors: Skunky, sweet, lemon",
+    
+    # More Modern Favorites
+    "trainwreck": "Hybrid 🌿 Trainwreck hits like a freight train with potent sativa effects. Euphoric and creative. THC: 18-25% | Effects: Energetic, Euphoric, Creative, Happy | Flavors: Lemon, pine, earthy",
+    "larry og": "Indica 🌿 Larry OG (Lemon Larry) delivers strong relaxation with citrus and pine flavors. THC: 20-27% | Effects: Relaxed, Happy, Euphoric, Sleepy | Flavors: Lemon, pine, earthy",
+    "sfv og": "Hybrid 🌿 SFV OG (San Fernando Valley OG) provides potent euphoria with earthy pine flavors. THC: 19-25% | Effects: Euphoric, Relaxed, Happy, Creative | Flavors: Pine, lemon, earthy",
+    "fire og": "Hybrid 🌿 Fire OG is one of the strongest OG strains with powerful sedating effects. THC: 20-26% | Effects: Relaxed, Euphoric, Happy, Sleepy | Flavors: Lemon, earthy, spicy",
+    "tahoe og": "Hybrid 🌿 Tahoe OG delivers powerful body effects with earthy lemon flavors. THC: 18-25% | Effects: Relaxed, Happy, Euphoric, Sleepy | Flavors: Lemon, earthy, pine",
+    "platinum og": "Indica 🌿 Platinum OG is a potent indica with coffee and floral notes. Heavy relaxation. THC: 20-24% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Coffee, floral, pine",
+    "louis xiii": "Indica 🌿 Louis XIII (Louie XIII OG) is a rare, potent OG with earthy pine flavors. THC: 22-28% | Effects: Relaxed, Sleepy, Euphoric, Happy | Flavors: Pine, earthy, woody",
+    "gushers": "Indica 🌿 Gushers delivers tropical fruity flavors with relaxing, euphoric effects. THC: 17-22% | Effects: Relaxed, Happy, Euphoric, Sleepy | Flavors: Tropical, fruity, sweet",
+    "apple fritter": "Hybrid 🌿 Apple Fritter combines apple pastry flavors with balanced euphoric effects. THC: 22-28% | Effects: Relaxed, Happy, Euphoric, Creative | Flavors: Apple, sweet, earthy",
+    "gary payton": "Hybrid 🌿 Gary Payton blends The Y with Snowman for potent diesel-sweet effects. THC: 20-25% | Effects: Euphoric, Relaxed, Happy, Creative | Flavors: Diesel, sweet, spicy",
+    "slurricane": "Indica 🌿 Slurricane delivers heavy relaxation with sweet berry and grape flavors. THC: 20-28% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Berry, grape, sweet",
+    "candy rain": "Hybrid 🌿 Candy Rain provides sweet fruity flavors with balanced euphoric effects. THC: 18-24% | Effects: Happy, Relaxed, Euphoric, Creative | Flavors: Fruity, sweet, berry",
+    "candy land": "Sativa 🌿 Candyland delivers energetic euphoria with sweet earthy flavors. THC: 19-24% | Effects: Energetic, Happy, Euphoric, Creative | Flavors: Sweet, earthy, spicy",
+    "cherry garcia": "Hybrid 🌿 Cherry Garcia blends cherry flavors with balanced relaxing effects. THC: 18-22% | Effects: Relaxed, Happy, Euphoric, Creative | Flavors: Cherry, sweet, earthy",
+    "jet fuel": "Hybrid 🌿 Jet Fuel (G6) delivers powerful diesel effects with energizing buzz. THC: 18-22% | Effects: Energetic, Euphoric, Happy, Creative | Flavors: Diesel, pine, skunk",
+    "king louis": "Indica 🌿 King Louis XIII provides royal relaxation with pine and earthy flavors. THC: 20-28% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Pine, earthy, woody",
+    "la confidential": "Indica 🌿 LA Confidential delivers smooth earthy flavors with deep relaxation. THC: 19-25% | Effects: Relaxed, Sleepy, Happy, Calm | Flavors: Earthy, pine, skunk",
+    "mendo breath": "Indica 🌿 Mendo Breath provides sweet vanilla caramel with heavy sedation. THC: 19-24% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Vanilla, caramel, sweet",
+    "motorbreath": "Indica 🌿 Motorbreath delivers powerful diesel and earthy relaxation. Very potent. THC: 20-28% | Effects: Relaxed, Euphoric, Happy, Sleepy | Flavors: Diesel, earthy, chemical",
+    "ninja fruit": "Hybrid 🌿 Ninja Fruit blends fruity strawberry with balanced euphoric effects. THC: 17-22% | Effects: Happy, Relaxed, Euphoric, Creative | Flavors: Strawberry, fruity, sweet",
+    "obama kush": "Indica 🌿 Obama Kush delivers presidential relaxation with earthy pine flavors. THC: 14-21% | Effects: Relaxed, Sleepy, Happy, Calm | Flavors: Earthy, pine, grape",
+    "purple trainwreck": "Hybrid 🌿 Purple Trainwreck blends grape flavors with energetic euphoria. THC: 18-23% | Effects: Energetic, Happy, Euphoric, Creative | Flavors: Grape, earthy, sweet",
+    "raspberry kush": "Indica 🌿 Raspberry Kush delivers sweet berry with relaxing body effects. THC: 15-24% | Effects: Relaxed, Happy, Sleepy, Euphoric | Flavors: Raspberry, sweet, berry",
+    "scout cookies": "Hybrid 🌿 Scout Cookies (Thin Mint GSC phenotype) delivers minty sweet euphoria. THC: 20-24% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Mint, sweet, earthy",
+    "sherbert": "Indica 🌿 Sherbert (Sunset Sherbet) provides fruity sweet relaxation. THC: 15-24% | Effects: Relaxed, Happy, Euphoric, Creative | Flavors: Sweet, berry, citrus",
+    "space queen": "Sativa 🌿 Space Queen delivers cosmic euphoria with fruity cherry flavors. THC: 16-24% | Effects: Energetic, Euphoric, Creative, Happy | Flavors: Cherry, fruity, pineapple",
+    "super silver haze": "Sativa 🌿 Super Silver Haze is a potent sativa with spicy, citrus flavors. Award winner. THC: 18-23% | Effects: Energetic, Euphoric, Happy, Creative | Flavors: Citrus, spicy, earthy",
+    "white tahoe cookies": "Hybrid 🌿 White Tahoe Cookies blends sweet earthy with powerful euphoria. THC: 20-27% | Effects: Euphoric, Relaxed, Happy, Creative | Flavors: Sweet, earthy, pine",
+    "yeti og": "Indica 🌿 Yeti OG delivers frosty, powerful relaxation with earthy diesel flavors. THC: 18-24% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Diesel, earthy, pine",
+    "z3": "Hybrid 🌿 Z3 (Zkittlez x Wedding Cake) delivers fruity sweet euphoria. THC: 20-25% | Effects: Relaxed, Happy, Euphoric, Creative | Flavors: Fruity, sweet, vanilla",
+}
+
+# City name -> timezone, for !bud-zone
+CITY_TIMEZONES = {
+    'new york': 'America/New_York', 'nyc': 'America/New_York',
+    'los angeles': 'America/Los_Angeles', 'chicago': 'America/Chicago',
+    'houston': 'America/Chicago', 'phoenix': 'America/Phoenix',
+    'philadelphia': 'America/New_York', 'san antonio': 'America/Chicago',
+    'san diego': 'America/Los_Angeles', 'dallas': 'America/Chicago',
+    'san jose': 'America/Los_Angeles', 'austin': 'America/Chicago',
+    'jacksonville': 'America/New_York', 'san francisco': 'America/Los_Angeles',
+    'columbus': 'America/New_York', 'charlotte': 'America/New_York',
+    'fort worth': 'America/Chicago', 'indianapolis': 'America/Indiana/Indianapolis',
+    'seattle': 'America/Los_Angeles', 'denver': 'America/Denver',
+    'boston': 'America/New_York', 'el paso': 'America/Denver',
+    'detroit': 'America/Detroit', 'nashville': 'America/Chicago',
+    'portland': 'America/Los_Angeles', 'memphis': 'America/Chicago',
+    'oklahoma city': 'America/Chicago', 'las vegas': 'America/Los_Angeles',
+    'louisville': 'America/New_York', 'baltimore': 'America/New_York',
+    'milwaukee': 'America/Chicago', 'albuquerque': 'America/Denver',
+    'tucson': 'America/Phoenix', 'fresno': 'America/Los_Angeles',
+    'sacramento': 'America/Los_Angeles', 'mesa': 'America/Phoenix',
+    'kansas city': 'America/Chicago', 'atlanta': 'America/New_York',
+    'miami': 'America/New_York', 'colorado springs': 'America/Denver',
+    'raleigh': 'America/New_York', 'omaha': 'America/Chicago',
+    'long beach': 'America/Los_Angeles', 'virginia beach': 'America/New_York',
+    'oakland': 'America/Los_Angeles', 'minneapolis': 'America/Chicago',
+    'tulsa': 'America/Chicago', 'arlington': 'America/Chicago',
+    'tampa': 'America/New_York', 'new orleans': 'America/Chicago',
+    'wichita': 'America/Chicago', 'cleveland': 'America/New_York',
+    'bakersfield': 'America/Los_Angeles', 'anaheim': 'America/Los_Angeles',
+    'honolulu': 'Pacific/Honolulu', 'santa ana': 'America/Los_Angeles',
+    'corpus christi': 'America/Chicago', 'riverside': 'America/Los_Angeles',
+    'lexington': 'America/New_York', 'stockton': 'America/Los_Angeles',
+    'st louis': 'America/Chicago', 'saint paul': 'America/Chicago',
+    'cincinnati': 'America/New_York', 'anchorage': 'America/Anchorage',
+    'henderson': 'America/Los_Angeles', 'greensboro': 'America/New_York',
+    'plano': 'America/Chicago', 'newark': 'America/New_York',
+    'lincoln': 'America/Chicago', 'buffalo': 'America/New_York',
+    'jersey city': 'America/New_York', 'chula vista': 'America/Los_Angeles',
+    'fort wayne': 'America/Indiana/Indianapolis', 'orlando': 'America/New_York',
+    'st petersburg': 'America/New_York', 'chandler': 'America/Phoenix',
+    'laredo': 'America/Chicago', 'norfolk': 'America/New_York',
+    'durham': 'America/New_York', 'madison': 'America/Chicago',
+    'lubbock': 'America/Chicago', 'irvine': 'America/Los_Angeles',
+    'winston-salem': 'America/New_York', 'garland': 'America/Chicago',
+    'hialeah': 'America/New_York', 'reno': 'America/Los_Angeles',
+    'baton rouge': 'America/Chicago', 'irving': 'America/Chicago',
+    'scottsdale': 'America/Phoenix', 'fremont': 'America/Los_Angeles',
+    'boise': 'America/Boise', 'richmond': 'America/New_York',
+    'san bernardino': 'America/Los_Angeles', 'spokane': 'America/Los_Angeles',
+    'rochester': 'America/New_York', 'des moines': 'America/Chicago',
+    'modesto': 'America/Los_Angeles', 'fayetteville': 'America/New_York',
+    'tacoma': 'America/Los_Angeles', 'oxnard': 'America/Los_Angeles',
+    'fontana': 'America/Los_Angeles', 'montgomery': 'America/Chicago',
+    'moreno valley': 'America/Los_Angeles', 'shreveport': 'America/Chicago',
+    'yonkers': 'America/New_York', 'akron': 'America/New_York',
+    'huntington beach': 'America/Los_Angeles', 'little rock': 'America/Chicago',
+    'augusta': 'America/New_York', 'amarillo': 'America/Chicago',
+    'mobile': 'America/Chicago', 'grand rapids': 'America/New_York',
+    'salt lake city': 'America/Denver', 'tallahassee': 'America/New_York',
+    'huntsville': 'America/Chicago', 'grand prairie': 'America/Chicago',
+    'knoxville': 'America/New_York', 'worcester': 'America/New_York',
+    'newport news': 'America/New_York', 'brownsville': 'America/Chicago',
+    'santa clarita': 'America/Los_Angeles', 'providence': 'America/New_York',
+    'fort lauderdale': 'America/New_York', 'chattanooga': 'America/New_York',
+    'tempe': 'America/Phoenix', 'oceanside': 'America/Los_Angeles',
+    'garden grove': 'America/Los_Angeles', 'rancho cucamonga': 'America/Los_Angeles',
+    'cape coral': 'America/New_York', 'santa rosa': 'America/Los_Angeles',
+    'sioux falls': 'America/Chicago', 'ontario': 'America/Los_Angeles',
+    'mckinney': 'America/Chicago', 'elk grove': 'America/Los_Angeles',
+    'pembroke pines': 'America/New_York', 'salem': 'America/Los_Angeles',
+    'corona': 'America/Los_Angeles', 'toronto': 'America/Toronto',
+    'montreal': 'America/Montreal', 'calgary': 'America/Calgary',
+    'edmonton': 'America/Edmonton', 'ottawa': 'America/Toronto',
+    'winnipeg': 'America/Winnipeg', 'quebec': 'America/Montreal',
+    'hamilton': 'America/Toronto', 'kitchener': 'America/Toronto',
+    'halifax': 'America/Halifax', 'victoria': 'America/Vancouver',
+    'saskatoon': 'America/Regina', 'regina': 'America/Regina',
+    'manchester': 'Europe/London', 'glasgow': 'Europe/London',
+    'liverpool': 'Europe/London', 'leeds': 'Europe/London',
+    'sheffield': 'Europe/London', 'edinburgh': 'Europe/London',
+    'bristol': 'Europe/London', 'cardiff': 'Europe/London',
+    'belfast': 'Europe/London', 'newcastle': 'Europe/London',
+    'berlin': 'Europe/Berlin', 'munich': 'Europe/Berlin',
+    'hamburg': 'Europe/Berlin', 'cologne': 'Europe/Berlin',
+    'frankfurt': 'Europe/Berlin', 'stuttgart': 'Europe/Berlin',
+    'düsseldorf': 'Europe/Berlin', 'dortmund': 'Europe/Berlin',
+    'essen': 'Europe/Berlin', 'paris': 'Europe/Paris',
+    'marseille': 'Europe/Paris', 'lyon': 'Europe/Paris',
+    'toulouse': 'Europe/Paris', 'nice': 'Europe/Paris',
+    'nantes': 'Europe/Paris', 'montpellier': 'Europe/Paris',
+    'strasbourg': 'Europe/Paris', 'bordeaux': 'Europe/Paris',
+    'sydney': 'Australia/Sydney', 'melbourne': 'Australia/Melbourne',
+    'brisbane': 'Australia/Brisbane', 'perth': 'Australia/Perth',
+    'adelaide': 'Australia/Adelaide', 'canberra': 'Australia/Sydney',
+    'darwin': 'Australia/Darwin', 'hobart': 'Australia/Hobart',
+    'tokyo': 'Asia/Tokyo', 'osaka': 'Asia/Tokyo',
+    'kyoto': 'Asia/Tokyo', 'nagoya': 'Asia/Tokyo',
+    'sapporo': 'Asia/Tokyo', 'fukuoka': 'Asia/Tokyo',
+    'kobe': 'Asia/Tokyo', 'beijing': 'Asia/Shanghai',
+    'shanghai': 'Asia/Shanghai', 'guangzhou': 'Asia/Shanghai',
+    'shenzhen': 'Asia/Shanghai', 'tianjin': 'Asia/Shanghai',
+    'wuhan': 'Asia/Shanghai', 'xi\'an': 'Asia/Shanghai',
+    'mumbai': 'Asia/Kolkata', 'delhi': 'Asia/Kolkata',
+    'bangalore': 'Asia/Kolkata', 'hyderabad': 'Asia/Kolkata',
+    'chennai': 'Asia/Kolkata', 'kolkata': 'Asia/Kolkata',
+    'pune': 'Asia/Kolkata', 'sao paulo': 'America/Sao_Paulo',
+    'rio de janeiro': 'America/Sao_Paulo', 'brasilia': 'America/Sao_Paulo',
+    'salvador': 'America/Sao_Paulo', 'fortaleza': 'America/Sao_Paulo',
+    'mexico city': 'America/Mexico_City', 'guadalajara': 'America/Mexico_City',
+    'monterrey': 'America/Mexico_City', 'puebla': 'America/Mexico_City',
+    'tijuana': 'America/Tijuana', 'juarez': 'America/Denver',
+    'leon': 'America/Mexico_City', 'amsterdam': 'Europe/Amsterdam',
+    'rotterdam': 'Europe/Amsterdam', 'the hague': 'Europe/Amsterdam',
+    'utrecht': 'Europe/Amsterdam', 'madrid': 'Europe/Madrid',
+    'barcelona': 'Europe/Madrid', 'valencia': 'Europe/Madrid',
+    'seville': 'Europe/Madrid', 'bilbao': 'Europe/Madrid',
+    'rome': 'Europe/Rome', 'milan': 'Europe/Rome',
+    'naples': 'Europe/Rome', 'turin': 'Europe/Rome',
+    'florence': 'Europe/Rome', 'moscow': 'Europe/Moscow',
+    'saint petersburg': 'Europe/Moscow', 'novosibirsk': 'Asia/Novosibirsk',
+    'yekaterinburg': 'Asia/Yekaterinburg', 'nizhny novgorod': 'Europe/Moscow',
+}
+
+# US state names and abbreviations -> timezone
+REGION_TIMEZONES = {
+    'california': 'America/Los_Angeles', 'ca': 'America/Los_Angeles',
+    'ny': 'America/New_York', 'texas': 'America/Chicago',
+    'tx': 'America/Chicago', 'florida': 'America/New_York',
+    'fl': 'America/New_York', 'pennsylvania': 'America/New_York',
+    'pa': 'America/New_York', 'illinois': 'America/Chicago',
+    'il': 'America/Chicago', 'ohio': 'America/New_York',
+    'oh': 'America/New_York', 'georgia': 'America/New_York',
+    'ga': 'America/New_York', 'north carolina': 'America/New_York',
+    'nc': 'America/New_York', 'michigan': 'America/Detroit',
+    'mi': 'America/Detroit', 'new jersey': 'America/New_York',
+    'nj': 'America/New_York', 'virginia': 'America/New_York',
+    'va': 'America/New_York', 'wa': 'America/Los_Angeles',
+    'arizona': 'America/Phoenix', 'az': 'America/Phoenix',
+    'massachusetts': 'America/New_York', 'ma': 'America/New_York',
+    'tennessee': 'America/Chicago', 'tn': 'America/Chicago',
+    'indiana': 'America/Indiana/Indianapolis', 'in': 'America/Indiana/Indianapolis',
+    'missouri': 'America/Chicago', 'mo': 'America/Chicago',
+    'maryland': 'America/New_York', 'md': 'America/New_York',
+    'wisconsin': 'America/Chicago', 'wi': 'America/Chicago',
+    'colorado': 'America/Denver', 'co': 'America/Denver',
+    'minnesota': 'America/Chicago', 'mn': 'America/Chicago',
+    'south carolina': 'America/New_York', 'sc': 'America/New_York',
+    'alabama': 'America/Chicago', 'al': 'America/Chicago',
+    'louisiana': 'America/Chicago', 'kentucky': 'America/New_York',
+    'ky': 'America/New_York', 'oregon': 'America/Los_Angeles',
+    'or': 'America/Los_Angeles', 'oklahoma': 'America/Chicago',
+    'ok': 'America/Chicago', 'connecticut': 'America/New_York',
+    'ct': 'America/New_York', 'utah': 'America/Denver',
+    'ut': 'America/Denver', 'iowa': 'America/Chicago',
+    'ia': 'America/Chicago', 'nevada': 'America/Los_Angeles',
+    'nv': 'America/Los_Angeles', 'arkansas': 'America/Chicago',
+    'ar': 'America/Chicago', 'mississippi': 'America/Chicago',
+    'ms': 'America/Chicago', 'kansas': 'America/Chicago',
+    'ks': 'America/Chicago', 'new mexico': 'America/Denver',
+    'nm': 'America/Denver', 'nebraska': 'America/Chicago',
+    'ne': 'America/Chicago', 'west virginia': 'America/New_York',
+    'wv': 'America/New_York', 'idaho': 'America/Boise',
+    'id': 'America/Boise', 'hawaii': 'Pacific/Honolulu',
+    'hi': 'Pacific/Honolulu', 'new hampshire': 'America/New_York',
+    'nh': 'America/New_York', 'maine': 'America/New_York',
+    'me': 'America/New_York', 'montana': 'America/Denver',
+    'mt': 'America/Denver', 'rhode island': 'America/New_York',
+    'ri': 'America/New_York', 'delaware': 'America/New_York',
+    'de': 'America/New_York', 'south dakota': 'America/Chicago',
+    'sd': 'America/Chicago', 'north dakota': 'America/Chicago',
+    'nd': 'America/Chicago', 'alaska': 'America/Anchorage',
+    'ak': 'America/Anchorage', 'vermont': 'America/New_York',
+    'vt': 'America/New_York', 'wyoming': 'America/Denver',
+    'wy': 'America/Denver', 'dc': 'America/New_York',
+    'd c': 'America/New_York',
+}
+
+# Country name -> timezone (used when no city or state is given)
+COUNTRY_TIMEZONES = {
+    'usa': 'America/New_York', 'united states': 'America/New_York',
+    'canada': 'America/Toronto', 'uk': 'Europe/London',
+    'united kingdom': 'Europe/London', 'germany': 'Europe/Berlin',
+    'france': 'Europe/Paris', 'australia': 'Australia/Sydney',
+    'japan': 'Asia/Tokyo', 'china': 'Asia/Shanghai',
+    'india': 'Asia/Kolkata', 'brazil': 'America/Sao_Paulo',
+    'mexico': 'America/Mexico_City', 'netherlands': 'Europe/Amsterdam',
+    'spain': 'Europe/Madrid', 'italy': 'Europe/Rome',
+    'russia': 'Europe/Moscow',
+}
+
+# Names that mean different places; a qualifier elsewhere in the location picks
+# the timezone, otherwise the default is used (None means a qualifier is needed)
+AMBIGUOUS_TIMEZONES = {
+    'london': ('Europe/London', {
+        'canada': 'America/Toronto', 'ontario': 'America/Toronto', 'on': 'America/Toronto',
+    }),
+    'birmingham': ('Europe/London', {
+        'al': 'America/Chicago', 'alabama': 'America/Chicago', 'usa': 'America/Chicago',
+    }),
+    'aurora': (None, {
+        'co': 'America/Denver', 'colorado': 'America/Denver',
+        'il': 'America/Chicago', 'illinois': 'America/Chicago',
+    }),
+    'glendale': (None, {
+        'ca': 'America/Los_Angeles', 'california': 'America/Los_Angeles',
+        'az': 'America/Phoenix', 'arizona': 'America/Phoenix',
+    }),
+    'vancouver': ('America/Vancouver', {
+        'wa': 'America/Los_Angeles', 'washington': 'America/Los_Angeles',
+    }),
+    'washington': ('America/Los_Angeles', {
+        'dc': 'America/New_York', 'd c': 'America/New_York',
+    }),
+    'la': (None, {
+        'ca': 'America/Los_Angeles', 'california': 'America/Los_Angeles',
+    }),
+}
+
+# Separators users type between location parts ("Vancouver, BC", "D.C.");
+# table keys are written in the normalized, space-separated form
+LOCATION_SEPARATORS = str.maketrans(",./", "   ")
+
+# Unambiguous tables in resolution order: cities, then states, then countries
+LOCATION_TABLES = (CITY_TIMEZONES, REGION_TIMEZONES, COUNTRY_TIMEZONES)
+# Every name a location can contain, and the most words any of them has
+LOCATION_NAMES = frozenset(name for table in LOCATION_TABLES + (AMBIGUOUS_TIMEZONES,) for name in table)
+LOCATION_MAX_WORDS = max(name.count(" ") for name in LOCATION_NAMES) + 1
+# Each word of a multi-word name ("york", "angeles"), first table entry wins
+LOCATION_WORDS = {}
+for table in LOCATION_TABLES:
+    for key, tz in table.items():
+        if " " in key:
+            for word in key.split(" "):
+                LOCATION_WORDS.setdefault(word, tz)
+
+# Finds every known name inside a location in one pass
+TIMEZONE_AUTOMATON = None
+if ahocorasick:
+    TIMEZONE_AUTOMATON = ahocorasick.Automaton()
+    for name in LOCATION_NAMES:
+        TIMEZONE_AUTOMATON.add_word(name, name)
+    TIMEZONE_AUTOMATON.make_automaton()
+
+
+@functools.lru_cache(maxsize=512)
+def get_zone(name):
+    """Return the tzinfo for a timezone name, built once per name"""
+    return ZoneInfo(name)
+
+
+def format_clock(dt):
+    """Format a datetime as '%I:%M %p %Z' without going through strftime"""
+    hour = dt.hour
+    return f"{hour % 12 or 12:02d}:{dt.minute:02d} {'AM' if hour < 12 else 'PM'} {dt.tzname() or ''}"
+
+
+def find_location_names(location):
+    """List known location names that appear as whole words in location"""
+    # Both paths expect get_timezone_from_location's normalized form:
+    # lowercase words separated by single spaces, no punctuation
+    if TIMEZONE_AUTOMATON is None:
+        # Look up each run of up to LOCATION_MAX_WORDS words, in the order the
+        # automaton reports them (by last word, longest first)
+        words = location.split(" ")
+        names = []
+        for end in range(1, len(words) + 1):
+            for start in range(max(0, end - LOCATION_MAX_WORDS), end):
+                candidate = " ".join(words[start:end])
+                if candidate in LOCATION_NAMES:
+                    names.append(candidate)
+        return names
+
+    names = []
+    last = len(location) - 1
+    for end, name in TIMEZONE_AUTOMATON.iter(location):
+        # Substring hits inside longer words ("ky" in "tokyo") don't count
+        start = end - len(name) + 1
+        if (start == 0 or location[start - 1] == " ") and (end == last or location[end + 1] == " "):
+            names.append(name)
+    return names
+
+
+@functools.lru_cache(maxsize=1024)
+def resolve_location(location):
+    """Resolve a normalized location string to a timezone name, or None"""
+    if not location:
+        return None
+
+    # Check for exact matches first
+    for table in LOCATION_TABLES:
+        if location in table:
+            return table[location]
+
+    names = find_location_names(location)
+    if not names:
+        # Part of a longer name (e.g. "york" for "new york")
+        if location in LOCATION_WORDS:
+            return LOCATION_WORDS[location]
+        # Abbreviated input (e.g. "san fran")
+        for table in LOCATION_TABLES:
+            for key, tz in table.items():
+                if key.startswith(location):
+                    return tz
+        return None
+
+    # An ambiguous name settled by a qualifier ("london ontario") wins
+    ambiguous = [AMBIGUOUS_TIMEZONES[name] for name in names if name in AMBIGUOUS_TIMEZONES]
+    for default, qualifiers in ambiguous:
+        for name in names:
+            if name in qualifiers:
+                return qualifiers[name]
+
+    for name in names:
+        if name in CITY_TIMEZONES:
+            return CITY_TIMEZONES[name]
+    for default, qualifiers in ambiguous:
+        if default:
+            return default
+    for table in (REGION_TIMEZONES, COUNTRY_TIMEZONES):
+        for name in names:
+            if name in table:
+                return table[name]
+
+    return None
+
+
+@contextlib.contextmanager
+def mapped_file(path):
+    """Map a file read-only so decoders can parse it without copying it first"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""  # Empty files can't be mapped
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+class PiExpansion:
+    """Base 64 digits of pi, computed on first use and kept for later calls"""
+
+    def __init__(self):
+        # The fraction is remainder / scale; exact integer math gives the
+        # same digits as high precision Decimal without touching its context
+        self.scale = 10 ** len(PI_DECIMALS)
+        self.remainder = int(PI_DECIMALS)
+        self.digits = ""
+
+    def prefix(self, count):
+        """Return '3.' followed by the first count base 64 digits"""
+        if count > len(self.digits):
+            new_digits = []
+            remainder, scale = self.remainder, self.scale
+            for _ in range(count - len(self.digits)):
+                digit, remainder = divmod(remainder * 64, scale)
+                new_digits.append(PI_BASE64_DIGITS[digit])
+            self.remainder = remainder
+            self.digits += "".join(new_digits)
+        return "3." + self.digits[:count]
+
+
+class TokeState(msgspec.Struct):
+    """Persisted toke tracking state (msgpack-encoded in toke_data.msgpack)"""
+    timestamps: dict[str, float] = {}
+    tb_enabled: dict[str, bool] = {}
+    toke_counts: dict = {}
+    longest_abstinence: dict = {}
+    user_timezones: dict[str, str] = {}
+    precision_timing: dict = {}
+    pi_progress: dict = {}
+    pi_rounds_won: dict = {}
+    timezone_points: dict = {}
+    toke_history: dict = {}
+    time_format_mode: int = 0
+    auto_420_points: dict = {}
+    craps_games: dict = {}
+    journal_generation: int = 0  # Journal records from older snapshots are skipped
+
+
+class TokeDelta(msgspec.Struct, array_like=True):
+    """One journal record: everything stored for a nick after a change"""
+    generation: int
+    nick: str
+    fields: dict  # {TokeState field: value}; fields without the nick are absent
+    time_format_mode: int
+
+
+class BotConfig(msgspec.Struct, frozen=True):
+    """Bot settings from config.json; unknown keys are ignored"""
+    server: str = "irc.libera.chat"
+    port: int = 6667
+    nickname: str = "Chronibit"
+    username: str = "Chronibit"
+    realname: str = "Chronibit"
+    channels: list[str] = []
+    command_prefix: str = "!"
+    nickserv_password: Optional[str] = None
+    nickserv_email: Optional[str] = None
+    nickserv_register: bool = False
+    log_level: str = "INFO"  # DEBUG logs every line sent/received
+    receive_chunk: int = 8192  # Bytes requested per recv() call
+
 
 class IRCBot:
     def __init__(self, config_file="config.json"):
         self.load_config(config_file)
         self.socket = None
+        self.send_lock = threading.Lock()
         self.connected = False
         self.setup_logging()
+        self.toke_dirty = False
+        self.toke_dirty_nicks = set()  # Nicks whose changes go in the next journal append
+        self.toke_snapshot_due = False  # Set when a change isn't tied to one nick
+        self.toke_save_lock = threading.Lock()
+        self.toke_flush_thread = None
+        # Command PRIVMSGs are handed from the listen loop to a single worker
+        # thread, so slow commands never hold up reading the socket or PONGs
+        self.command_queue = queue.SimpleQueue()
+        self.command_thread = None
+        # Replies are paced out by a sender thread so multi-line output can't
+        # trip the server's flood limit
+        self.send_queue = queue.SimpleQueue()
+        self.sender_thread = None
+        # Held while commands touch toke state and while it is encoded to disk
+        self.toke_data_lock = threading.Lock()
         self.load_toke_data()
         self.active_420_windows = {}  # {nick: timestamp_when_420_started}
         self.timezone_check_thread = None
         self.midi_manager = MidiManager()
-        self.craps_games = {}  # {nick: {'point': None, 'chips': 100, 'bet': 0, 'wins': 0, 'losses': 0}}
+        self.rng = random.Random()
+        self.choice = self.rng.choice  # Bound once for the per-roll hot path
+        # Quote decks are shuffled once and then rotated, so each draw is O(1)
+        # and nothing repeats until the whole deck has been seen
+        self.stoned_deck = deque(self.rng.sample(STONED_COUPLETS, k=len(STONED_COUPLETS)))
+        self.edible_deck = deque(self.rng.sample(EDIBLE_PHRASES, k=len(EDIBLE_PHRASES)))
+        self.blaze_deck = deque(self.rng.sample(SUBLIME_QUOTES, k=len(SUBLIME_QUOTES)))
+        self.pi_expansion = PiExpansion()  # Shared by !pi and !pi-show
+        self.pong_cache = {}  # {raw PING line: encoded PONG reply}
+        self.encoded_messages = {}  # {(channel, fixed text): encoded PRIVMSG line}
+        self.utc_offsets = {}  # {(timezone, 15-minute bucket since epoch): UTC offset in seconds}
+        self.t_break_replies = {}  # {user: (tokes tracked, rendered !t-break stats)}
+        
+        # Command dispatch table, built once instead of an if/elif chain per message
+        self.command_handlers = {
+            "bud-zone": self.cmd_bud_zone,
+            "strain": self.cmd_strain,
+            "stoned": self.cmd_stoned,
+            "z6": self.cmd_z6,
+            "time": self.cmd_time,
+            "edible": self.cmd_edible,
+            "blaze": self.cmd_blaze,
+            "pi": self.cmd_pi,
+            "pi-show": self.cmd_pi_show,
+            "t-break": self.cmd_t_break,
+            "?": self.cmd_help,
+            "midi": self.cmd_midi,
+            "craps": self.cmd_craps,
+        }
+        # !midi subcommands, dispatched the same way as top-level commands
+        self.midi_handlers = {
+            "info": self.midi_info,
+            "play": self.midi_play,
+            "stop": self.midi_stop,
+            "add": self.midi_add,
+            "tempo": self.midi_tempo,
+            "track": self.midi_track,
+            "instrument": self.midi_instrument,
+            "save": self.midi_save,
+            "clear": self.midi_clear,
+        }
+        # !craps subcommands; each also gets the player's game state
+        self.craps_handlers = {
+            "status": self.craps_status,
+            "bet": self.craps_bet,
+            "roll": self.craps_roll,
+            "cashout": self.craps_cashout,
+        }
+        
+    @staticmethod
+    def draw(deck):
+        """Take the next entry from a shuffled quote deck"""
+        entry = deck[0]
+        deck.rotate(-1)
+        return entry
         
     def load_config(self, config_file):
         """Load bot configuration from JSON file"""
         try:
-            with open(config_file, 'r') as f:
-                config = json.load(f)
+            with open(config_file, 'rb') as f:
+                self.config = msgspec.json.decode(f.read(), type=BotConfig)
         except FileNotFoundError:
             # Use default config if file doesn't exist
-            config = {
-                "server": "irc.libera.chat",
-                "port": 6667,
-                "nickname": "Chronibit",
-                "username": "Chronibit",
-                "realname": "Chronibit",
-                "channels": [],
-                "command_prefix": "!"
-            }
+            self.config = BotConfig()
             # Save default config
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=2)
+            with open(config_file, 'wb') as f:
+                f.write(msgspec.json.format(msgspec.json.encode(self.config), indent=2))
+        except msgspec.DecodeError as e:
+            # Logging isn't set up yet; the message names the bad field ("at `$.port`")
+            sys.exit(f"Invalid config file {config_file}: {e}")
                 
-        self.server = config["server"]
-        self.port = config["port"]
-        self.nickname = config["nickname"]
-        self.username = config["username"]
-        self.realname = config["realname"]
-        self.channels = config["channels"]
-        self.command_prefix = config["command_prefix"]
-        self.nickserv_password = config.get("nickserv_password", None)
-        self.nickserv_email = config.get("nickserv_email", None)
-        self.nickserv_register = config.get("nickserv_register", False)
+        self.command_prefix_bytes = self.config.command_prefix.encode('utf-8')
+        # Marks the start of a command in a raw PRIVMSG line (" :!")
+        self.command_marker = b" :" + self.command_prefix_bytes
         self.nickserv_registered = False
+        # Kept within sane bounds
+        self.receive_chunk = max(1024, min(self.config.receive_chunk, 65536))
         
     def setup_logging(self):
         """Setup logging for the bot"""
         logging.basicConfig(
-            level=logging.DEBUG,
+            level=getattr(logging, self.config.log_level.upper(), logging.INFO),
             format='%(asctime)s - %(levelname)s - %(message)s',
             handlers=[
-                logging.FileHandler('ircbot.log'),
+                RotatingFileHandler('ircbot.log', maxBytes=5_000_000, backupCount=3),
                 logging.StreamHandler()
             ]
         )
@@ -79,411 +904,346 @@ class IRCBot:
         
     def load_toke_data(self):
         """Load toke break data from file"""
-        self.toke_file = 'toke_data.pkl'
+        self.toke_file = 'toke_data.msgpack'
+        self.toke_encoder = msgspec.msgpack.Encoder()
+        corrupt = False
         try:
-            with open(self.toke_file, 'rb') as f:
+            with mapped_file(self.toke_file) as data:
+                state = msgspec.msgpack.decode(data, type=TokeState)
+        except FileNotFoundError:
+            state = self.load_legacy_toke_data()
+            self.toke_snapshot_due = True
+            if state is None:
+                state = TokeState()
+            else:
+                # Write the migrated data on the first flush, so the pickle
+                # isn't migrated again on every restart
+                self.toke_dirty = True
+        except msgspec.DecodeError as e:
+            # Keep the unreadable snapshot for inspection and start over; its
+            # journal records belong to that snapshot, so they're not replayed
+            corrupt_file = self.toke_file + '.corrupt'
+            self.logger.error(f"Failed to load toke data: {e}; moving it to {corrupt_file}")
+            try:
+                os.replace(self.toke_file, corrupt_file)
+            except OSError as e:
+                self.logger.error(f"Failed to move aside {self.toke_file}: {e}")
+            state = TokeState()
+            corrupt = True
+            self.toke_snapshot_due = True
+            self.toke_dirty = True
+
+        self.toke_data = state.timestamps  # {user: last_toke_timestamp}
+        self.tb_enabled = state.tb_enabled  # {user: True/False}
+        self.toke_counts = state.toke_counts  # {user: total_tokes}
+        self.longest_abstinence = state.longest_abstinence  # {user: longest_seconds}
+        self.user_timezones = state.user_timezones  # {user: timezone_string}
+        self.precision_timing = state.precision_timing  # {user: {'last_420_time': timestamp, 'perfect_cycles': int, 'total_420s': int, 'best_precision': seconds_off}}
+        self.pi_progress = state.pi_progress  # {user: digits_collected}
+        self.pi_rounds_won = state.pi_rounds_won  # {user: rounds_won}
+        self.timezone_points = state.timezone_points  # {user: points_for_guessing_420_times}
+        self.toke_history = state.toke_history  # {user: [list of timestamps]}
+        self.time_format_mode = state.time_format_mode  # 0 = detailed, 1 = seconds
+        self.auto_420_points = state.auto_420_points  # Points from being at 4:20
+        self.craps_games = state.craps_games  # {nick: {'point': None, 'chips': 100, 'bet': 0, 'wins': 0, 'losses': 0}}
+        self.journal_generation = state.journal_generation
+        if corrupt:
+            self.journal_size = 0
+        else:
+            self.replay_toke_journal()
+        # Share one interned string per nick across every table, matching the
+        # interned nicks parse_message hands to commands
+        for table in self.toke_tables().values():
+            interned = {sys.intern(nick): value for nick, value in table.items()}
+            table.clear()
+            table.update(interned)
+
+    def toke_tables(self):
+        """Map each per-nick TokeState field to its live dict"""
+        return {
+            'timestamps': self.toke_data,
+            'tb_enabled': self.tb_enabled,
+            'toke_counts': self.toke_counts,
+            'longest_abstinence': self.longest_abstinence,
+            'user_timezones': self.user_timezones,
+            'precision_timing': self.precision_timing,
+            'pi_progress': self.pi_progress,
+            'pi_rounds_won': self.pi_rounds_won,
+            'timezone_points': self.timezone_points,
+            'toke_history': self.toke_history,
+            'auto_420_points': self.auto_420_points,
+            'craps_games': self.craps_games,
+        }
+
+    def replay_toke_journal(self):
+        """Apply per-nick changes journaled since the last snapshot"""
+        try:
+            with mapped_file(TOKE_JOURNAL_FILE) as data:
+                self.journal_size = len(data)
+                offset = self.apply_toke_journal(data)
+        except FileNotFoundError:
+            self.journal_size = 0
+            return
+
+        if offset != self.journal_size:
+            # A torn or corrupt tail (e.g. a crash mid-append); anything appended
+            # after it would be unreadable, so start over from a fresh snapshot
+            self.logger.error(f"Ignoring unreadable tail of {TOKE_JOURNAL_FILE}")
+            self.toke_snapshot_due = True
+            self.toke_dirty = True
+
+    def apply_toke_journal(self, data):
+        """Apply journal records from data; return where the readable part ends"""
+        decoder = msgspec.msgpack.Decoder(TokeDelta)
+        tables = self.toke_tables()
+        offset = 0
+        with memoryview(data) as view:
+            while offset + JOURNAL_LENGTH.size <= len(data):
+                (length,) = JOURNAL_LENGTH.unpack_from(data, offset)
+                end = offset + JOURNAL_LENGTH.size + length
+                if end > len(data):
+                    break
+                try:
+                    delta = decoder.decode(view[offset + JOURNAL_LENGTH.size:end])
+                except msgspec.DecodeError:
+                    break
+                offset = end
+                if delta.generation != self.journal_generation:
+                    continue  # Already part of the snapshot
+                for name, table in tables.items():
+                    if name in delta.fields:
+                        table[delta.nick] = delta.fields[name]
+                    else:
+                        table.pop(delta.nick, None)
+                self.time_format_mode = delta.time_format_mode
+        return offset
+
+    def load_legacy_toke_data(self):
+        """Migrate toke data from the old pickle file; None if there isn't one"""
+        try:
+            with open(LEGACY_TOKE_FILE, 'rb') as f:
                 data = pickle.load(f)
-                if isinstance(data, dict) and 'timestamps' in data:
-                    self.toke_data = data['timestamps']
-                    self.tb_enabled = data.get('tb_enabled', {})
-                    self.toke_counts = data.get('toke_counts', {})
-                    self.longest_abstinence = data.get('longest_abstinence', {})
-                    self.user_timezones = data.get('user_timezones', {})
-                    self.precision_timing = data.get('precision_timing', {})
-                    self.pi_progress = data.get('pi_progress', {})
-                    self.pi_rounds_won = data.get('pi_rounds_won', {})
-                    self.timezone_points = data.get('timezone_points', {})
-                    self.toke_history = data.get('toke_history', {})
-                    self.time_format_mode = data.get('time_format_mode', 0)
-                    self.auto_420_points = data.get('auto_420_points', {})  # Points from being at 4:20
-                    self.craps_games = data.get('craps_games', {})
-                else:
-                    # Old format, migrate
-                    self.toke_data = data
-                    self.tb_enabled = {}
-                    self.toke_counts = {}
-                    self.longest_abstinence = {}
-                    self.user_timezones = {}
-                    self.precision_timing = {}
-                    self.pi_progress = {}
-                    self.pi_rounds_won = {}
-                    self.timezone_points = {}
-                    self.toke_history = {}
         except (FileNotFoundError, EOFError):
-            self.toke_data = {}  # {user: last_toke_timestamp}
-            self.tb_enabled = {}  # {user: True/False}
-            self.toke_counts = {}  # {user: total_tokes}
-            self.longest_abstinence = {}  # {user: longest_seconds}
-            self.user_timezones = {}  # {user: timezone_string}
-            self.precision_timing = {}  # {user: {'last_420_time': timestamp, 'perfect_cycles': int, 'total_420s': int, 'best_precision': seconds_off}}
-            self.pi_progress = {}  # {user: digits_collected}
-            self.pi_rounds_won = {}  # {user: rounds_won}
-            self.timezone_points = {}  # {user: points_for_guessing_420_times}
-            self.toke_history = {}  # {user: [list of timestamps]}
-            self.time_format_mode = 0  # 0 = detailed, 1 = seconds
-            self.auto_420_points = {}  # Points from being at 4:20
-            self.craps_games = {}
-            
-    def save_toke_data(self):
-        """Save toke break data to file"""
+            return None
+
+        self.logger.info(f"Migrating toke data from {LEGACY_TOKE_FILE}")
+        if isinstance(data, dict) and 'timestamps' in data:
+            fields = {name: data[name] for name in TokeState.__struct_fields__ if name in data}
+            return TokeState(**fields)
+        # Old format, migrate
+        return TokeState(timestamps=data)
+
+    def save_toke_data(self, nick=None):
+        """Mark toke data as changed; the flush thread writes it out"""
+        if nick is None:
+            self.toke_snapshot_due = True
+        else:
+            self.toke_dirty_nicks.add(nick)
+        self.toke_dirty = True
+
+    def flush_toke_data(self):
+        """Write toke data to disk if it changed since the last flush"""
+        with self.toke_save_lock:
+            if not self.toke_dirty:
+                return
+            # Clear first so changes made during the write trigger another flush
+            self.toke_dirty = False
+            with self.toke_data_lock:
+                nicks, self.toke_dirty_nicks = self.toke_dirty_nicks, set()
+                snapshot_due, self.toke_snapshot_due = self.toke_snapshot_due, False
+            if snapshot_due or self.journal_size >= TOKE_JOURNAL_LIMIT:
+                self.write_toke_data()
+            else:
+                self.append_toke_journal(nicks)
+
+    def append_toke_journal(self, nicks):
+        """Append the current state of each changed nick to the journal"""
+        try:
+            records = []
+            with self.toke_data_lock:
+                tables = self.toke_tables()
+                for nick in nicks:
+                    fields = {name: table[nick] for name, table in tables.items() if nick in table}
+                    record = self.toke_encoder.encode(
+                        TokeDelta(self.journal_generation, nick, fields, self.time_format_mode))
+                    records.append(JOURNAL_LENGTH.pack(len(record)))
+                    records.append(record)
+            data = b"".join(records)
+            with open(TOKE_JOURNAL_FILE, 'ab') as f:
+                f.write(data)
+            self.journal_size += len(data)
+        except Exception as e:
+            self.logger.error(f"Failed to append toke journal: {e}")
+            # Fall back to a full snapshot on the next flush
+            self.toke_snapshot_due = True
+            self.toke_dirty = True
+
+    def write_toke_data(self):
+        """Save a full snapshot of toke data and start a new journal"""
         try:
-            with open(self.toke_file, 'wb') as f:
-                data = {
-                    'timestamps': self.toke_data,
-                    'tb_enabled': self.tb_enabled,
-                    'toke_counts': self.toke_counts,
-                    'longest_abstinence': self.longest_abstinence,
-                    'user_timezones': self.user_timezones,
-                    'precision_timing': self.precision_timing,
-                    'pi_progress': self.pi_progress,
-                    'pi_rounds_won': self.pi_rounds_won,
-                    'timezone_points': self.timezone_points,
-                    'toke_history': self.toke_history,
-                    'time_format_mode': self.time_format_mode,
-                    'auto_420_points': self.auto_420_points,
-                    'craps_games': self.craps_games
-                }
-                pickle.dump(data, f)
+            generation = self.journal_generation + 1
+            with self.toke_data_lock:
+                payload = self.toke_encoder.encode(TokeState(
+                    time_format_mode=self.time_format_mode,
+                    journal_generation=generation,
+                    **self.toke_tables()
+                ))
+            # Write to a temp file and rename so a crash never leaves a torn file
+            tmp_file = self.toke_file + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_file, self.toke_file)
+            # Older records are now in the snapshot and carry a stale
+            # generation, so a crash before this truncate is harmless
+            self.journal_generation = generation
+            with open(TOKE_JOURNAL_FILE, 'wb'):
+                pass
+            self.journal_size = 0
         except Exception as e:
             self.logger.error(f"Failed to save toke data: {e}")
+            self.toke_snapshot_due = True
+            self.toke_dirty = True
+
+    def start_toke_flusher(self):
+        """Start background thread that periodically flushes toke data"""
+        def flush_loop():
+            while self.connected:
+                time.sleep(TOKE_FLUSH_INTERVAL)
+                self.flush_toke_data()
+
+        self.toke_flush_thread = threading.Thread(target=flush_loop, daemon=True)
+        self.toke_flush_thread.start()
+
+    def start_command_worker(self):
+        """Start the thread that runs queued channel and private commands"""
+        def command_loop():
+            while True:
+                parsed_msg = self.command_queue.get()
+                if parsed_msg is None:  # Shutdown sentinel from disconnect()
+                    break
+                try:
+                    with self.toke_data_lock:
+                        if parsed_msg['target'].startswith('#'):
+                            self.handle_command(parsed_msg)
+                        else:
+                            self.handle_private_command(parsed_msg)
+                except Exception as e:
+                    self.logger.error(f"Error handling command: {e}")
+
+        self.command_thread = threading.Thread(target=command_loop, daemon=True)
+        self.command_thread.start()
+
+    def start_sender(self):
+        """Start the thread that paces queued PRIVMSG lines out to the server"""
+        def send_loop():
+            # Token bucket: a short burst goes out at once, then one line per
+            # SEND_INTERVAL. Every line the bucket allows is written in one send
+            allowance = SEND_BURST
+            last_send = time.monotonic()
+            while True:
+                data = self.send_queue.get()
+                if data is None:  # Shutdown sentinel from disconnect()
+                    break
+                now = time.monotonic()
+                allowance = min(SEND_BURST, allowance + (now - last_send) / SEND_INTERVAL)
+                if allowance < 1:
+                    time.sleep((1 - allowance) * SEND_INTERVAL)
+                    allowance = 1
+                    now = time.monotonic()
+                last_send = now
+                
+                lines = [data]
+                allowance -= 1
+                stopping = False
+                while allowance >= 1:
+                    try:
+                        data = self.send_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if data is None:
+                        stopping = True
+                        break
+                    lines.append(data)
+                    allowance -= 1
+                self.send_raw_bytes(b"".join(lines))
+                if stopping:
+                    break
+
+        self.sender_thread = threading.Thread(target=send_loop, daemon=True)
+        self.sender_thread.start()
             
     def get_abstinence_rating(self, seconds_abstinent):
         """Calculate abstinence rating and breakdown from seconds"""
-        # Calculate all time units
-        years = int(seconds_abstinent // (365.25 * 24 * 3600))
-        remaining = int(seconds_abstinent % (365.25 * 24 * 3600))
-        
-        months = int(remaining // (30.44 * 24 * 3600))
-        remaining = int(remaining % (30.44 * 24 * 3600))
-        
-        weeks = remaining // (7 * 24 * 3600)
-        remaining = remaining % (7 * 24 * 3600)
-        
-        days = remaining // (24 * 3600)
-        remaining = remaining % (24 * 3600)
-        
-        hours = remaining // 3600
-        remaining = remaining % 3600
+        remaining = int(seconds_abstinent)
+        time_parts = []
+        overall_rating = None
         
-        minutes = remaining // 60
-        seconds = remaining % 60
+        # Every unit is listed, but only the highest one gets its emoji and
+        # decides the overall rating
+        for names, unit_seconds, emoji, rating in ABSTINENCE_UNITS:
+            count, remaining = divmod(remaining, unit_seconds)
+            if count:
+                part = f"{count} {names[count != 1]}"
+                if overall_rating is None:
+                    part = f"{part} {emoji}"
+                    overall_rating = rating
+                time_parts.append(part)
         
-        # Build time breakdown with all units, but only add emoji to highest unit
-        time_parts = []
-        highest_unit_found = False
-        
-        if years > 0:
-            decades = years // 10
-            remaining_years = years % 10
-            if decades > 0:
-                if not highest_unit_found:
-                    time_parts.append(f"{decades} decade{'s' if decades != 1 else ''} 👑🏆")
-                    highest_unit_found = True
-                else:
-                    time_parts.append(f"{decades} decade{'s' if decades != 1 else ''}")
-            if remaining_years > 0:
-                if not highest_unit_found:
-                    time_parts.append(f"{remaining_years} year{'s' if remaining_years != 1 else ''} 🏆")
-                    highest_unit_found = True
-                else:
-                    time_parts.append(f"{remaining_years} year{'s' if remaining_years != 1 else ''}")
-        if months > 0:
-            if not highest_unit_found:
-                time_parts.append(f"{months} month{'s' if months != 1 else ''} 🥇")
-                highest_unit_found = True
-            else:
-                time_parts.append(f"{months} month{'s' if months != 1 else ''}")
-        if weeks > 0:
-            if not highest_unit_found:
-                time_parts.append(f"{weeks} week{'s' if weeks != 1 else ''} 🥈")
-                highest_unit_found = True
-            else:
-                time_parts.append(f"{weeks} week{'s' if weeks != 1 else ''}")
-        if days > 0:
-            if not highest_unit_found:
-                time_parts.append(f"{days} day{'s' if days != 1 else ''} 🥉")
-                highest_unit_found = True
-            else:
-                time_parts.append(f"{days} day{'s' if days != 1 else ''}")
-        if hours > 0:
-            if not highest_unit_found:
-                time_parts.append(f"{hours} hour{'s' if hours != 1 else ''} ⭐")
-                highest_unit_found = True
-            else:
-                time_parts.append(f"{hours} hour{'s' if hours != 1 else ''}")
-        if minutes > 0:
-            if not highest_unit_found:
-                time_parts.append(f"{minutes} minute{'s' if minutes != 1 else ''} 💫")
-                highest_unit_found = True
-            else:
-                time_parts.append(f"{minutes} minute{'s' if minutes != 1 else ''}")
-        if seconds > 0 or len(time_parts) == 0:
-            if not highest_unit_found:
-                time_parts.append(f"{seconds} second{'s' if seconds != 1 else ''} 🔹")
-            else:
-                time_parts.append(f"{seconds} second{'s' if seconds != 1 else ''}")
-        
-        # Get overall rating based on highest time unit
-        if years >= 10:
-            overall_rating = "👑 LEGENDARY ABSTINENCE DEITY"
-        elif years >= 1:
-            overall_rating = "🏆 EPIC ABSTINENCE MASTER"
-        elif months >= 1:
-            overall_rating = "🥇 MASTER ABSTAINER"
-        elif weeks >= 1:
-            overall_rating = "🥈 EXPERT RESTRAINT"
-        elif days >= 1:
-            overall_rating = "🥉 SKILLED PATIENCE"
-        elif hours >= 1:
-            overall_rating = "⭐ DECENT CONTROL"
-        elif minutes >= 1:
-            overall_rating = "💫 BASIC WILLPOWER"
-        else:
+        if overall_rating is None:
+            time_parts.append("0 seconds 🔹")
             overall_rating = "🔹 ROOKIE STATUS"
         
         time_breakdown = " + ".join(time_parts)
         return time_breakdown, overall_rating
         
-    def get_timezone_from_location(self, location_parts):
-        """Try to determine timezone from location parts"""
-        location = " ".join(location_parts).lower()
-        
-        # Common timezone mappings
-        timezone_map = {
-            # US Cities
-            'new york': 'America/New_York', 'nyc': 'America/New_York',
-            'los angeles': 'America/Los_Angeles', 'la': 'America/Los_Angeles',
-            'chicago': 'America/Chicago', 'houston': 'America/Chicago',
-            'phoenix': 'America/Phoenix', 'philadelphia': 'America/New_York',
-            'san antonio': 'America/Chicago', 'san diego': 'America/Los_Angeles',
-            'dallas': 'America/Chicago', 'san jose': 'America/Los_Angeles',
-            'austin': 'America/Chicago', 'jacksonville': 'America/New_York',
-            'san francisco': 'America/Los_Angeles', 'columbus': 'America/New_York',
-            'charlotte': 'America/New_York', 'fort worth': 'America/Chicago',
-            'indianapolis': 'America/Indiana/Indianapolis', 'seattle': 'America/Los_Angeles',
-            'denver': 'America/Denver', 'washington': 'America/New_York',
-            'boston': 'America/New_York', 'el paso': 'America/Denver',
-            'detroit': 'America/Detroit', 'nashville': 'America/Chicago',
-            'portland': 'America/Los_Angeles', 'memphis': 'America/Chicago',
-            'oklahoma city': 'America/Chicago', 'las vegas': 'America/Los_Angeles',
-            'louisville': 'America/New_York', 'baltimore': 'America/New_York',
-            'milwaukee': 'America/Chicago', 'albuquerque': 'America/Denver',
-            'tucson': 'America/Phoenix', 'fresno': 'America/Los_Angeles',
-            'sacramento': 'America/Los_Angeles', 'mesa': 'America/Phoenix',
-            'kansas city': 'America/Chicago', 'atlanta': 'America/New_York',
-            'miami': 'America/New_York', 'colorado springs': 'America/Denver',
-            'raleigh': 'America/New_York', 'omaha': 'America/Chicago',
-            'long beach': 'America/Los_Angeles', 'virginia beach': 'America/New_York',
-            'oakland': 'America/Los_Angeles', 'minneapolis': 'America/Chicago',
-            'tulsa': 'America/Chicago', 'arlington': 'America/Chicago',
-            'tampa': 'America/New_York', 'new orleans': 'America/Chicago',
-            'wichita': 'America/Chicago', 'cleveland': 'America/New_York',
-            'bakersfield': 'America/Los_Angeles', 'aurora': 'America/Denver',
-            'anaheim': 'America/Los_Angeles', 'honolulu': 'Pacific/Honolulu',
-            'santa ana': 'America/Los_Angeles', 'corpus christi': 'America/Chicago',
-            'riverside': 'America/Los_Angeles', 'lexington': 'America/New_York',
-            'stockton': 'America/Los_Angeles', 'st. louis': 'America/Chicago',
-            'saint paul': 'America/Chicago', 'cincinnati': 'America/New_York',
-            'anchorage': 'America/Anchorage', 'henderson': 'America/Los_Angeles',
-            'greensboro': 'America/New_York', 'plano': 'America/Chicago',
-            'newark': 'America/New_York', 'lincoln': 'America/Chicago',
-            'buffalo': 'America/New_York', 'jersey city': 'America/New_York',
-            'chula vista': 'America/Los_Angeles', 'fort wayne': 'America/Indiana/Indianapolis',
-            'orlando': 'America/New_York', 'st. petersburg': 'America/New_York',
-            'chandler': 'America/Phoenix', 'laredo': 'America/Chicago',
-            'norfolk': 'America/New_York', 'durham': 'America/New_York',
-            'madison': 'America/Chicago', 'lubbock': 'America/Chicago',
-            'irvine': 'America/Los_Angeles', 'winston-salem': 'America/New_York',
-            'glendale': 'America/Los_Angeles', 'garland': 'America/Chicago',
-            'hialeah': 'America/New_York', 'reno': 'America/Los_Angeles',
-            'baton rouge': 'America/Chicago', 'irving': 'America/Chicago',
-            'scottsdale': 'America/Phoenix', 'fremont': 'America/Los_Angeles',
-            'boise': 'America/Boise', 'richmond': 'America/New_York',
-            'san bernardino': 'America/Los_Angeles', 'birmingham': 'America/Chicago',
-            'spokane': 'America/Los_Angeles', 'rochester': 'America/New_York',
-            'des moines': 'America/Chicago', 'modesto': 'America/Los_Angeles',
-            'fayetteville': 'America/New_York', 'tacoma': 'America/Los_Angeles',
-            'oxnard': 'America/Los_Angeles', 'fontana': 'America/Los_Angeles',
-            'columbus': 'America/New_York', 'montgomery': 'America/Chicago',
-            'moreno valley': 'America/Los_Angeles', 'shreveport': 'America/Chicago',
-            'aurora': 'America/Chicago', 'yonkers': 'America/New_York',
-            'akron': 'America/New_York', 'huntington beach': 'America/Los_Angeles',
-            'little rock': 'America/Chicago', 'augusta': 'America/New_York',
-            'amarillo': 'America/Chicago', 'glendale': 'America/Phoenix',
-            'mobile': 'America/Chicago', 'grand rapids': 'America/New_York',
-            'salt lake city': 'America/Denver', 'tallahassee': 'America/New_York',
-            'huntsville': 'America/Chicago', 'grand prairie': 'America/Chicago',
-            'knoxville': 'America/New_York', 'worcester': 'America/New_York',
-            'newport news': 'America/New_York', 'brownsville': 'America/Chicago',
-            'santa clarita': 'America/Los_Angeles', 'providence': 'America/New_York',
-            'fort lauderdale': 'America/New_York', 'chattanooga': 'America/New_York',
-            'tempe': 'America/Phoenix', 'oceanside': 'America/Los_Angeles',
-            'garden grove': 'America/Los_Angeles', 'rancho cucamonga': 'America/Los_Angeles',
-            'cape coral': 'America/New_York', 'santa rosa': 'America/Los_Angeles',
-            'vancouver': 'America/Los_Angeles', 'sioux falls': 'America/Chicago',
-            'ontario': 'America/Los_Angeles', 'mckinney': 'America/Chicago',
-            'elk grove': 'America/Los_Angeles', 'pembroke pines': 'America/New_York',
-            'salem': 'America/Los_Angeles', 'corona': 'America/Los_Angeles',
-            
-            # US States
-            'california': 'America/Los_Angeles', 'ca': 'America/Los_Angeles',
-            'new york': 'America/New_York', 'ny': 'America/New_York',
-            'texas': 'America/Chicago', 'tx': 'America/Chicago',
-            'florida': 'America/New_York', 'fl': 'America/New_York',
-            'pennsylvania': 'America/New_York', 'pa': 'America/New_York',
-            'illinois': 'America/Chicago', 'il': 'America/Chicago',
-            'ohio': 'America/New_York', 'oh': 'America/New_York',
-            'georgia': 'America/New_York', 'ga': 'America/New_York',
-            'north carolina': 'America/New_York', 'nc': 'America/New_York',
-            'michigan': 'America/Detroit', 'mi': 'America/Detroit',
-            'new jersey': 'America/New_York', 'nj': 'America/New_York',
-            'virginia': 'America/New_York', 'va': 'America/New_York',
-            'washington': 'America/Los_Angeles', 'wa': 'America/Los_Angeles',
-            'arizona': 'America/Phoenix', 'az': 'America/Phoenix',
-            'massachusetts': 'America/New_York', 'ma': 'America/New_York',
-            'tennessee': 'America/Chicago', 'tn': 'America/Chicago',
-            'indiana': 'America/Indiana/Indianapolis', 'in': 'America/Indiana/Indianapolis',
-            'missouri': 'America/Chicago', 'mo': 'America/Chicago',
-            'maryland': 'America/New_York', 'md': 'America/New_York',
-            'wisconsin': 'America/Chicago', 'wi': 'America/Chicago',
-            'colorado': 'America/Denver', 'co': 'America/Denver',
-            'minnesota': 'America/Chicago', 'mn': 'America/Chicago',
-            'south carolina': 'America/New_York', 'sc': 'America/New_York',
-            'alabama': 'America/Chicago', 'al': 'America/Chicago',
-            'louisiana': 'America/Chicago', 'la': 'America/Chicago',
-            'kentucky': 'America/New_York', 'ky': 'America/New_York',
-            'oregon': 'America/Los_Angeles', 'or': 'America/Los_Angeles',
-            'oklahoma': 'America/Chicago', 'ok': 'America/Chicago',
-            'connecticut': 'America/New_York', 'ct': 'America/New_York',
-            'utah': 'America/Denver', 'ut': 'America/Denver',
-            'iowa': 'America/Chicago', 'ia': 'America/Chicago',
-            'nevada': 'America/Los_Angeles', 'nv': 'America/Los_Angeles',
-            'arkansas': 'America/Chicago', 'ar': 'America/Chicago',
-            'mississippi': 'America/Chicago', 'ms': 'America/Chicago',
-            'kansas': 'America/Chicago', 'ks': 'America/Chicago',
-            'new mexico': 'America/Denver', 'nm': 'America/Denver',
-            'nebraska': 'America/Chicago', 'ne': 'America/Chicago',
-            'west virginia': 'America/New_York', 'wv': 'America/New_York',
-            'idaho': 'America/Boise', 'id': 'America/Boise',
-            'hawaii': 'Pacific/Honolulu', 'hi': 'Pacific/Honolulu',
-            'new hampshire': 'America/New_York', 'nh': 'America/New_York',
-            'maine': 'America/New_York', 'me': 'America/New_York',
-            'montana': 'America/Denver', 'mt': 'America/Denver',
-            'rhode island': 'America/New_York', 'ri': 'America/New_York',
-            'delaware': 'America/New_York', 'de': 'America/New_York',
-            'south dakota': 'America/Chicago', 'sd': 'America/Chicago',
-            'north dakota': 'America/Chicago', 'nd': 'America/Chicago',
-            'alaska': 'America/Anchorage', 'ak': 'America/Anchorage',
-            'vermont': 'America/New_York', 'vt': 'America/New_York',
-            'wyoming': 'America/Denver', 'wy': 'America/Denver',
-            
-            # Countries
-            'usa': 'America/New_York', 'united states': 'America/New_York',
-            'canada': 'America/Toronto', 'toronto': 'America/Toronto',
-            'vancouver': 'America/Vancouver', 'montreal': 'America/Montreal',
-            'calgary': 'America/Calgary', 'edmonton': 'America/Edmonton',
-            'ottawa': 'America/Toronto', 'winnipeg': 'America/Winnipeg',
-            'quebec': 'America/Montreal', 'hamilton': 'America/Toronto',
-            'kitchener': 'America/Toronto', 'london': 'America/Toronto',
-            'halifax': 'America/Halifax', 'victoria': 'America/Vancouver',
-            'saskatoon': 'America/Regina', 'regina': 'America/Regina',
-            
-            'uk': 'Europe/London', 'united kingdom': 'Europe/London',
-            'london': 'Europe/London', 'manchester': 'Europe/London',
-            'birmingham': 'Europe/London', 'glasgow': 'Europe/London',
-            'liverpool': 'Europe/London', 'leeds': 'Europe/London',
-            'sheffield': 'Europe/London', 'edinburgh': 'Europe/London',
-            'bristol': 'Europe/London', 'cardiff': 'Europe/London',
-            'belfast': 'Europe/London', 'newcastle': 'Europe/London',
-            
-            'germany': 'Europe/Berlin', 'berlin': 'Europe/Berlin',
-            'munich': 'Europe/Berlin', 'hamburg': 'Europe/Berlin',
-            'cologne': 'Europe/Berlin', 'frankfurt': 'Europe/Berlin',
-            'stuttgart': 'Europe/Berlin', 'düsseldorf': 'Europe/Berlin',
-            'dortmund': 'Europe/Berlin', 'essen': 'Europe/Berlin',
-            
-            'france': 'Europe/Paris', 'paris': 'Europe/Paris',
-            'marseille': 'Europe/Paris', 'lyon': 'Europe/Paris',
-            'toulouse': 'Europe/Paris', 'nice': 'Europe/Paris',
-            'nantes': 'Europe/Paris', 'montpellier': 'Europe/Paris',
-            'strasbourg': 'Europe/Paris', 'bordeaux': 'Europe/Paris',
-            
-            'australia': 'Australia/Sydney', 'sydney': 'Australia/Sydney',
-            'melbourne': 'Australia/Melbourne', 'brisbane': 'Australia/Brisbane',
-            'perth': 'Australia/Perth', 'adelaide': 'Australia/Adelaide',
-            'canberra': 'Australia/Sydney', 'darwin': 'Australia/Darwin',
-            'hobart': 'Australia/Hobart',
-            
-            'japan': 'Asia/Tokyo', 'tokyo': 'Asia/Tokyo',
-            'osaka': 'Asia/Tokyo', 'kyoto': 'Asia/Tokyo',
-            'nagoya': 'Asia/Tokyo', 'sapporo': 'Asia/Tokyo',
-            'fukuoka': 'Asia/Tokyo', 'kobe': 'Asia/Tokyo',
-            
-            'china': 'Asia/Shanghai', 'beijing': 'Asia/Shanghai',
-            'shanghai': 'Asia/Shanghai', 'guangzhou': 'Asia/Shanghai',
-            'shenzhen': 'Asia/Shanghai', 'tianjin': 'Asia/Shanghai',
-            'wuhan': 'Asia/Shanghai', 'xi\'an': 'Asia/Shanghai',
-            
-            'india': 'Asia/Kolkata', 'mumbai': 'Asia/Kolkata',
-            'delhi': 'Asia/Kolkata', 'bangalore': 'Asia/Kolkata',
-            'hyderabad': 'Asia/Kolkata', 'chennai': 'Asia/Kolkata',
-            'kolkata': 'Asia/Kolkata', 'pune': 'Asia/Kolkata',
-            
-            'brazil': 'America/Sao_Paulo', 'sao paulo': 'America/Sao_Paulo',
-            'rio de janeiro': 'America/Sao_Paulo', 'brasilia': 'America/Sao_Paulo',
-            'salvador': 'America/Sao_Paulo', 'fortaleza': 'America/Sao_Paulo',
-            
-            'mexico': 'America/Mexico_City', 'mexico city': 'America/Mexico_City',
-            'guadalajara': 'America/Mexico_City', 'monterrey': 'America/Mexico_City',
-            'puebla': 'America/Mexico_City', 'tijuana': 'America/Tijuana',
-            'juarez': 'America/Denver', 'leon': 'America/Mexico_City',
-            
-            'netherlands': 'Europe/Amsterdam', 'amsterdam': 'Europe/Amsterdam',
-            'rotterdam': 'Europe/Amsterdam', 'the hague': 'Europe/Amsterdam',
-            'utrecht': 'Europe/Amsterdam',
-            
-            'spain': 'Europe/Madrid', 'madrid': 'Europe/Madrid',
-            'barcelona': 'Europe/Madrid', 'valencia': 'Europe/Madrid',
-            'seville': 'Europe/Madrid', 'bilbao': 'Europe/Madrid',
-            
-            'italy': 'Europe/Rome', 'rome': 'Europe/Rome',
-            'milan': 'Europe/Rome', 'naples': 'Europe/Rome',
-            'turin': 'Europe/Rome', 'florence': 'Europe/Rome',
-            
-            'russia': 'Europe/Moscow', 'moscow': 'Europe/Moscow',
-            'saint petersburg': 'Europe/Moscow', 'novosibirsk': 'Asia/Novosibirsk',
-            'yekaterinburg': 'Asia/Yekaterinburg', 'nizhny novgorod': 'Europe/Moscow',
-        }
-        
-        # Check for exact matches first
-        if location in timezone_map:
-            return timezone_map[location]
-        
-        # Check for partial matches
-        for key, tz in timezone_map.items():
-            if key in location or location in key:
-                return tz
-        
-        return None
+    def get_timezone_from_location(self, location):
+        """Try to determine timezone from a space-joined location string"""
+        # Punctuation becomes spaces so "perth, australia" matches "perth";
+        # users repeat the same few locations, so resolutions are memoized
+        normalized = " ".join(location.lower().translate(LOCATION_SEPARATORS).split())
+        return resolve_location(normalized)
         
     def get_user_datetime(self, nick):
         """Get datetime in user's timezone, or server timezone if not set"""
         if nick in self.user_timezones:
             try:
-                if ZoneInfo:
-                    user_tz = ZoneInfo(self.user_timezones[nick])
-                else:
-                    # Fallback to pytz for Python < 3.9
-                    user_tz = pytz.timezone(self.user_timezones[nick])
-                return datetime.now(user_tz)
+                return datetime.now(get_zone(self.user_timezones[nick]))
             except:
                 pass
         return datetime.now()
         
-    def calculate_precision_score(self, nick, user_datetime, current_time):
+    def get_utc_offset(self, nick, current_time):
+        """Get the user's UTC offset in seconds, or the server's if not set"""
+        timezone_str = self.user_timezones.get(nick)
+        # Offsets only change on DST transitions, and those land on UTC quarter
+        # hours (Adelaide's falls at :30), so one lookup per 15 minutes will do
+        key = (timezone_str, int(current_time // 900))
+        offset = self.utc_offsets.get(key)
+        if offset is None:
+            offset = time.localtime(current_time).tm_gmtoff
+            if timezone_str:
+                try:
+                    offset = int(datetime.fromtimestamp(current_time, get_zone(timezone_str)).utcoffset().total_seconds())
+                except Exception:
+                    pass
+            if len(self.utc_offsets) >= 512:
+                self.utc_offsets.clear()
+            self.utc_offsets[key] = offset
+        return offset
+        
+    def get_user_clock(self, nick, current_time=None):
+        """Get (hour, minute, second) on the user's local clock"""
+        if current_time is None:
+            current_time = time.time()
+        local_seconds = int(current_time) + self.get_utc_offset(nick, current_time)
+        hour, remaining_seconds = divmod(local_seconds % DAY_SECONDS, 3600)
+        return (hour, *divmod(remaining_seconds, 60))
+        
+    def calculate_precision_score(self, nick, current_time):
         """Calculate precision timing score for 4:20 attempts"""
-        if nick not in self.precision_timing:
-            self.precision_timing[nick] = {
+        timing_data = self.precision_timing.get(nick)
+        if timing_data is None:
+            timing_data = self.precision_timing[nick] = {
                 'last_420_time': None,
                 'perfect_cycles': 0,
                 'total_420s': 0,
@@ -491,16 +1251,13 @@ class IRCBot:
                 'cycle_streak': 0
             }
         
-        timing_data = self.precision_timing[nick]
-        
         # Calculate how many seconds off from perfect 4:20
-        current_minute = user_datetime.minute
-        current_second = user_datetime.second
+        _, current_minute, current_second = self.get_user_clock(nick, current_time)
         
-        # Calculate seconds from 4:20:00
-        seconds_from_420 = abs((current_minute - 20) * 60 + current_second)
-        if seconds_from_420 > 30 * 60:  # If more than 30 minutes off, they're probably aiming for the other 4:20
-            seconds_from_420 = 60 * 60 - seconds_from_420
+        # Calculate seconds from 4:20:00; the distance wraps around the hour so
+        # anything more than 30 minutes off counts toward the nearer :20
+        offset = ((current_minute - 20) * 60 + current_second) % 3600
+        seconds_from_420 = min(offset, 3600 - offset)
         
         # Update best precision if this is better
         if seconds_from_420 < timing_data['best_precision']:
@@ -538,93 +1295,44 @@ class IRCBot:
     def get_precision_rank(self, seconds_off, perfect_cycles, cycle_streak):
         """Get precision rank based on timing accuracy and cycle maintenance"""
         # Base rank on precision (lower seconds = better rank)
-        if seconds_off == 0:
-            base_rank = "🏆 PERFECT CHRONOS"
-        elif seconds_off <= 5:
-            base_rank = "🥇 MASTER TIMER"
-        elif seconds_off <= 15:
-            base_rank = "🥈 EXPERT PRECISION"
-        elif seconds_off <= 30:
-            base_rank = "🥉 SKILLED TIMING"
-        elif seconds_off <= 60:
-            base_rank = "⭐ DECENT ACCURACY"
-        elif seconds_off <= 120:
-            base_rank = "💫 BASIC ATTEMPT"
-        else:
-            base_rank = "🔹 ROOKIE TIMING"
-        
-        # Enhance rank based on perfect cycles and streaks
-        if cycle_streak >= 7:
-            enhanced_rank = f"👑 LEGENDARY CYCLE MASTER - {base_rank}"
-        elif cycle_streak >= 5:
-            enhanced_rank = f"🔥 FIRE STREAK CHAMPION - {base_rank}"
-        elif cycle_streak >= 3:
-            enhanced_rank = f"⚡ LIGHTNING STREAK - {base_rank}"
-        elif perfect_cycles >= 10:
-            enhanced_rank = f"🌌 COSMIC SYNCHRONIZER - {base_rank}"
-        elif perfect_cycles >= 5:
-            enhanced_rank = f"🌀 CYCLONE MASTER - {base_rank}"
-        elif perfect_cycles >= 1:
-            enhanced_rank = f"🔄 CYCLE KEEPER - {base_rank}"
+        base_rank = PRECISION_RANKS[bisect.bisect_left(PRECISION_LIMITS, seconds_off)]
+        
+        # Enhance rank based on perfect cycles and streaks; a streak title
+        # takes precedence over a perfect-cycle title
+        streak_level = bisect.bisect_right(STREAK_LEVELS, cycle_streak)
+        if streak_level:
+            enhanced_rank = STREAK_TITLES[streak_level - 1] + base_rank
         else:
-            enhanced_rank = base_rank
+            cycle_level = bisect.bisect_right(CYCLE_LEVELS, perfect_cycles)
+            if cycle_level:
+                enhanced_rank = CYCLE_TITLES[cycle_level - 1] + base_rank
+            else:
+                enhanced_rank = base_rank
         
         return enhanced_rank
         
     def get_stoner_rank(self, seconds_abstinent):
         """Get humorous stoner ranking based on abstinence time"""
-        days = seconds_abstinent // 86400
-        hours = (seconds_abstinent % 86400) // 3600
-        minutes = (seconds_abstinent % 3600) // 60
-        
-        # Humorous stoner abstinence rankings (longest = highest rank)
-        if days >= 365:  # 1+ years
-            return "👑 LEGENDARY SOBER SAGE"
-        elif days >= 180:  # 6+ months
-            return "🧿 ENLIGHTENED MONK OF SOBRIETY"
-        elif days >= 90:   # 3+ months
-            return "🧘 ZEN MASTER OF RESTRAINT"
-        elif days >= 30:   # 1+ months
-            return "🌱 CANNABIS CLEANSE CHAMPION"
-        elif days >= 14:   # 2+ weeks
-            return "🏆 T-BREAK TITAN"
-        elif days >= 7:    # 1+ weeks
-            return "🥇 WILLPOWER WARRIOR"
-        elif days >= 3:    # 3+ days
-            return "🥈 ABSTINENCE APPRENTICE"
-        elif days >= 1:    # 1+ days
-            return "🥉 SOBER SOLDIER"
-        elif hours >= 12:  # 12+ hours
-            return "⭐ HALF-DAY HERO"
-        elif hours >= 6:   # 6+ hours
-            return "🌅 SUNRISE SURVIVOR"
-        elif hours >= 3:   # 3+ hours
-            return "🕰️ THREE-HOUR TROUPER"
-        elif hours >= 1:   # 1+ hours
-            return "⏰ HOURLY HOLDOUT"
-        elif minutes >= 30: # 30+ minutes
-            return "💫 HALF-HOUR HUSTLER"
-        elif minutes >= 15: # 15+ minutes
-            return "🔕 QUARTER-HOUR QUITTER"
-        elif minutes >= 5:  # 5+ minutes
-            return "🚀 FIVE-MINUTE FIGHTER"
-        elif minutes >= 1:  # 1+ minutes
-            return "🔹 MINUTE-MAN ROOKIE"
-        else:               # Under 1 minute
-            return "🍃 FRESH TOKER"
+        return STONER_RANKS[bisect.bisect_right(STONER_RANK_SECONDS, seconds_abstinent)]
         
     def connect(self):
         """Connect to the IRC server"""
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.connect((self.server, self.port))
+            self.socket.connect((self.config.server, self.config.port))
+            # Send small replies like PONG immediately instead of waiting on Nagle
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # Reads wait on a selector in listen(); the timeout only bounds sends
+            self.socket.settimeout(SEND_TIMEOUT)
             self.connected = True
             
             # Send IRC connection commands
-            self.send_raw(f"NICK {self.nickname}")
-            self.send_raw(f"USER {self.username} 0 * :{self.realname}")
+            self.send_many([
+                f"NICK {self.config.nickname}",
+                f"USER {self.config.username} 0 * :{self.config.realname}",
+            ])
             
-            self.logger.info(f"Connected to {self.server}:{self.port}")
+            self.logger.info(f"Connected to {self.config.server}:{self.config.port}")
             return True
             
         except Exception as e:
@@ -633,923 +1341,621 @@ class IRCBot:
             
     def send_raw(self, message):
         """Send raw IRC message"""
+        self.send_raw_bytes((message + "\r\n").encode('utf-8'))
+            
+    def send_raw_bytes(self, data):
+        """Send an already encoded IRC line (including CRLF)"""
         if self.socket:
             try:
-                full_message = message + "\r\n"
-                self.socket.send(full_message.encode('utf-8'))
-                self.logger.debug(f"SENT: {message}")
+                with self.send_lock:
+                    self.socket.sendall(data)
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("SENT: %s", data[:-2].decode('utf-8', errors='replace'))
+            except (OSError, BrokenPipeError) as e:
+                self.logger.error(f"Failed to send message: {e}")
+                self.connected = False
+            
+    def send_many(self, messages):
+        """Send several raw IRC messages, in a single syscall where possible"""
+        buffers = [(message + "\r\n").encode('utf-8') for message in messages]
+        if self.socket:
+            try:
+                with self.send_lock:
+                    if HAS_SENDMSG:
+                        sent = self.socket.sendmsg(buffers)
+                        if sent < sum(len(buf) for buf in buffers):
+                            self.socket.sendall(b"".join(buffers)[sent:])
+                    else:
+                        self.socket.sendall(b"".join(buffers))
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    for message in messages:
+                        self.logger.debug("SENT: %s", message)
             except (OSError, BrokenPipeError) as e:
                 self.logger.error(f"Failed to send message: {e}")
                 self.connected = False
             
     def send_message(self, channel, message):
         """Send message to a channel"""
-        self.send_raw(f"PRIVMSG {channel} :{message}")
-        
-    def join_channel(self, channel):
-        """Join a channel"""
-        self.send_raw(f"JOIN {channel}")
-        self.logger.info(f"Joined {channel}")
-        
-    def handle_ping(self, message):
-        """Handle PING messages from server"""
-        if message.startswith("PING"):
-            pong_message = message.replace("PING", "PONG", 1)
-            self.send_raw(pong_message)
+        # Built with its CRLF in one f-string rather than via send_raw's concat
+        self.send_privmsg(f"PRIVMSG {channel} :{message}\r\n".encode('utf-8'))
+        
+    def send_privmsg(self, data):
+        """Queue an encoded PRIVMSG line for the sender, or send it directly if none is running"""
+        if self.sender_thread:
+            self.send_queue.put(data)
+        else:
+            self.send_raw_bytes(data)
+        
+    def send_cached_message(self, channel, message):
+        """Send a fixed-text message, reusing its encoded bytes on repeat sends"""
+        key = (channel, message)
+        data = self.encoded_messages.get(key)
+        if data is None:
+            data = f"PRIVMSG {channel} :{message}\r\n".encode('utf-8')
+            self.encoded_messages[key] = data
+        self.send_privmsg(data)
+        
+    def handle_ping(self, line):
+        """Handle PING messages (raw bytes) from server"""
+        if line.startswith(b"PING"):
+            # Servers send the same token every time, so the reply is cached
+            pong = self.pong_cache.get(line)
+            if pong is None:
+                if len(self.pong_cache) >= 8:
+                    self.pong_cache.clear()
+                pong = b"PONG" + line[4:] + b"\r\n"
+                self.pong_cache[line] = pong
+            self.send_raw_bytes(pong)
             
     def parse_message(self, raw_message):
-        """Parse IRC message and extract components"""
-        parts = raw_message.split(' ', 3)
-        if len(parts) < 3:
+        """Parse a raw IRC line (bytes) and extract components"""
+        match = IRC_LINE_RE.match(raw_message)
+        if match is None:
             return None
-            
-        prefix = parts[0][1:] if parts[0].startswith(':') else ""
-        command = parts[1]
-        target = parts[2]
-        message = parts[3][1:] if len(parts) > 3 and parts[3].startswith(':') else ""
-        
-        # Extract nickname from prefix
-        nick = prefix.split('!')[0] if '!' in prefix else ""
+        nick, command, target, message = match.groups()
         
+        # Only the fields that are returned get decoded; the trailing text
+        # stays as bytes and command handling decodes what it uses. Nicks and
+        # channels key most state dicts, so interned copies let repeat
+        # lookups match on identity
         return {
-            'prefix': prefix,
-            'nick': nick,
-            'command': command,
-            'target': target,
-            'message': message,
-            'raw': raw_message
+            'nick': sys.intern(nick.decode('utf-8', errors='ignore')) if nick is not None else "",
+            'command': command.decode('utf-8', errors='ignore'),
+            'target': sys.intern(target.decode('utf-8', errors='ignore')),
+            'message': message if message is not None else b""
         }
         
+    def split_command(self, message):
+        """Split raw message bytes into (command, raw args), or (None, None)"""
+        if not message.startswith(self.command_prefix_bytes):
+            return None, None
+        
+        # Split off only the command word; the args are decoded on demand
+        parts = message[len(self.command_prefix_bytes):].split(None, 1)
+        if not parts:
+            return None, None
+        command = parts[0].decode('utf-8', errors='ignore').lower()
+        return command, parts[1] if len(parts) > 1 else b""
+        
     def handle_command(self, parsed_msg):
         """Handle bot commands"""
-        if not parsed_msg['message'].startswith(self.command_prefix):
+        command, raw_args = self.split_command(parsed_msg['message'])
+        if command is None:
             return
-            
-        command_parts = parsed_msg['message'][1:].split()
-        command = command_parts[0].lower()
-        args = command_parts[1:] if len(command_parts) > 1 else []
         
         nick = parsed_msg['nick']
         channel = parsed_msg['target']
         
-        if command == "bud-zone":
-            if not args:
-                # Show current timezone
-                if nick in self.user_timezones:
-                    current_tz = self.user_timezones[nick]
-                    user_dt = self.get_user_datetime(nick)
-                    self.send_message(channel, f"{nick}: Your bud-zone is set to {current_tz} (currently {user_dt.strftime('%I:%M %p %Z')} 🌍🌿)")
-                else:
-                    self.send_message(channel, f"{nick}: You haven't set a bud-zone yet! Use: !bud-zone <city state country> 🌍🌿")
+        handler = self.command_handlers.get(command)
+        if handler:
+            # Most commands take no arguments; they share one empty tuple
+            args = raw_args.decode('utf-8', errors='ignore').split() if raw_args else NO_ARGS
+            handler(nick, channel, args)
+        elif command in TOKE_ALIASES:
+            # Silent toke tracking
+            self.record_toke(nick, parsed_msg['time'])
+
+    def record_toke(self, nick, current_time=None):
+        """Record a toke for the user and update their abstinence stats"""
+        if current_time is None:
+            current_time = time.time()
+        
+        # Update longest abstinence record if applicable; each table is
+        # probed once per toke
+        last_toke = self.toke_data.get(nick)
+        if last_toke is not None:
+            time_diff_seconds = int(current_time - last_toke)
+            longest = self.longest_abstinence.get(nick)
+            if longest is None or time_diff_seconds > longest:
+                self.longest_abstinence[nick] = time_diff_seconds
+        else:
+            self.longest_abstinence[nick] = 0
+        
+        # Update toke count
+        self.toke_counts[nick] = self.toke_counts.get(nick, 0) + 1
+        
+        # Add to toke history for gap tracking
+        self.toke_history.setdefault(nick, []).append(current_time)
+        
+        self.toke_data[nick] = current_time
+        self.save_toke_data(nick)
+
+    def cmd_bud_zone(self, nick, channel, args):
+        """Show or set the user's bud-zone (timezone)"""
+        if not args:
+            # Show current timezone
+            if nick in self.user_timezones:
+                current_tz = self.user_timezones[nick]
+                user_dt = self.get_user_datetime(nick)
+                self.send_message(channel, f"{nick}: Your bud-zone is set to {current_tz} (currently {format_clock(user_dt)} 🌍🌿)")
             else:
-                # Set timezone based on location
-                location_str = " ".join(args)
-                timezone = self.get_timezone_from_location(args)
-                
-                if timezone:
-                    self.user_timezones[nick] = timezone
-                    self.save_toke_data()
-                    user_dt = self.get_user_datetime(nick)
-                    self.send_message(channel, f"{nick}: Bud-zone set to {location_str} ({timezone}) - {user_dt.strftime('%I:%M %p %Z')} 🌍🌿")
-                else:
-                    self.send_message(channel, f"{nick}: Sorry, couldn't find timezone for '{location_str}'. Try: city, state, country (e.g., 'Los Angeles CA', 'London UK', 'Tokyo Japan') 🌍🌿")
-            
-        elif command == "strain":
-            # Cannabis strain information lookup
-            if not args:
-                self.send_message(channel, f"{nick}: Use !strain <strain_name> to get info about a cannabis strain! Example: !strain Blue Dream 🌿")
-                return
-            
-            strain_name = " ".join(args).lower()
-            
-            # Cannabis strain database - Comprehensive collection of 150+ strains
-            strain_db = {
-                # Classic & Legendary Strains
-                "blue dream": "Hybrid 🌿 Blue Dream is a sativa-dominant hybrid with balanced full-body relaxation and gentle cerebral invigoration. Perfect for daytime use with creative energy. THC: 17-24% | Effects: Happy, Relaxed, Euphoric, Creative | Flavors: Sweet berry, blueberry",
-                "og kush": "Hybrid 🌿 OG Kush is a legendary strain with distinct earthy, pine and woody flavors. Delivers heavy-hitting euphoria and relaxation. THC: 20-26% | Effects: Euphoric, Happy, Relaxed, Uplifted | Flavors: Earthy, pine, woody",
-                "sour diesel": "Sativa 🌿 Sour Diesel (Sour D) is a fast-acting energizing strain with dreamy cerebral effects. Great for stress relief. THC: 20-25% | Effects: Energetic, Creative, Euphoric, Uplifted | Flavors: Diesel, pungent, citrus",
-                "girl scout cookies": "Hybrid 🌿 GSC delivers euphoria and full-body relaxation. Known for sweet and earthy aromas. THC: 25-28% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Sweet, earthy, mint",
-                "gsc": "Hybrid 🌿 GSC delivers euphoria and full-body relaxation. Known for sweet and earthy aromas. THC: 25-28% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Sweet, earthy, mint",
-                "granddaddy purple": "Indica 🌿 Granddaddy Purple (GDP) combines Mendo Purps, Skunk, and Afghan genetics for potent indica effects. Deep relaxation. THC: 17-24% | Effects: Relaxed, Sleepy, Euphoric, Happy | Flavors: Grape, berry, sweet",
-                "gdp": "Indica 🌿 Granddaddy Purple (GDP) combines Mendo Purps, Skunk, and Afghan genetics for potent indica effects. Deep relaxation. THC: 17-24% | Effects: Relaxed, Sleepy, Euphoric, Happy | Flavors: Grape, berry, sweet",
-                "white widow": "Hybrid 🌿 White Widow is a balanced hybrid with powerful bursts of euphoria and energy. Legendary since the 90s. THC: 18-25% | Effects: Energetic, Euphoric, Creative, Uplifted | Flavors: Earthy, woody, pine",
-                "northern lights": "Indica 🌿 Northern Lights is a pure indica with fast-acting psychoactive effects. One of the most famous strains. THC: 16-21% | Effects: Relaxed, Sleepy, Euphoric, Happy | Flavors: Sweet, spicy, earthy",
-                "jack herer": "Sativa 🌿 Jack Herer is a blissful, clear-headed and creative sativa strain. Named after the cannabis activist. THC: 18-24% | Effects: Energetic, Creative, Euphoric, Uplifted | Flavors: Earthy, pine, woody",
-                "green crack": "Sativa 🌿 Green Crack provides invigorating mental buzz and sharp energy. Great for daytime use. THC: 15-25% | Effects: Energetic, Focused, Creative, Happy | Flavors: Sweet, citrus, fruity",
-                "ak-47": "Hybrid 🌿 AK-47 is a sativa-dominant hybrid that delivers steady cerebral buzz with mellow relaxation. Long-lasting. THC: 13-20% | Effects: Relaxed, Happy, Euphoric, Creative | Flavors: Earthy, sweet, pungent",
-                "durban poison": "Sativa 🌿 Durban Poison is a pure sativa with energetic, uplifting effects. Perfect for staying productive. THC: 15-25% | Effects: Energetic, Happy, Focused, Creative | Flavors: Sweet, earthy, pine",
-                "pineapple express": "Hybrid 🌿 Pineapple Express delivers long-lasting energetic buzz. Made famous by the movie. THC: 17-24% | Effects: Energetic, Happy, Euphoric, Creative | Flavors: Tropical, pineapple, citrus",
-                "acapulco gold": "Sativa 🌿 Acapulco Gold is a legendary strain with euphoric, energizing effects. Rare and potent. THC: 15-24% | Effects: Energetic, Euphoric, Happy, Creative | Flavors: Earthy, sweet, toffee",
-                "maui wowie": "Sativa 🌿 Maui Wowie brings tropical euphoria and creative energy. Classic Hawaiian strain. THC: 13-19% | Effects: Energetic, Creative, Happy, Euphoric | Flavors: Tropical, pineapple, sweet",
-                "purple haze": "Sativa 🌿 Purple Haze delivers dreamy cerebral high with creativity. Made famous by Jimi Hendrix. THC: 15-20% | Effects: Energetic, Creative, Euphoric, Happy | Flavors: Sweet, berry, earthy",
-                
-                # Modern Hybrids & Crosses
-                "gorilla glue": "Hybrid 🌿 Gorilla Glue #4 delivers heavy-handed euphoria and relaxation. Very potent and sticky. THC: 25-30% | Effects: Relaxed, Euphoric, Happy, Sleepy | Flavors: Earthy, pungent, pine",
-                "gg4": "Hybrid 🌿 Gorilla Glue #4 delivers heavy-handed euphoria and relaxation. Very potent and sticky. THC: 25-30% | Effects: Relaxed, Euphoric, Happy, Sleepy | Flavors: Earthy, pungent, pine",
-                "gelato": "Hybrid 🌿 Gelato is a sweet, dessert-like strain with euphoric and relaxing effects. Very flavorful. THC: 20-26% | Effects: Euphoric, Relaxed, Happy, Creative | Flavors: Sweet, berry, lavender",
-                "wedding cake": "Indica 🌿 Wedding Cake provides calming and euphoric effects. Rich, tangy flavor profile. THC: 21-27% | Effects: Relaxed, Euphoric, Happy, Calm | Flavors: Sweet, earthy, vanilla",
-                "runtz": "Hybrid 🌿 Runtz provides euphoric high with fruity, candy-like flavors. Evenly balanced. THC: 19-29% | Effects: Relaxed, Euphoric, Happy, Calm | Flavors: Fruity, sweet, tropical",
-                "zkittlez": "Indica 🌿 Zkittlez offers fruity, tropical flavors with calming, happy effects. Award-winning strain. THC: 15-23% | Effects: Relaxed, Happy, Euphoric, Calm | Flavors: Fruity, tropical, sweet",
-                "mac": "Hybrid 🌿 Miracle Alien Cookies (MAC) delivers uplifting and balancing effects. Unique flavor. THC: 20-25% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Citrus, floral, herbal",
-                "do-si-dos": "Indica 🌿 Do-Si-Dos delivers heavy stoning body high and cerebral euphoria. Very potent. THC: 19-30% | Effects: Relaxed, Euphoric, Sleepy, Happy | Flavors: Sweet, earthy, floral",
-                "wedding crasher": "Hybrid 🌿 Wedding Crasher blends Wedding Cake and Purple Punch for sweet relaxation. THC: 18-25% | Effects: Relaxed, Happy, Euphoric, Sleepy | Flavors: Grape, vanilla, sweet",
-                "ice cream cake": "Indica 🌿 Ice Cream Cake delivers sedating effects with creamy vanilla flavors. Very relaxing. THC: 20-25% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Vanilla, cream, sweet",
-                "biscotti": "Indica 🌿 Biscotti provides powerful relaxation with sweet, spicy cookie flavors. THC: 21-25% | Effects: Relaxed, Euphoric, Happy, Calm | Flavors: Sweet, spicy, nutty",
-                "london pound cake": "Indica 🌿 London Pound Cake delivers relaxing body high with sweet berry flavors. THC: 20-26% | Effects: Relaxed, Happy, Sleepy, Euphoric | Flavors: Berry, sweet, lemon",
-                "jealousy": "Hybrid 🌿 Jealousy combines Gelato 41 with Sherbet for balanced euphoric effects. THC: 20-28% | Effects: Euphoric, Relaxed, Happy, Creative | Flavors: Sweet, earthy, citrus",
-                
-                # Kush Family
-                "bubba kush": "Indica 🌿 Bubba Kush delivers tranquilizing relaxation with sweet hashish flavors. Heavy indica. THC: 14-22% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Earthy, sweet, hash",
-                "skywalker og": "Indica 🌿 Skywalker OG blends potent OG Kush with Skywalker for heavy relaxation. Strong indica. THC: 20-26% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Spicy, herbal, earthy",
-                "pink kush": "Indica 🌿 Pink Kush delivers powerful body high with sweet vanilla and floral flavors. THC: 18-25% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Sweet, vanilla, floral",
-                "critical kush": "Indica 🌿 Critical Kush combines OG Kush and Critical Mass for sedating body effects. THC: 20-25% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Earthy, spicy, pine",
-                "banana kush": "Hybrid 🌿 Banana Kush blends Ghost OG and Skunk Haze for tropical relaxation. THC: 18-25% | Effects: Happy, Euphoric, Relaxed, Uplifted | Flavors: Banana, tropical, sweet",
-                "master kush": "Indica 🌿 Master Kush is a Dutch classic with sharp earthy, citrus flavors and full-body relaxation. THC: 20-24% | Effects: Relaxed, Happy, Sleepy, Euphoric | Flavors: Earthy, citrus, pungent",
-                "platinum kush": "Indica 🌿 Platinum Kush delivers strong sedation with earthy, hashy flavors. Very potent. THC: 18-24% | Effects: Relaxed, Sleepy, Happy, Calm | Flavors: Earthy, hash, spicy",
-                "hindu kush": "Indica 🌿 Hindu Kush is a pure landrace indica from the Hindu Kush mountains. Deep relaxation. THC: 15-20% | Effects: Relaxed, Sleepy, Happy, Calm | Flavors: Earthy, sweet, sandalwood",
-                "purple kush": "Indica 🌿 Purple Kush is a pure indica with long-lasting physical relaxation and blissful effects. THC: 17-27% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Grape, earthy, sweet",
-                "kosher kush": "Indica 🌿 Kosher Kush is a potent indica with rich earthy and fruity flavors. Award winner. THC: 20-25% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Earthy, fruity, pine",
-                
-                # Cookies & Dessert Strains
-                "cookies": "Hybrid 🌿 Cookies family strains deliver euphoria and full-body relaxation. Sweet earthy flavors. THC: 20-28% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Sweet, earthy, nutty",
-                "thin mint cookies": "Hybrid 🌿 Thin Mint GSC delivers minty, sweet flavors with powerful euphoric effects. THC: 20-24% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Mint, sweet, earthy",
-                "animal cookies": "Hybrid 🌿 Animal Cookies crosses GSC with Fire OG for powerful sedating effects. THC: 20-27% | Effects: Relaxed, Happy, Euphoric, Sleepy | Flavors: Sweet, sour, earthy",
-                "cereal milk": "Hybrid 🌿 Cereal Milk tastes like sweet milk and ice cream with balanced hybrid effects. THC: 18-23% | Effects: Happy, Relaxed, Euphoric, Calm | Flavors: Cream, sweet, berry",
-                "birthday cake": "Hybrid 🌿 Birthday Cake delivers euphoric relaxation with sweet vanilla and creamy flavors. THC: 21-26% | Effects: Relaxed, Happy, Euphoric, Creative | Flavors: Vanilla, sweet, cream",
-                
-                # Purple & Berry Strains
-                "purple punch": "Indica 🌿 Purple Punch delivers sedating body high with sweet grape and blueberry flavors. THC: 18-25% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Grape, blueberry, sweet",
-                "cherry pie": "Hybrid 🌿 Cherry Pie combines sweet cherry and earthy flavors with relaxing, euphoric effects. THC: 16-24% | Effects: Relaxed, Happy, Euphoric, Creative | Flavors: Cherry, sweet, earthy",
-                "forbidden fruit": "Indica 🌿 Forbidden Fruit brings deep relaxation with cherry, lemon and tropical flavors. THC: 18-26% | Effects: Relaxed, Euphoric, Happy, Sleepy | Flavors: Cherry, lemon, tropical",
-                "blueberry": "Indica 🌿 Blueberry is a legendary strain with sweet berry flavors and relaxing body effects. THC: 16-24% | Effects: Relaxed, Happy, Euphoric, Sleepy | Flavors: Blueberry, sweet, berry",
-                "blackberry kush": "Indica 🌿 Blackberry Kush delivers powerful body effects with sweet berry and diesel flavors. THC: 16-20% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Berry, diesel, earthy",
-                "grape ape": "Indica 🌿 Grape Ape provides deep relaxation with distinct grape and berry flavors. THC: 18-25% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Grape, berry, sweet",
-                "strawberry cough": "Sativa 🌿 Strawberry Cough delivers energetic cerebral high with sweet strawberry flavor. THC: 15-20% | Effects: Energetic, Happy, Euphoric, Uplifted | Flavors: Strawberry, sweet, berry",
-                
-                # Citrus & Haze Strains
-                "tangie": "Sativa 🌿 Tangie provides uplifting euphoria with refreshing citrus tangerine flavors. THC: 19-22% | Effects: Energetic, Happy, Creative, Euphoric | Flavors: Citrus, tangerine, sweet",
-                "super lemon haze": "Sativa 🌿 Super Lemon Haze provides energetic, talkative euphoria with zesty citrus flavor. THC: 16-22% | Effects: Energetic, Happy, Euphoric, Uplifted | Flavors: Lemon, citrus, sweet",
-                "lemon haze": "Sativa 🌿 Lemon Haze delivers creative energy with strong lemon and citrus flavors. THC: 15-21% | Effects: Energetic, Happy, Euphoric, Creative | Flavors: Lemon, citrus, sweet",
-                "amnesia haze": "Sativa 🌿 Amnesia Haze is a potent sativa with uplifting cerebral effects and citrus flavors. THC: 20-25% | Effects: Energetic, Euphoric, Creative, Happy | Flavors: Citrus, earthy, spicy",
-                "orange cookies": "Hybrid 🌿 Orange Cookies blends Orange Juice with GSC for citrus-sweet relaxation. THC: 20-25% | Effects: Happy, Relaxed, Euphoric, Creative | Flavors: Orange, sweet, citrus",
-                "mimosa": "Sativa 🌿 Mimosa delivers uplifting effects with sweet citrus and tropical fruit flavors. THC: 19-27% | Effects: Energetic, Happy, Euphoric, Focused | Flavors: Citrus, tropical, sweet",
-                "clementine": "Sativa 🌿 Clementine provides energetic focus with sweet orange and citrus flavors. THC: 17-27% | Effects: Energetic, Focused, Happy, Creative | Flavors: Citrus, orange, sweet",
-                
-                # Diesel & Chem Strains
-                "chemdog": "Hybrid 🌿 Chemdog delivers powerful cerebral effects with diesel, chemical aromas. Legendary genetics. THC: 20-25% | Effects: Euphoric, Relaxed, Creative, Happy | Flavors: Diesel, pungent, earthy",
-                "chemdawg": "Hybrid 🌿 Chemdawg delivers powerful cerebral effects with diesel, chemical aromas. Legendary genetics. THC: 20-25% | Effects: Euphoric, Relaxed, Creative, Happy | Flavors: Diesel, pungent, earthy",
-                "stardawg": "Hybrid 🌿 Stardawg blends Chemdawg 4 with Tres Dawg for potent diesel effects. THC: 18-23% | Effects: Energetic, Euphoric, Happy, Uplifted | Flavors: Diesel, pungent, pine",
-                "headband": "Hybrid 🌿 Headband crosses OG Kush with Sour Diesel for unique pressure-like effects. THC: 20-27% | Effects: Relaxed, Euphoric, Happy, Creative | Flavors: Lemon, diesel, earthy",
-                "nyc diesel": "Sativa 🌿 NYC Diesel provides energizing effects with grapefruit and diesel flavors. THC: 14-21% | Effects: Energetic, Euphoric, Creative, Happy | Flavors: Diesel, grapefruit, citrus",
-                
-                # Exotic & Tropical Strains
-                "banana og": "Indica 🌿 Banana OG provides peaceful, laid-back effects with tropical banana flavor. THC: 16-23% | Effects: Relaxed, Happy, Euphoric, Sleepy | Flavors: Banana, tropical, sweet",
-                "sunset sherbet": "Indica 🌿 Sunset Sherbet provides full-body relaxation with sweet berry and citrus flavors. THC: 15-24% | Effects: Relaxed, Happy, Euphoric, Creative | Flavors: Sweet, berry, citrus",
-                "tropicana cookies": "Hybrid 🌿 Tropicana Cookies delivers uplifting effects with tropical citrus and cookie flavors. THC: 22-28% | Effects: Energetic, Happy, Euphoric, Creative | Flavors: Citrus, tropical, sweet",
-                "mango kush": "Hybrid 🌿 Mango Kush blends mango and banana flavors with euphoric, relaxing effects. THC: 11-20% | Effects: Happy, Euphoric, Relaxed, Uplifted | Flavors: Mango, banana, tropical",
-                "pineapple kush": "Hybrid 🌿 Pineapple Kush delivers tropical euphoria with sweet pineapple flavors. THC: 16-25% | Effects: Happy, Relaxed, Euphoric, Creative | Flavors: Pineapple, tropical, sweet",
-                "papaya": "Indica 🌿 Papaya provides sweet tropical relaxation with fruity papaya flavors. THC: 18-25% | Effects: Relaxed, Happy, Euphoric, Sleepy | Flavors: Tropical, fruity, sweet",
-                
-                # High THC Powerhouses
-                "god's gift": "Indica 🌿 God's Gift delivers powerful body effects with grape, citrus and hash flavors. THC: 18-27% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Grape, citrus, hash",
-                "death star": "Indica 🌿 Death Star provides powerful euphoria and deep relaxation. Diesel and earthy flavors. THC: 20-27% | Effects: Relaxed, Euphoric, Happy, Sleepy | Flavors: Diesel, earthy, pungent",
-                "the white": "Hybrid 🌿 The White is covered in trichomes and delivers potent euphoric effects. THC: 20-28% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Earthy, woody, pine",
-                "white fire og": "Hybrid 🌿 White Fire OG (WiFi OG) provides potent euphoria with sour, earthy flavors. THC: 22-30% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Sour, earthy, diesel",
-                "ghost train haze": "Sativa 🌿 Ghost Train Haze is one of the most potent sativas with citrus and floral notes. THC: 25-28% | Effects: Energetic, Euphoric, Creative, Happy | Flavors: Citrus, floral, pine",
-                "bruce banner": "Hybrid 🌿 Bruce Banner delivers powerful euphoric effects. Named after the Hulk. Very strong. THC: 24-30% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Diesel, sweet, earthy",
-                
-                # Balanced & Medicinal
-                "harlequin": "Sativa 🌿 Harlequin is a high-CBD strain with clear-headed, relaxed effects. Great for pain. THC: 7-15% CBD: 10-16% | Effects: Relaxed, Focused, Happy, Calm | Flavors: Earthy, mango, sweet",
-                "cannatonic": "Hybrid 🌿 Cannatonic is a high-CBD strain with mild euphoria and deep relaxation. THC: 7-15% CBD: 12-17% | Effects: Relaxed, Happy, Calm, Focused | Flavors: Earthy, citrus, pine",
-                "acdc": "Sativa 🌿 ACDC is a high-CBD strain with minimal psychoactive effects. Great for daytime. THC: 1-6% CBD: 16-24% | Effects: Relaxed, Focused, Calm, Clear | Flavors: Earthy, woody, pine",
-                "charlotte's web": "Sativa 🌿 Charlotte's Web is famous high-CBD strain with minimal THC. Medicinal powerhouse. THC: 0.3% CBD: 17-20% | Effects: Relaxed, Calm, Clear, Focused | Flavors: Earthy, pine, sweet",
-                
-                # Classic Landrace & Old School
-                "thai stick": "Sativa 🌿 Thai Stick is a pure landrace sativa from Thailand with energetic, cerebral effects. THC: 16-24% | Effects: Energetic, Euphoric, Creative, Happy | Flavors: Earthy, citrus, tropical",
-                "afghan kush": "Indica 🌿 Afghan Kush is a pure indica landrace with heavy sedation and earthy flavors. THC: 17-22% | Effects: Relaxed, Sleepy, Happy, Calm | Flavors: Earthy, sweet, spicy",
-                "panama red": "Sativa 🌿 Panama Red is a classic landrace with uplifting, psychedelic effects. THC: 14-18% | Effects: Energetic, Euphoric, Creative, Happy | Flavors: Earthy, spicy, sweet",
-                "lambs bread": "Sativa 🌿 Lamb's Bread (Lamb's Breath) is a Jamaican landrace with energizing effects. THC: 16-21% | Effects: Energetic, Euphoric, Creative, Happy | Flavors: Earthy, cheese, herbal",
-                "colombian gold": "Sativa 🌿 Colombian Gold is a classic landrace sativa with uplifting, creative effects. THC: 15-20% | Effects: Energetic, Happy, Creative, Euphoric | Flavors: Skunky, sweet, lemon",
-                
-                # More Modern Favorites
-                "trainwreck": "Hybrid 🌿 Trainwreck hits like a freight train with potent sativa effects. Euphoric and creative. THC: 18-25% | Effects: Energetic, Euphoric, Creative, Happy | Flavors: Lemon, pine, earthy",
-                "larry og": "Indica 🌿 Larry OG (Lemon Larry) delivers strong relaxation with citrus and pine flavors. THC: 20-27% | Effects: Relaxed, Happy, Euphoric, Sleepy | Flavors: Lemon, pine, earthy",
-                "sfv og": "Hybrid 🌿 SFV OG (San Fernando Valley OG) provides potent euphoria with earthy pine flavors. THC: 19-25% | Effects: Euphoric, Relaxed, Happy, Creative | Flavors: Pine, lemon, earthy",
-                "fire og": "Hybrid 🌿 Fire OG is one of the strongest OG strains with powerful sedating effects. THC: 20-26% | Effects: Relaxed, Euphoric, Happy, Sleepy | Flavors: Lemon, earthy, spicy",
-                "tahoe og": "Hybrid 🌿 Tahoe OG delivers powerful body effects with earthy lemon flavors. THC: 18-25% | Effects: Relaxed, Happy, Euphoric, Sleepy | Flavors: Lemon, earthy, pine",
-                "platinum og": "Indica 🌿 Platinum OG is a potent indica with coffee and floral notes. Heavy relaxation. THC: 20-24% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Coffee, floral, pine",
-                "louis xiii": "Indica 🌿 Louis XIII (Louie XIII OG) is a rare, potent OG with earthy pine flavors. THC: 22-28% | Effects: Relaxed, Sleepy, Euphoric, Happy | Flavors: Pine, earthy, woody",
-                "gushers": "Indica 🌿 Gushers delivers tropical fruity flavors with relaxing, euphoric effects. THC: 17-22% | Effects: Relaxed, Happy, Euphoric, Sleepy | Flavors: Tropical, fruity, sweet",
-                "apple fritter": "Hybrid 🌿 Apple Fritter combines apple pastry flavors with balanced euphoric effects. THC: 22-28% | Effects: Relaxed, Happy, Euphoric, Creative | Flavors: Apple, sweet, earthy",
-                "gary payton": "Hybrid 🌿 Gary Payton blends The Y with Snowman for potent diesel-sweet effects. THC: 20-25% | Effects: Euphoric, Relaxed, Happy, Creative | Flavors: Diesel, sweet, spicy",
-                "slurricane": "Indica 🌿 Slurricane delivers heavy relaxation with sweet berry and grape flavors. THC: 20-28% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Berry, grape, sweet",
-                "candy rain": "Hybrid 🌿 Candy Rain provides sweet fruity flavors with balanced euphoric effects. THC: 18-24% | Effects: Happy, Relaxed, Euphoric, Creative | Flavors: Fruity, sweet, berry",
-                "candy land": "Sativa 🌿 Candyland delivers energetic euphoria with sweet earthy flavors. THC: 19-24% | Effects: Energetic, Happy, Euphoric, Creative | Flavors: Sweet, earthy, spicy",
-                "cherry garcia": "Hybrid 🌿 Cherry Garcia blends cherry flavors with balanced relaxing effects. THC: 18-22% | Effects: Relaxed, Happy, Euphoric, Creative | Flavors: Cherry, sweet, earthy",
-                "jet fuel": "Hybrid 🌿 Jet Fuel (G6) delivers powerful diesel effects with energizing buzz. THC: 18-22% | Effects: Energetic, Euphoric, Happy, Creative | Flavors: Diesel, pine, skunk",
-                "king louis": "Indica 🌿 King Louis XIII provides royal relaxation with pine and earthy flavors. THC: 20-28% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Pine, earthy, woody",
-                "la confidential": "Indica 🌿 LA Confidential delivers smooth earthy flavors with deep relaxation. THC: 19-25% | Effects: Relaxed, Sleepy, Happy, Calm | Flavors: Earthy, pine, skunk",
-                "mendo breath": "Indica 🌿 Mendo Breath provides sweet vanilla caramel with heavy sedation. THC: 19-24% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Vanilla, caramel, sweet",
-                "motorbreath": "Indica 🌿 Motorbreath delivers powerful diesel and earthy relaxation. Very potent. THC: 20-28% | Effects: Relaxed, Euphoric, Happy, Sleepy | Flavors: Diesel, earthy, chemical",
-                "ninja fruit": "Hybrid 🌿 Ninja Fruit blends fruity strawberry with balanced euphoric effects. THC: 17-22% | Effects: Happy, Relaxed, Euphoric, Creative | Flavors: Strawberry, fruity, sweet",
-                "obama kush": "Indica 🌿 Obama Kush delivers presidential relaxation with earthy pine flavors. THC: 14-21% | Effects: Relaxed, Sleepy, Happy, Calm | Flavors: Earthy, pine, grape",
-                "purple trainwreck": "Hybrid 🌿 Purple Trainwreck blends grape flavors with energetic euphoria. THC: 18-23% | Effects: Energetic, Happy, Euphoric, Creative | Flavors: Grape, earthy, sweet",
-                "raspberry kush": "Indica 🌿 Raspberry Kush delivers sweet berry with relaxing body effects. THC: 15-24% | Effects: Relaxed, Happy, Sleepy, Euphoric | Flavors: Raspberry, sweet, berry",
-                "scout cookies": "Hybrid 🌿 Scout Cookies (Thin Mint GSC phenotype) delivers minty sweet euphoria. THC: 20-24% | Effects: Euphoric, Happy, Relaxed, Creative | Flavors: Mint, sweet, earthy",
-                "sherbert": "Indica 🌿 Sherbert (Sunset Sherbet) provides fruity sweet relaxation. THC: 15-24% | Effects: Relaxed, Happy, Euphoric, Creative | Flavors: Sweet, berry, citrus",
-                "space queen": "Sativa 🌿 Space Queen delivers cosmic euphoria with fruity cherry flavors. THC: 16-24% | Effects: Energetic, Euphoric, Creative, Happy | Flavors: Cherry, fruity, pineapple",
-                "super silver haze": "Sativa 🌿 Super Silver Haze is a potent sativa with spicy, citrus flavors. Award winner. THC: 18-23% | Effects: Energetic, Euphoric, Happy, Creative | Flavors: Citrus, spicy, earthy",
-                "white tahoe cookies": "Hybrid 🌿 White Tahoe Cookies blends sweet earthy with powerful euphoria. THC: 20-27% | Effects: Euphoric, Relaxed, Happy, Creative | Flavors: Sweet, earthy, pine",
-                "yeti og": "Indica 🌿 Yeti OG delivers frosty, powerful relaxation with earthy diesel flavors. THC: 18-24% | Effects: Relaxed, Sleepy, Happy, Euphoric | Flavors: Diesel, earthy, pine",
-                "z3": "Hybrid 🌿 Z3 (Zkittlez x Wedding Cake) delivers fruity sweet euphoria. THC: 20-25% | Effects: Relaxed, Happy, Euphoric, Creative | Flavors: Fruity, sweet, vanilla",
-            }
-            
-            # Look up strain
-            if strain_name in strain_db:
-                self.send_message(channel, f"{nick}: {strain_db[strain_name]}")
+                self.send_message(channel, f"{nick}: You haven't set a bud-zone yet! Use: !bud-zone <city state country> 🌍🌿")
+        else:
+            # Set timezone based on location
+            location_str = " ".join(args)
+            timezone = self.get_timezone_from_location(location_str)
+            
+            if timezone:
+                self.user_timezones[nick] = timezone
+                self.save_toke_data(nick)
+                user_dt = self.get_user_datetime(nick)
+                self.send_message(channel, f"{nick}: Bud-zone set to {location_str} ({timezone}) - {format_clock(user_dt)} 🌍🌿")
             else:
-                # Partial match search
-                matches = [name for name in strain_db.keys() if strain_name in name or name in strain_name]
-                if matches:
-                    if len(matches) == 1:
-                        self.send_message(channel, f"{nick}: Did you mean '{matches[0]}'? {strain_db[matches[0]]}")
-                    else:
-                        match_list = ", ".join(matches[:5])
-                        self.send_message(channel, f"{nick}: Found multiple matches: {match_list}. Be more specific! 🌿")
+                self.send_message(channel, f"{nick}: Sorry, couldn't find timezone for '{location_str}'. Try: city, state, country (e.g., 'Los Angeles CA', 'London UK', 'Tokyo Japan') 🌍🌿")
+
+    def cmd_strain(self, nick, channel, args):
+        """Cannabis strain information lookup"""
+        if not args:
+            self.send_message(channel, f"{nick}: Use !strain <strain_name> to get info about a cannabis strain! Example: !strain Blue Dream 🌿")
+            return
+        
+        strain_name = " ".join(args).lower()
+        
+        # Look up strain
+        if strain_name in STRAIN_INFO:
+            self.send_message(channel, f"{nick}: {STRAIN_INFO[strain_name]}")
+        else:
+            # Partial match search
+            matches = [name for name in STRAIN_INFO.keys() if strain_name in name or name in strain_name]
+            if matches:
+                if len(matches) == 1:
+                    self.send_message(channel, f"{nick}: Did you mean '{matches[0]}'? {STRAIN_INFO[matches[0]]}")
                 else:
-                    self.send_message(channel, f"{nick}: Strain '{' '.join(args)}' not found in database. Try: Blue Dream, OG Kush, Sour Diesel, Girl Scout Cookies, etc. 🌿")
-        
-        elif command == "stoned":
-            # Random subliminal weed poetry couplets
-            import random
-            stoned_couplets = [
-                "Smoke rises high, thoughts float free / In this moment, just the herb and me 🌿✨",
-                "Green leaves burn, minds expand wide / Riding cosmic waves on this elevated tide 🌊🚀",
-                "Time melts away like morning dew / Reality shifts to a different hue 🎨🍃",
-                "Ancient plant wisdom fills the air / Consciousness dancing without a care 💫🌬️",
-                "Rolling papers hold sacred gold / Stories of peace, forever told 📜✨",
-                "Inhale the earth, exhale the stress / Finding zen in the greenness 🧘💚",
-                "Purple haze and lazy days / Lost in the aromatic maze 🌸🌀",
-                "Trichomes glisten like morning frost / In their beauty, I am lost ❄️🔬",
-                "Clouds of thought drift through my brain / Washing worries down the drain ☁️🧠",
-                "Sacred smoke curls toward the sky / Watching mundane problems fly 🕊️💨",
-                "Green goddess whispers ancient tales / Through valleys of consciousness, on herbal trails 🏔️🌿",
-                "Burning bridges to the mundane / Elevating far above the plain 🌉🎈",
-                "Sticky fingers, happy mind / Leaving earthly cares behind 🤲💭",
-                "Cannabis dreams in technicolor bright / Painting reality with different light 🎨🌈",
-                "From seed to smoke, the journey's long / But in this moment, I belong 🌱🔥",
-                "Couch-locked but mind is free / Exploring infinity internally ♾️🛋️",
-                "Munchies call with siren song / But this high won't last too long 🍕⏰",
-                "Red-eyed visions, giggling spells / In this state, all is well 😂👁️",
-                "The grinder spins, the ritual begins / Transcending ordinary sins ⚙️✨",
-                "Mary Jane, my faithful friend / On you, I can depend 🤝💚",
-                "Terpenes dance upon my tongue / Feeling forever young 👅🎵",
-                "Slow motion thoughts cascade like rain / Washing clean the daily pain 🌧️💆",
-                "In the garden of the mind I roam / This altered state feels like home 🏡🧠",
-                "Contemplating universe's mysteries / Through these herbal chemistries 🌌🔬",
-                "Every puff a tiny prayer / Sending gratitude through the air 🙏💨",
-                "Crystal trichomes catch the light / Everything feels just right 💎✨",
-                "Botanical bliss in every breath / Dancing with life, forgetting death 🎭💃",
-                "The Buddha smiled when he got high / Understanding earth and sky 😌🌍",
-                "Giggling at things that aren't that funny / Life tastes sweeter than honey 🍯😄",
-                "Paranoia knocks but I won't answer / Too busy being a cosmic dancer 💃🌟",
-                "Sativa thoughts race like the wind / While indica keeps me grinned 🌪️😊",
-                "Papers twist, the cone takes shape / Portal to the mind's landscape 🌀🗺️",
-                "In the smoke I see the truth / Reclaiming my eternal youth ⏳💫",
-                "Gravity feels optional today / As worries simply float away 🎈🌬️",
-                "Philosophy becomes so clear / When the herb is near 💡🌿",
-                "Creative sparks ignite the brain / Thoughts form patterns like the rain 🧠⚡",
-                "Every strain a different key / Unlocking what I'm meant to be 🔑🚪",
-                "The clock moves slow, the mind moves fast / Present moment, vast and vast ⏰🌊",
-                "Laughter echoes through the room / Dispelling every bit of gloom 🎭✨",
-                "Nature's remedy, ancient and true / Making everything feel new 🏛️🌱",
-                "Smoke signals to the universe / Composing my herbal verse 📡📝",
-                "Sublime relaxation takes its hold / Worth its weight in green gold 💰🌿",
-                "The ritual soothes my weary soul / Making broken pieces whole 🧩💚",
-                "Perception shifts with every toke / Reality's just cosmic smoke 🔮💨",
-                "In this space between the thoughts / Wisdom can't be bought or taught 🧘💭",
-                "Floating on a sea of calm / Nature's perfect healing balm 🌊💚",
-                "The plant speaks in silent ways / Guiding through the mental maze 🌿🧩",
-                "Time becomes a fluid thing / As consciousness takes wing ⏰🦋",
-                "Colors brighter, sounds more clear / In this elevated sphere 🎨🎵",
-                "Sacred herb of peace and light / Making everything alright 🕊️💡",
-                "Mind expands beyond the brain / Washing clear like gentle rain 🧠🌧️"
-            ]
-            
-            couplet = random.choice(stoned_couplets)
-            self.send_message(channel, couplet)
-            
-        elif command == "z6":
-            # Countdown to December 4th, 2025 in Eastern time (seconds only)
-            if ZoneInfo:
-                eastern_tz = ZoneInfo('America/New_York')
-                target_date = datetime(2025, 12, 4, 0, 0, 0, tzinfo=eastern_tz)
-                current_date = datetime.now(eastern_tz)
-            else:
-                # Fallback to pytz
-                eastern_tz = pytz.timezone('America/New_York')
-                target_date = eastern_tz.localize(datetime(2025, 12, 4, 0, 0, 0))
-                current_date = datetime.now(eastern_tz)
-            
-            if current_date >= target_date:
-                self.send_message(channel, f"{nick}: December 4th, 2025 (ET) has already passed! 🎉")
+                    match_list = ", ".join(matches[:5])
+                    self.send_message(channel, f"{nick}: Found multiple matches: {match_list}. Be more specific! 🌿")
             else:
-                time_diff = target_date - current_date
-                total_seconds = int(time_diff.total_seconds())
-                self.send_message(channel, f"{nick}: {total_seconds:,} seconds until December 4th, 2025 (ET) ⏰")
-        
-        elif command == "time":
-            # Countdown to December 4th, 2025
-            target_date = datetime(2025, 12, 4, 0, 0, 0)
-            current_date = datetime.now()
-            
-            if current_date >= target_date:
-                self.send_message(channel, f"{nick}: December 4th, 2025 has already passed! 🎉")
-            else:
-                time_diff = target_date - current_date
-                total_seconds = int(time_diff.total_seconds())
-                
-                # Toggle between detailed format (0) and seconds format (1)
-                if self.time_format_mode == 0:
-                    # Detailed format with months, weeks, days, hours, minutes, seconds
-                    # Calculate months (approximate using 30.44 days per month)
-                    months = int(total_seconds // (30.44 * 24 * 3600))
-                    remaining_seconds = total_seconds % int(30.44 * 24 * 3600)
-                    
-                    # Calculate weeks
-                    weeks = remaining_seconds // (7 * 24 * 3600)
-                    remaining_seconds = remaining_seconds % (7 * 24 * 3600)
-                    
-                    # Calculate days
-                    days = remaining_seconds // (24 * 3600)
-                    remaining_seconds = remaining_seconds % (24 * 3600)
-                    
-                    # Calculate hours
-                    hours = remaining_seconds // 3600
-                    remaining_seconds = remaining_seconds % 3600
-                    
-                    # Calculate minutes
-                    minutes = remaining_seconds // 60
-                    seconds = remaining_seconds % 60
-                    
-                    # Build time string
-                    time_parts = []
-                    if months > 0:
-                        time_parts.append(f"{months} month{'s' if months != 1 else ''}")
-                    if weeks > 0:
-                        time_parts.append(f"{weeks} week{'s' if weeks != 1 else ''}")
-                    if days > 0:
-                        time_parts.append(f"{days} day{'s' if days != 1 else ''}")
-                    if hours > 0:
-                        time_parts.append(f"{hours} hour{'s' if hours != 1 else ''}")
-                    if minutes > 0:
-                        time_parts.append(f"{minutes} minute{'s' if minutes != 1 else ''}")
-                    if seconds > 0:
-                        time_parts.append(f"{seconds} second{'s' if seconds != 1 else ''}")
-                    
-                    if time_parts:
-                        time_str = ", ".join(time_parts)
-                        self.send_message(channel, f"{nick}: Time until December 4th, 2025: {time_str} ⏰")
-                    else:
-                        self.send_message(channel, f"{nick}: December 4th, 2025 is here! 🎉")
-                else:
-                    # Seconds format
-                    self.send_message(channel, f"{nick}: Time until December 4th, 2025: {total_seconds:,} seconds ⏰")
-                
-                # Toggle format for next time
-                self.time_format_mode = 1 - self.time_format_mode
-                self.save_toke_data()
-            
+                self.send_message(channel, f"{nick}: Strain '{' '.join(args)}' not found in database. Try: Blue Dream, OG Kush, Sour Diesel, Girl Scout Cookies, etc. 🌿")
+
+    def cmd_stoned(self, nick, channel, args):
+        """Random subliminal weed poetry couplets"""
+        couplet = self.draw(self.stoned_deck)
+        self.send_cached_message(channel, couplet)
+
+    def cmd_z6(self, nick, channel, args):
+        """Countdown to December 4th, 2025 in Eastern time (seconds only)"""
+        remaining = TIME_TARGET_ET_TS - time.time()
+        
+        if remaining <= 0:
+            self.send_message(channel, f"{nick}: December 4th, 2025 (ET) has already passed! 🎉")
+        else:
+            total_seconds = int(remaining)
+            self.send_message(channel, f"{nick}: {total_seconds:,} seconds until December 4th, 2025 (ET) ⏰")
+
+    def cmd_time(self, nick, channel, args):
+        """Countdown to December 4th, 2025"""
+        total_seconds = TIME_TARGET_TS - int(time.time())
+        
+        if total_seconds <= 0:
+            self.send_message(channel, f"{nick}: December 4th, 2025 has already passed! 🎉")
+        else:
+            # Toggle between detailed format (0) and seconds format (1)
+            if self.time_format_mode == 0:
+                # Detailed format with months, weeks, days, hours, minutes, seconds
+                time_parts = []
+                remaining_seconds = total_seconds
+                for names, unit_seconds in COUNTDOWN_UNITS:
+                    count, remaining_seconds = divmod(remaining_seconds, unit_seconds)
+                    if count:
+                        time_parts.append(f"{count} {names[count != 1]}")
                 
-        elif command == "edible":
-            # Edible command with funny weed wisdom - does NOT count as toke
-            import random
-            edible_phrases = [
-                "Eating your way to enlightenment, one gummy at a time 🍬✨",
-                "When smoking is too mainstream for your consciousness 🍪🧠",
-                "The slow-release capsule of cosmic understanding ⏰💊",
-                "Digestive system? More like dimension portal 🚪🌌",
-                "Brownies: because adulting needs delicious distractions 🧁",
-                "Metabolizing molecules of mysticism 🍫🔬",
-                "Grandma's recipe meets quantum physics 👵⚛️",
-                "Oral fixation meets orbital elevation 🛸",
-                "The patient path to profound perspective 🧘",
-                "When you want to get high AND satisfy your munchies simultaneously 🎯🍕",
-                "Baked goods for getting baked: a delicious paradox 🥨♾️",
-                "Confections for consciousness expansion 🍰🌠"
-            ]
-            
-            phrase = random.choice(edible_phrases)
-            self.send_message(channel, phrase)
-            
-        elif command == "blaze":
-            # Special blaze command with sublime rotating quotes and tracking
-            import random
-            sublime_quotes = [
-                "Ignite the sacred leaf and transcend the mundane 🔥🌿",
-                "Through smoke we find clarity, through fire we find peace ✨💨",
-                "The flame awakens what sleep has concealed 🕯️🧠",
-                "Burning away illusions, one ember at a time 🔥💫",
-                "In the glow of the cherry, wisdom blooms 🌸🔥",
-                "Blazing trails through consciousness itself 🛤️✨",
-                "Fire transforms the plant, smoke transforms the mind 🌿➡️☁️",
-                "The ritual of flame, the sacrament of smoke 🕯️🙏",
-                "Combustion unlocks the ancient secrets within 🔓🔥",
-                "Lighting the path to inner worlds unexplored 🗺️💨",
-                "When the herb meets fire, magic manifests 🪄🔥",
-                "Smoke signals to higher dimensions 📡🌌",
-                "The sacred flame purifies and elevates 🔥⬆️",
-                "Burning bright, thinking deeper 💡🔥",
-                "Through the blaze, we pierce the veil 🎭🔥",
-                "Fire is the messenger, smoke is the message 📨💨",
-                "Blazing into realms beyond ordinary perception 🚀🔥",
-                "The alchemist's flame transmutes the mundane 🧪🔥",
-                "Ignition of the spirit, liberation of the mind 🕊️🔥",
-                "Where there's smoke, there's enlightenment 💡💨",
-                "The eternal dance of flame and flower 💃🌸🔥",
-                "Blazing bridges to the infinite 🌉♾️",
-                "Fire speaks in languages older than words 🗣️🔥",
-                "The glow that guides us inward 🧭✨",
-                "Combustible contemplation, flammable philosophy 💭🔥",
-                "Burning through barriers of perception 🚧🔥",
-                "The flame that illuminates inner truth 💡🕯️",
-                "Blazing with the fury of a thousand suns, yet peaceful 🌞😌",
-                "Fire transforms matter, smoke transforms mind 🌿➡️🧠",
-                "The ancient art of elevated existence 🎨🔥",
-                "Kindle the consciousness, stoke the soul 🔥👤",
-                "Where flame kisses flower, freedom follows 💋🌸🕊️",
-                "The phoenix rises on clouds of smoke 🐦‍🔥☁️",
-                "Blazing trails where others see only haze 🛤️🌫️",
-                "Fire: nature's way of saying 'let's get deep' 🌲🔥",
-                "Smoke sculptures of shifting consciousness ☁️🗿",
-                "The ember glows with primordial wisdom 🔥🦕",
-                "Burning questions lead to glowing answers 🔥❓➡️💡",
-                "Through fire and smoke, we become un-woke... wait, MORE woke 🔥👁️",
-                "The lighter's click: gateway to the infinite 🔓♾️",
-                "Blaze on, space cadet, blaze on 🚀🔥",
-                "When in doubt, blaze it out 💨💭",
-                "The sacred lighter illuminates the way 🔥🛤️",
-                "Combustion: because enlightenment shouldn't be boring 🔥🎉",
-                "Fire cleanses, smoke ascends, mind transcends 🔥☁️🧠",
-                "Blazing like the cosmos intended 🌌🔥",
-                "The ceremonial ignition of infinite possibilities 🕯️♾️",
-                "Flame on, tune in, blaze out 🔥📻💨",
-                "Through the sacred blaze, we become unphased 🔥😎",
-                "Let the herb burn, let the mind learn 🌿🔥🧠"
-            ]
-            
-            current_time = time.time()
-            
-            # Update longest abstinence record if applicable
-            if nick in self.toke_data:
-                time_diff_seconds = int(current_time - self.toke_data[nick])
-                if nick not in self.longest_abstinence or time_diff_seconds > self.longest_abstinence[nick]:
-                    self.longest_abstinence[nick] = time_diff_seconds
-            else:
-                self.longest_abstinence[nick] = 0
-            
-            # Update toke count
-            if nick not in self.toke_counts:
-                self.toke_counts[nick] = 0
-            self.toke_counts[nick] += 1
-            
-            # Add to toke history for gap tracking
-            if nick not in self.toke_history:
-                self.toke_history[nick] = []
-            self.toke_history[nick].append(current_time)
-            
-            self.toke_data[nick] = current_time
-            self.save_toke_data()
-            
-            # Send random sublime quote
-            quote = random.choice(sublime_quotes)
-            self.send_message(channel, quote)
-            
-        elif command == "pi":
-            # Pi digit collection at 3:14 AM/PM
-            user_datetime = self.get_user_datetime(nick)
-            current_hour = user_datetime.hour
-            current_minute = user_datetime.minute
-            
-            # Check if it's 3:14 AM (03:14) or 3:14 PM (15:14) in user's timezone
-            is_pi_time = (current_hour == 3 or current_hour == 15) and current_minute == 14
-            
-            if not is_pi_time:
-                # Show current progress even when not at pi time
-                if nick in self.pi_progress:
-                    digits = self.pi_progress[nick]
-                    rounds = self.pi_rounds_won.get(nick, 0)
-                    self.send_message(channel, f"{nick}: You have collected {digits} pi digits (base 64). Rounds won: {rounds}. Come back at 3:14 AM/PM! 🥧")
-                else:
-                    self.send_message(channel, f"{nick}: You haven't collected any pi digits yet! Use !pi at 3:14 AM/PM to start! 🥧")
-                return
-            
-            # Initialize user's pi progress if needed
-            if nick not in self.pi_progress:
-                self.pi_progress[nick] = 0
-            if nick not in self.pi_rounds_won:
-                self.pi_rounds_won[nick] = 0
-            
-            # Get current digit count
-            current_digits = self.pi_progress[nick]
-            
-            # Calculate which 60-digit chunk to show (0-59, 60-119, 120-179, etc.)
-            chunk_index = current_digits // 60
-            
-            # Convert pi to base 64 (numeral system, not base64 encoding)
-            # Pi in high precision decimal
-            pi_decimal = "3.1415926535897932384626433832795028841971693993751058209749445923078164062862089986280348253421170679821480865132823066470938446095505822317253594081284811174502841027019385211055596446229489549303819644288109756659334461284756482337867831652712019091456485669234603486104543266482133936072602491412737245870066063155881748815209209628292540917153643678925903600113305305488204665213841469519415116094330572703657595919530921861173819326117931051185480744623799627495673518857527248912279381830119491298336733624406566430860213949463952247371907021798609437027705392171762931767523846748184676694051320005681271452635608277857713427577896091736371787214684409012249534301465495853710507922796892589235420199561121290219608640344181598136297747713099605187072113499999983729780499510597317328160963185950244594553469083026425223082533446850352619311881710100031378387528865875332083814206171776691473035982534904287554687311595628638823537875937519577818577805321712268066130019278766111959092164201989"
-            
-            # Convert fractional part to base 64
-            from decimal import Decimal, getcontext
-            getcontext().prec = 2000
-            
-            decimal_part = pi_decimal.split('.')[1]
-            frac = Decimal('0.' + decimal_part)
-            
-            # Generate enough base 64 digits
-            max_needed = (chunk_index + 1) * 60
-            pi_base64_digits = ['3', '.']
-            
-            for i in range(max_needed):
-                frac *= 64
-                digit = int(frac)
-                if digit < 10:
-                    pi_base64_digits.append(str(digit))
-                elif digit < 36:
-                    pi_base64_digits.append(chr(ord('A') + digit - 10))
-                else:
-                    pi_base64_digits.append(chr(ord('a') + digit - 36))
-                frac -= digit
-            
-            pi_base64_full = ''.join(pi_base64_digits)
-            
-            # Extract the relevant 60-character chunk (including "3." for first chunk)
-            if chunk_index == 0:
-                # First chunk includes "3."
-                pi_chunk = pi_base64_full[:62]  # "3." + 60 digits
+                time_str = ", ".join(time_parts)
+                self.send_message(channel, f"{nick}: Time until December 4th, 2025: {time_str} ⏰")
             else:
-                # Subsequent chunks: skip "3." and previous digits
-                start_idx = 2 + (chunk_index * 60)
-                end_idx = start_idx + 60
-                if end_idx > len(pi_base64_full):
-                    self.send_message(channel, f"{nick}: You've reached the limit of our pi digit database! 🎉 Total digits: {current_digits}, Rounds: {self.pi_rounds_won[nick]}")
-                    return
-                pi_chunk = pi_base64_full[start_idx:end_idx]
+                # Seconds format
+                self.send_message(channel, f"{nick}: Time until December 4th, 2025: {total_seconds:,} seconds ⏰")
             
-            # Update progress
-            self.pi_progress[nick] += 60
-            new_total = self.pi_progress[nick]
-            
-            # Check if they've reached 420 digits (or multiple of 420)
-            if new_total % 420 == 0 and new_total > 0:
-                self.pi_rounds_won[nick] += 1
-                self.save_toke_data()
-                self.send_message(channel, f"🎉🥧 {nick} WINS ROUND {self.pi_rounds_won[nick]}! 420 DIGITS! Next 60: {pi_chunk} 🥧🎉")
-            else:
-                self.save_toke_data()
-                self.send_message(channel, f"🥧 {nick}: {pi_chunk} ({new_total}/420 | {420 - (new_total % 420)} to go)")
+            # Toggle format for next time
+            self.time_format_mode = 1 - self.time_format_mode
+            self.save_toke_data(nick)
+
+    def cmd_edible(self, nick, channel, args):
+        """Edible command with funny weed wisdom - does NOT count as toke"""
+        phrase = self.draw(self.edible_deck)
+        self.send_cached_message(channel, phrase)
+
+    def cmd_blaze(self, nick, channel, args):
+        """Special blaze command with sublime rotating quotes and tracking"""
+        self.record_toke(nick)
         
-        elif command == "pi-show":
-            # Show all collected base 64 pi digits
-            if nick not in self.pi_progress or self.pi_progress[nick] == 0:
-                self.send_message(channel, f"{nick}: You haven't collected any pi digits yet! Use !pi at 3:14 AM/PM to start! 🥧")
-                return
-            
-            # Get user's total collected digits
-            total_digits = self.pi_progress[nick]
-            rounds = self.pi_rounds_won.get(nick, 0)
-            
-            # Convert pi to base 64 (numeral system, not base64 encoding)
-            pi_decimal = "3.1415926535897932384626433832795028841971693993751058209749445923078164062862089986280348253421170679821480865132823066470938446095505822317253594081284811174502841027019385211055596446229489549303819644288109756659334461284756482337867831652712019091456485669234603486104543266482133936072602491412737245870066063155881748815209209628292540917153643678925903600113305305488204665213841469519415116094330572703657595919530921861173819326117931051185480744623799627495673518857527248912279381830119491298336733624406566430860213949463952247371907021798609437027705392171762931767523846748184676694051320005681271452635608277857713427577896091736371787214684409012249534301465495853710507922796892589235420199561121290219608640344181598136297747713099605187072113499999983729780499510597317328160963185950244594553469083026425223082533446850352619311881710100031378387528865875332083814206171776691473035982534904287554687311595628638823537875937519577818577805321712268066130019278766111959092164201989"
-            
-            from decimal import Decimal, getcontext
-            getcontext().prec = 2000
-            
-            decimal_part = pi_decimal.split('.')[1]
-            frac = Decimal('0.' + decimal_part)
-            
-            # Generate base 64 digits
-            pi_base64_digits = ['3', '.']
-            
-            for i in range(total_digits):
-                frac *= 64
-                digit = int(frac)
-                if digit < 10:
-                    pi_base64_digits.append(str(digit))
-                elif digit < 36:
-                    pi_base64_digits.append(chr(ord('A') + digit - 10))
-                else:
-                    pi_base64_digits.append(chr(ord('a') + digit - 36))
-                frac -= digit
-            
-            pi_base64 = ''.join(pi_base64_digits)
-            
-            # Send the results in one line (truncate if needed)
-            max_display = 200  # Keep it short for single line
-            if len(pi_base64) > max_display:
-                display = pi_base64[:max_display] + "..."
+        # Send the next sublime quote
+        quote = self.draw(self.blaze_deck)
+        self.send_cached_message(channel, quote)
+
+    def cmd_pi(self, nick, channel, args):
+        """Pi digit collection at 3:14 AM/PM"""
+        current_hour, current_minute, _ = self.get_user_clock(nick)
+        
+        # Check if it's 3:14 AM (03:14) or 3:14 PM (15:14) in user's timezone;
+        # the minute rules out almost every call, so it is tested first
+        is_pi_time = current_minute == 14 and current_hour % 12 == 3
+        
+        if not is_pi_time:
+            # Show current progress even when not at pi time
+            if nick in self.pi_progress:
+                digits = self.pi_progress[nick]
+                rounds = self.pi_rounds_won.get(nick, 0)
+                self.send_message(channel, f"{nick}: You have collected {digits} pi digits (base 64). Rounds won: {rounds}. Come back at 3:14 AM/PM! 🥧")
             else:
-                display = pi_base64
-            self.send_message(channel, f"🥧 {nick}: {display} ({total_digits} digits | {rounds} rounds)")
+                self.send_message(channel, f"{nick}: You haven't collected any pi digits yet! Use !pi at 3:14 AM/PM to start! 🥧")
+            return
+        
+        # Get current digit count, initializing user's pi progress if needed
+        current_digits = self.pi_progress.setdefault(nick, 0)
+        self.pi_rounds_won.setdefault(nick, 0)
         
-        elif command == "t-break":
-            # Show longest t-break (gap between tokes)
-            if nick not in self.toke_history or len(self.toke_history[nick]) < 2:
-                self.send_message(channel, f"{nick}: No t-break data yet! Use toke commands (!toke, !joint, !dab, etc) at least twice to track gaps. 🌿")
+        # Calculate which 60-digit chunk to show (0-59, 60-119, 120-179, etc.)
+        chunk_index = current_digits // 60
+        
+        # Pi in base 64 (numeral system, not base64 encoding), with enough digits
+        max_needed = (chunk_index + 1) * 60
+        pi_base64_full = self.pi_expansion.prefix(max_needed)
+        
+        # Extract the relevant 60-character chunk (including "3." for first chunk)
+        if chunk_index == 0:
+            # First chunk includes "3."
+            pi_chunk = pi_base64_full[:62]  # "3." + 60 digits
+        else:
+            # Subsequent chunks: skip "3." and previous digits
+            start_idx = 2 + (chunk_index * 60)
+            end_idx = start_idx + 60
+            if end_idx > len(pi_base64_full):
+                self.send_message(channel, f"{nick}: You've reached the limit of our pi digit database! 🎉 Total digits: {current_digits}, Rounds: {self.pi_rounds_won[nick]}")
                 return
-            
-            # Calculate all gaps between consecutive tokes
-            toke_times = sorted(self.toke_history[nick])
-            gaps = []
-            for i in range(1, len(toke_times)):
-                gap = toke_times[i] - toke_times[i-1]
-                gaps.append(gap)
-            
-            # Find the longest gap
-            longest_gap = max(gaps)
-            
-            # Get rating for longest gap
-            stoner_rank = self.get_stoner_rank(int(longest_gap))
-            
-            # Format time
-            days = int(longest_gap // 86400)
-            hours = int((longest_gap % 86400) // 3600)
-            minutes = int((longest_gap % 3600) // 60)
-            seconds = int(longest_gap % 60)
-            
-            if days > 0:
-                time_str = f"{days}d {hours}h {minutes}m {seconds}s"
-            elif hours > 0:
-                time_str = f"{hours}h {minutes}m {seconds}s"
-            elif minutes > 0:
-                time_str = f"{minutes}m {seconds}s"
-            else:
-                time_str = f"{seconds}s"
-            
-            # Send results
-            self.send_message(channel, f"{nick}: Longest T-Break: {time_str} ({stoner_rank}) - {len(toke_times)} tokes tracked 🏆")
+            pi_chunk = pi_base64_full[start_idx:end_idx]
         
-        elif command == "?":
-            # Comprehensive help command covering all bot commands - all on one line
-            self.send_message(channel, "🌿 CHR0N-BOT 🌿 !bud-zone [location]=timezone | !strain <name>=info | !stoned=poetry | !time=countdown | !z6=seconds | !blaze=toke+quote | !edible=wisdom | !pi=collect@3:14 | !pi-show=digits | !t-break=stats | !craps [bet|roll|status|cashout]=dice🎲 | !midi=compose🎵")
+        # Update progress
+        new_total = current_digits + 60
+        self.pi_progress[nick] = new_total
         
-        elif command == "midi":
-            # MIDI composition commands
-            if not args:
-                self.send_message(channel, f"{nick}: MIDI commands: !midi info | !midi play | !midi stop | !midi add <track> <note> <velocity> <start> <duration> | !midi tempo <bpm> | !midi track <name> | !midi instrument <track> <num> | !midi save | !midi clear 🎵")
+        # Check if they've reached 420 digits (or multiple of 420)
+        if new_total % 420 == 0 and new_total > 0:
+            self.pi_rounds_won[nick] += 1
+            self.save_toke_data(nick)
+            self.send_message(channel, f"🎉🥧 {nick} WINS ROUND {self.pi_rounds_won[nick]}! 420 DIGITS! Next 60: {pi_chunk} 🥧🎉")
+        else:
+            self.save_toke_data(nick)
+            self.send_message(channel, f"🥧 {nick}: {pi_chunk} ({new_total}/420 | {420 - (new_total % 420)} to go)")
+
+    def cmd_pi_show(self, nick, channel, args):
+        """Show all collected base 64 pi digits"""
+        if nick not in self.pi_progress or self.pi_progress[nick] == 0:
+            self.send_message(channel, f"{nick}: You haven't collected any pi digits yet! Use !pi at 3:14 AM/PM to start! 🥧")
+            return
+        
+        # Get user's total collected digits
+        total_digits = self.pi_progress[nick]
+        rounds = self.pi_rounds_won.get(nick, 0)
+        
+        # Pi in base 64 (numeral system, not base64 encoding)
+        pi_base64 = self.pi_expansion.prefix(total_digits)
+        
+        # Send the results in one line (truncate if needed)
+        max_display = 200  # Keep it short for single line
+        if len(pi_base64) > max_display:
+            display = pi_base64[:max_display] + "..."
+        else:
+            display = pi_base64
+        self.send_message(channel, f"🥧 {nick}: {display} ({total_digits} digits | {rounds} rounds)")
+
+    def cmd_t_break(self, nick, channel, args):
+        """Show longest t-break (gap between tokes)"""
+        if nick not in self.toke_history or len(self.toke_history[nick]) < 2:
+            self.send_message(channel, f"{nick}: No t-break data yet! Use toke commands (!toke, !joint, !dab, etc) at least twice to track gaps. 🌿")
+            return
+        
+        # History only grows, so the stats are reused until another toke is recorded
+        toke_count = len(self.toke_history[nick])
+        cached = self.t_break_replies.get(nick)
+        if cached and cached[0] == toke_count:
+            self.send_message(channel, cached[1])
+            return
+        
+        # Find the longest gap between consecutive tokes
+        toke_times = sorted(self.toke_history[nick])
+        longest_gap = max(later - earlier for earlier, later in zip(toke_times, toke_times[1:]))
+        
+        # Get rating for longest gap
+        stoner_rank = self.get_stoner_rank(int(longest_gap))
+        
+        # Format time
+        days, remaining_seconds = divmod(int(longest_gap), DAY_SECONDS)
+        hours, remaining_seconds = divmod(remaining_seconds, 3600)
+        minutes, seconds = divmod(remaining_seconds, 60)
+        
+        if days > 0:
+            time_str = f"{days}d {hours}h {minutes}m {seconds}s"
+        elif hours > 0:
+            time_str = f"{hours}h {minutes}m {seconds}s"
+        elif minutes > 0:
+            time_str = f"{minutes}m {seconds}s"
+        else:
+            time_str = f"{seconds}s"
+        
+        # Send results
+        reply = f"{nick}: Longest T-Break: {time_str} ({stoner_rank}) - {toke_count} tokes tracked 🏆"
+        self.t_break_replies[nick] = (toke_count, reply)
+        self.send_message(channel, reply)
+
+    def cmd_help(self, nick, channel, args):
+        """Comprehensive help command covering all bot commands - all on one line"""
+        self.send_cached_message(channel, "🌿 CHR0N-BOT 🌿 !bud-zone [location]=timezone | !strain <name>=info | !stoned=poetry | !time=countdown | !z6=seconds | !blaze=toke+quote | !edible=wisdom | !pi=collect@3:14 | !pi-show=digits | !t-break=stats | !craps [bet|roll|status|cashout]=dice🎲 | !midi=compose🎵")
+
+    def cmd_midi(self, nick, channel, args):
+        """MIDI composition commands"""
+        if not args:
+            self.send_message(channel, f"{nick}: MIDI commands: !midi info | !midi play | !midi stop | !midi add <track> <note> <velocity> <start> <duration> | !midi tempo <bpm> | !midi track <name> | !midi instrument <track> <num> | !midi save | !midi clear 🎵")
+            return
+        
+        handler = self.midi_handlers.get(args[0].lower())
+        if handler:
+            handler(nick, channel, args)
+        else:
+            self.send_message(channel, f"{nick}: Unknown MIDI command. Use !midi for help.")
+
+    def midi_info(self, nick, channel, args):
+        """Show composition info"""
+        info = self.midi_manager.format_composition_info(nick)
+        self.send_message(channel, f"{nick}: {info}")
+
+    def midi_play(self, nick, channel, args):
+        """Play user's composition"""
+        comp = self.midi_manager.get_composition(nick)
+        if comp.get_duration() == 0:
+            self.send_message(channel, f"{nick}: Your composition is empty! Add notes with: !midi add <track> <note> <velocity> <start> <duration> 🎵")
+            return
+        
+        if self.midi_manager.play(nick):
+            duration = comp.get_duration() * 60.0 / comp.tempo
+            self.send_message(channel, f"{nick}: 🎵 Playing '{comp.name}' (~{duration:.1f}s) - Notes will be logged! Use !midi stop to stop.")
+        else:
+            self.send_message(channel, f"{nick}: Already playing! Use !midi stop first.")
+
+    def midi_stop(self, nick, channel, args):
+        """Stop playback"""
+        self.midi_manager.stop()
+        self.send_message(channel, f"{nick}: ⏹️ Playback stopped.")
+
+    def midi_add(self, nick, channel, args):
+        """Add a note: !midi add <track> <note> <velocity> <start> <duration>"""
+        if len(args) < 6:
+            self.send_message(channel, f"{nick}: Usage: !midi add <track> <note> <velocity> <start> <duration> (Example: !midi add 0 60 100 0 1)")
+            return
+        
+        try:
+            track = int(args[1])
+            note = int(args[2])
+            velocity = int(args[3])
+            start = float(args[4])
+            duration = float(args[5])
+            
+            comp = self.midi_manager.get_composition(nick)
+            if track >= len(comp.tracks):
+                self.send_message(channel, f"{nick}: Track {track} doesn't exist! Use !midi track to add more tracks.")
                 return
             
-            subcommand = args[0].lower()
-            
-            if subcommand == "info":
-                # Show composition info
-                info = self.midi_manager.format_composition_info(nick)
-                self.send_message(channel, f"{nick}: {info}")
-            
-            elif subcommand == "play":
-                # Play user's composition
-                comp = self.midi_manager.get_composition(nick)
-                if comp.get_duration() == 0:
-                    self.send_message(channel, f"{nick}: Your composition is empty! Add notes with: !midi add <track> <note> <velocity> <start> <duration> 🎵")
-                    return
-                
-                if self.midi_manager.play(nick):
-                    duration = comp.get_duration() * 60.0 / comp.tempo
-                    self.send_message(channel, f"{nick}: 🎵 Playing '{comp.name}' (~{duration:.1f}s) - Notes will be logged! Use !midi stop to stop.")
-                else:
-                    self.send_message(channel, f"{nick}: Already playing! Use !midi stop first.")
-            
-            elif subcommand == "stop":
-                # Stop playback
-                self.midi_manager.stop()
-                self.send_message(channel, f"{nick}: ⏹️ Playback stopped.")
-            
-            elif subcommand == "add":
-                # Add a note: !midi add <track> <note> <velocity> <start> <duration>
-                if len(args) < 6:
-                    self.send_message(channel, f"{nick}: Usage: !midi add <track> <note> <velocity> <start> <duration> (Example: !midi add 0 60 100 0 1)")
-                    return
-                
-                try:
-                    track = int(args[1])
-                    note = int(args[2])
-                    velocity = int(args[3])
-                    start = float(args[4])
-                    duration = float(args[5])
-                    
-                    comp = self.midi_manager.get_composition(nick)
-                    if track >= len(comp.tracks):
-                        self.send_message(channel, f"{nick}: Track {track} doesn't exist! Use !midi track to add more tracks.")
-                        return
-                    
-                    comp.add_note(track, note, velocity, start, duration)
-                    self.midi_manager.save_composition(nick)
-                    note_name = self.midi_manager.player._note_to_name(note)
-                    self.send_message(channel, f"{nick}: ✅ Added {note_name} (MIDI {note}) to track {track} at beat {start} for {duration} beats")
-                except ValueError:
-                    self.send_message(channel, f"{nick}: Invalid parameters! Use numbers only.")
-            
-            elif subcommand == "tempo":
-                # Set tempo: !midi tempo <bpm>
-                if len(args) < 2:
-                    self.send_message(channel, f"{nick}: Usage: !midi tempo <bpm> (Example: !midi tempo 120)")
-                    return
-                
-                try:
-                    tempo = int(args[1])
-                    if tempo < 20 or tempo > 300:
-                        self.send_message(channel, f"{nick}: Tempo must be between 20 and 300 BPM")
-                        return
-                    
-                    comp = self.midi_manager.get_composition(nick)
-                    comp.tempo = tempo
-                    self.midi_manager.save_composition(nick)
-                    self.send_message(channel, f"{nick}: ✅ Tempo set to {tempo} BPM")
-                except ValueError:
-                    self.send_message(channel, f"{nick}: Invalid tempo! Use a number.")
-            
-            elif subcommand == "track":
-                # Add a new track: !midi track <name>
-                if len(args) < 2:
-                    self.send_message(channel, f"{nick}: Usage: !midi track <name> (Example: !midi track Bass)")
-                    return
-                
-                track_name = " ".join(args[1:])
-                comp = self.midi_manager.get_composition(nick)
-                track_idx = comp.add_track(track_name)
-                self.midi_manager.save_composition(nick)
-                self.send_message(channel, f"{nick}: ✅ Added track {track_idx}: '{track_name}'")
-            
-            elif subcommand == "instrument":
-                # Set track instrument: !midi instrument <track> <instrument_num>
-                if len(args) < 3:
-                    self.send_message(channel, f"{nick}: Usage: !midi instrument <track> <num> (Example: !midi instrument 0 33 for bass)")
-                    return
-                
-                try:
-                    track = int(args[1])
-                    instrument = int(args[2])
-                    
-                    comp = self.midi_manager.get_composition(nick)
-                    if track >= len(comp.tracks):
-                        self.send_message(channel, f"{nick}: Track {track} doesn't exist!")
-                        return
-                    
-                    comp.set_instrument(track, instrument)
-                    self.midi_manager.save_composition(nick)
-                    self.send_message(channel, f"{nick}: ✅ Track {track} instrument set to {instrument}")
-                except ValueError:
-                    self.send_message(channel, f"{nick}: Invalid parameters! Use numbers only.")
-            
-            elif subcommand == "save":
-                # Save composition
-                if self.midi_manager.save_composition(nick):
-                    self.send_message(channel, f"{nick}: ✅ Composition saved!")
-                else:
-                    self.send_message(channel, f"{nick}: ❌ Failed to save composition.")
-            
-            elif subcommand == "clear":
-                # Clear composition and start fresh
-                from midi_player import MidiComposition
-                self.midi_manager.compositions[nick] = MidiComposition(f"{nick}'s composition")
-                self.midi_manager.save_composition(nick)
-                self.send_message(channel, f"{nick}: ✅ Composition cleared! Start fresh with !midi add")
-            
-            else:
-                self.send_message(channel, f"{nick}: Unknown MIDI command. Use !midi for help.")
+            comp.add_note(track, note, velocity, start, duration)
+            self.midi_manager.save_composition(nick)
+            note_name = self.midi_manager.player._note_to_name(note)
+            self.send_message(channel, f"{nick}: ✅ Added {note_name} (MIDI {note}) to track {track} at beat {start} for {duration} beats")
+        except ValueError:
+            self.send_message(channel, f"{nick}: Invalid parameters! Use numbers only.")
+
+    def midi_tempo(self, nick, channel, args):
+        """Set tempo: !midi tempo <bpm>"""
+        if len(args) < 2:
+            self.send_message(channel, f"{nick}: Usage: !midi tempo <bpm> (Example: !midi tempo 120)")
+            return
         
-        elif command == "craps":
-            # Craps dice game with betting
-            import random
-            
-            # Initialize player if new
-            if nick not in self.craps_games:
-                self.craps_games[nick] = {'point': None, 'chips': 100, 'bet': 0, 'wins': 0, 'losses': 0}
-            
-            player = self.craps_games[nick]
-            
-            if not args:
-                # Show help
-                self.send_message(channel, f"{nick}: 🎲 !craps bet <amount> | !craps roll | !craps status | !craps cashout 🎲")
+        try:
+            tempo = int(args[1])
+            if tempo < 20 or tempo > 300:
+                self.send_message(channel, f"{nick}: Tempo must be between 20 and 300 BPM")
                 return
             
-            subcommand = args[0].lower()
-            
-            if subcommand == "status":
-                self.send_message(channel, f"🎲 {nick}: {player['chips']} chips | Point: {player['point'] or 'None'} | W/L: {player['wins']}/{player['losses']} | Bet: {player['bet']}")
-            
-            elif subcommand == "bet":
-                if len(args) < 2:
-                    self.send_message(channel, f"{nick}: Usage: !craps bet <amount> (Min: 1, Max: all)")
-                    return
-                
-                if player['bet'] > 0:
-                    self.send_message(channel, f"{nick}: You already have a bet of {player['bet']} chips! Roll or cashout first.")
-                    return
-                
-                bet_amount = args[1].lower()
-                if bet_amount == "all":
-                    bet = player['chips']
-                else:
-                    try:
-                        bet = int(bet_amount)
-                    except ValueError:
-                        self.send_message(channel, f"{nick}: Invalid bet amount. Use a number or 'all'.")
-                        return
-                
-                if bet < 1:
-                    self.send_message(channel, f"{nick}: Minimum bet is 1 chip.")
-                    return
-                
-                if bet > player['chips']:
-                    self.send_message(channel, f"{nick}: You only have {player['chips']} chips!")
-                    return
-                
-                player['bet'] = bet
-                player['chips'] -= bet
-                self.save_toke_data()
-                self.send_message(channel, f"🎲 {nick}: Bet {bet} chips! Roll with !craps roll. Remaining: {player['chips']} chips")
-            
-            elif subcommand == "roll":
-                if player['bet'] == 0:
-                    self.send_message(channel, f"{nick}: Place a bet first with !craps bet <amount>")
-                    return
-                
-                # Roll two dice
-                die1 = random.randint(1, 6)
-                die2 = random.randint(1, 6)
-                total = die1 + die2
-                
-                dice_emoji = {1: "⚀", 2: "⚁", 3: "⚂", 4: "⚃", 5: "⚄", 6: "⚅"}
-                dice_display = f"{dice_emoji[die1]} {dice_emoji[die2]}"
-                
-                if player['point'] is None:
-                    # Come-out roll
-                    if total in [7, 11]:
-                        # Natural - win
-                        winnings = player['bet'] * 2
-                        player['chips'] += winnings
-                        player['wins'] += 1
-                        player['bet'] = 0
-                        self.save_toke_data()
-                        self.send_message(channel, f"🎲 {nick}: {dice_display} = {total} | NATURAL! WIN! +{winnings} chips | Total: {player['chips']} 🎉")
-                    elif total in [2, 3, 12]:
-                        # Craps - lose
-                        player['losses'] += 1
-                        player['bet'] = 0
-                        self.save_toke_data()
-                        self.send_message(channel, f"🎲 {nick}: {dice_display} = {total} | CRAPS! Lost bet. | Total: {player['chips']} 💀")
-                    else:
-                        # Point established
-                        player['point'] = total
-                        self.save_toke_data()
-                        self.send_message(channel, f"🎲 {nick}: {dice_display} = {total} | POINT SET! Roll {total} to win, 7 to lose. Roll again!")
-                else:
-                    # Point is set
-                    if total == player['point']:
-                        # Made the point - win
-                        winnings = player['bet'] * 2
-                        player['chips'] += winnings
-                        player['wins'] += 1
-                        player['point'] = None
-                        player['bet'] = 0
-                        self.save_toke_data()
-                        self.send_message(channel, f"🎲 {nick}: {dice_display} = {total} | POINT MADE! WIN! +{winnings} chips | Total: {player['chips']} 🎉")
-                    elif total == 7:
-                        # Seven out - lose
-                        player['losses'] += 1
-                        player['point'] = None
-                        player['bet'] = 0
-                        self.save_toke_data()
-                        self.send_message(channel, f"🎲 {nick}: {dice_display} = {total} | SEVEN OUT! Lost bet. | Total: {player['chips']} 💀")
-                    else:
-                        # Keep rolling
-                        self.send_message(channel, f"🎲 {nick}: {dice_display} = {total} | Point: {player['point']} | Keep rolling!")
+            comp = self.midi_manager.get_composition(nick)
+            comp.tempo = tempo
+            self.midi_manager.save_composition(nick)
+            self.send_message(channel, f"{nick}: ✅ Tempo set to {tempo} BPM")
+        except ValueError:
+            self.send_message(channel, f"{nick}: Invalid tempo! Use a number.")
+
+    def midi_track(self, nick, channel, args):
+        """Add a new track: !midi track <name>"""
+        if len(args) < 2:
+            self.send_message(channel, f"{nick}: Usage: !midi track <name> (Example: !midi track Bass)")
+            return
+        
+        track_name = " ".join(args[1:])
+        comp = self.midi_manager.get_composition(nick)
+        track_idx = comp.add_track(track_name)
+        self.midi_manager.save_composition(nick)
+        self.send_message(channel, f"{nick}: ✅ Added track {track_idx}: '{track_name}'")
+
+    def midi_instrument(self, nick, channel, args):
+        """Set track instrument: !midi instrument <track> <instrument_num>"""
+        if len(args) < 3:
+            self.send_message(channel, f"{nick}: Usage: !midi instrument <track> <num> (Example: !midi instrument 0 33 for bass)")
+            return
+        
+        try:
+            track = int(args[1])
+            instrument = int(args[2])
             
-            elif subcommand == "cashout":
-                if player['bet'] > 0:
-                    # Return bet to chips
-                    player['chips'] += player['bet']
-                    returned_bet = player['bet']
-                    player['bet'] = 0
-                    player['point'] = None
-                    self.save_toke_data()
-                    self.send_message(channel, f"🎲 {nick}: Cashed out! Returned {returned_bet} chips. Total: {player['chips']} chips")
-                else:
-                    self.send_message(channel, f"🎲 {nick}: No active bet to cash out. Total: {player['chips']} chips")
+            comp = self.midi_manager.get_composition(nick)
+            if track >= len(comp.tracks):
+                self.send_message(channel, f"{nick}: Track {track} doesn't exist!")
+                return
             
+            comp.set_instrument(track, instrument)
+            self.midi_manager.save_composition(nick)
+            self.send_message(channel, f"{nick}: ✅ Track {track} instrument set to {instrument}")
+        except ValueError:
+            self.send_message(channel, f"{nick}: Invalid parameters! Use numbers only.")
+
+    def midi_save(self, nick, channel, args):
+        """Save composition"""
+        if self.midi_manager.save_composition(nick):
+            self.send_message(channel, f"{nick}: ✅ Composition saved!")
+        else:
+            self.send_message(channel, f"{nick}: ❌ Failed to save composition.")
+
+    def midi_clear(self, nick, channel, args):
+        """Clear composition and start fresh"""
+        self.midi_manager.compositions[nick] = MidiComposition(f"{nick}'s composition")
+        self.midi_manager.save_composition(nick)
+        self.send_message(channel, f"{nick}: ✅ Composition cleared! Start fresh with !midi add")
+
+    def cmd_craps(self, nick, channel, args):
+        """Craps dice game with betting"""
+        
+        # Initialize player if new
+        player = self.craps_games.get(nick)
+        if player is None:
+            player = self.craps_games[nick] = {'point': None, 'chips': 100, 'bet': 0, 'wins': 0, 'losses': 0}
+        
+        if not args:
+            # Show help
+            self.send_message(channel, f"{nick}: 🎲 !craps bet <amount> | !craps roll | !craps status | !craps cashout 🎲")
+            return
+        
+        handler = self.craps_handlers.get(args[0].lower())
+        if handler:
+            handler(nick, channel, args, player)
+        else:
+            self.send_message(channel, f"{nick}: Unknown craps command. Use !craps for help.")
+
+    def craps_status(self, nick, channel, args, player):
+        """Show the player's chips, point and record"""
+        self.send_message(channel, f"🎲 {nick}: {player['chips']} chips | Point: {player['point'] or 'None'} | W/L: {player['wins']}/{player['losses']} | Bet: {player['bet']}")
+
+    def craps_bet(self, nick, channel, args, player):
+        """Place a bet: !craps bet <amount|all>"""
+        if len(args) < 2:
+            self.send_message(channel, f"{nick}: Usage: !craps bet <amount> (Min: 1, Max: all)")
+            return
+        
+        if player['bet'] > 0:
+            self.send_message(channel, f"{nick}: You already have a bet of {player['bet']} chips! Roll or cashout first.")
+            return
+        
+        bet_amount = args[1].lower()
+        if bet_amount == "all":
+            bet = player['chips']
+        else:
+            try:
+                bet = int(bet_amount)
+            except ValueError:
+                self.send_message(channel, f"{nick}: Invalid bet amount. Use a number or 'all'.")
+                return
+        
+        if bet < 1:
+            self.send_message(channel, f"{nick}: Minimum bet is 1 chip.")
+            return
+        
+        if bet > player['chips']:
+            self.send_message(channel, f"{nick}: You only have {player['chips']} chips!")
+            return
+        
+        player['bet'] = bet
+        player['chips'] -= bet
+        self.save_toke_data(nick)
+        self.send_message(channel, f"🎲 {nick}: Bet {bet} chips! Roll with !craps roll. Remaining: {player['chips']} chips")
+
+    def craps_roll(self, nick, channel, args, player):
+        """Roll the dice for the current bet"""
+        if player['bet'] == 0:
+            self.send_message(channel, f"{nick}: Place a bet first with !craps bet <amount>")
+            return
+        
+        # Roll two dice
+        die1 = self.choice(DIE_VALUES)
+        die2 = self.choice(DIE_VALUES)
+        total = die1 + die2
+        
+        dice_display = f"{DIE_FACES[die1]} {DIE_FACES[die2]}"
+        
+        if player['point'] is None:
+            # Come-out roll
+            if total in [7, 11]:
+                # Natural - win
+                winnings = player['bet'] * 2
+                player['chips'] += winnings
+                player['wins'] += 1
+                player['bet'] = 0
+                self.save_toke_data(nick)
+                self.send_message(channel, f"🎲 {nick}: {dice_display} = {total} | NATURAL! WIN! +{winnings} chips | Total: {player['chips']} 🎉")
+            elif total in [2, 3, 12]:
+                # Craps - lose
+                player['losses'] += 1
+                player['bet'] = 0
+                self.save_toke_data(nick)
+                self.send_message(channel, f"🎲 {nick}: {dice_display} = {total} | CRAPS! Lost bet. | Total: {player['chips']} 💀")
             else:
-                self.send_message(channel, f"{nick}: Unknown craps command. Use !craps for help.")
-    
+                # Point established
+                player['point'] = total
+                self.save_toke_data(nick)
+                self.send_message(channel, f"🎲 {nick}: {dice_display} = {total} | POINT SET! Roll {total} to win, 7 to lose. Roll again!")
+        else:
+            # Point is set
+            if total == player['point']:
+                # Made the point - win
+                winnings = player['bet'] * 2
+                player['chips'] += winnings
+                player['wins'] += 1
+                player['point'] = None
+                player['bet'] = 0
+                self.save_toke_data(nick)
+                self.send_message(channel, f"🎲 {nick}: {dice_display} = {total} | POINT MADE! WIN! +{winnings} chips | Total: {player['chips']} 🎉")
+            elif total == 7:
+                # Seven out - lose
+                player['losses'] += 1
+                player['point'] = None
+                player['bet'] = 0
+                self.save_toke_data(nick)
+                self.send_message(channel, f"🎲 {nick}: {dice_display} = {total} | SEVEN OUT! Lost bet. | Total: {player['chips']} 💀")
+            else:
+                # Keep rolling
+                self.send_message(channel, f"🎲 {nick}: {dice_display} = {total} | Point: {player['point']} | Keep rolling!")
+
+    def craps_cashout(self, nick, channel, args, player):
+        """Return the current bet to the player's chips"""
+        if player['bet'] > 0:
+            # Return bet to chips
+            player['chips'] += player['bet']
+            returned_bet = player['bet']
+            player['bet'] = 0
+            player['point'] = None
+            self.save_toke_data(nick)
+            self.send_message(channel, f"🎲 {nick}: Cashed out! Returned {returned_bet} chips. Total: {player['chips']} chips")
+        else:
+            self.send_message(channel, f"🎲 {nick}: No active bet to cash out. Total: {player['chips']} chips")
+
     def handle_private_command(self, parsed_msg):
         """Handle private message commands (only !bud-zone)"""
-        if not parsed_msg['message'].startswith(self.command_prefix):
+        command, raw_args = self.split_command(parsed_msg['message'])
+        if command is None:
             return
-            
-        command_parts = parsed_msg['message'][1:].split()
-        command = command_parts[0].lower()
-        args = command_parts[1:] if len(command_parts) > 1 else []
+        args = raw_args.decode('utf-8', errors='ignore').split() if raw_args else NO_ARGS
         
         nick = parsed_msg['nick']
         
@@ -1560,19 +1966,19 @@ class IRCBot:
                 if nick in self.user_timezones:
                     current_tz = self.user_timezones[nick]
                     user_dt = self.get_user_datetime(nick)
-                    self.send_message(nick, f"Your bud-zone is set to {current_tz} (currently {user_dt.strftime('%I:%M %p %Z')} 🌍🌿)")
+                    self.send_message(nick, f"Your bud-zone is set to {current_tz} (currently {format_clock(user_dt)} 🌍🌿)")
                 else:
                     self.send_message(nick, f"You haven't set a bud-zone yet! Use: !bud-zone <city state country> 🌍🌿")
             else:
                 # Set timezone based on location
                 location_str = " ".join(args)
-                timezone = self.get_timezone_from_location(args)
+                timezone = self.get_timezone_from_location(location_str)
                 
                 if timezone:
                     self.user_timezones[nick] = timezone
-                    self.save_toke_data()
+                    self.save_toke_data(nick)
                     user_dt = self.get_user_datetime(nick)
-                    self.send_message(nick, f"Bud-zone set to {location_str} ({timezone}) - currently {user_dt.strftime('%I:%M %p %Z')} 🌍🌿")
+                    self.send_message(nick, f"Bud-zone set to {location_str} ({timezone}) - currently {format_clock(user_dt)} 🌍🌿")
                     self.send_message(nick, f"Your 4:20 times will now be based on {location_str} timezone! 🕐🌿")
                 else:
                     self.send_message(nick, f"Sorry, couldn't find timezone for '{location_str}'. Try: city, state, country (e.g., 'Los Angeles CA', 'London UK', 'Tokyo Japan') 🌍🌿")
@@ -1587,32 +1993,26 @@ class IRCBot:
                 try:
                     current_time = time.time()
                     
-                    # Check each user with a timezone
-                    for user_nick, timezone_str in list(self.user_timezones.items()):
+                    # Check each user with a timezone; every user is read off the
+                    # same clock tick using the cached hourly UTC offsets
+                    for user_nick in list(self.user_timezones):
                         try:
-                            if ZoneInfo:
-                                user_tz = ZoneInfo(timezone_str)
-                            else:
-                                user_tz = pytz.timezone(timezone_str)
-                            user_datetime = datetime.now(user_tz)
-                            user_hour = user_datetime.hour
-                            user_minute = user_datetime.minute
+                            user_hour, user_minute, _ = self.get_user_clock(user_nick, current_time)
                             
-                            # Check if it's 4:20 AM or PM
-                            is_420 = (user_hour == 4 or user_hour == 16) and user_minute == 20
+                            # Check if it's 4:20 AM or PM (minute first, it rarely matches)
+                            is_420 = user_minute == 20 and user_hour % 12 == 4
                             
                             if is_420:
                                 # Check if we've already awarded for this 4:20 window
                                 if user_nick not in self.active_420_windows:
                                     # New 4:20 window - award point
-                                    if user_nick not in self.auto_420_points:
-                                        self.auto_420_points[user_nick] = 0
-                                    self.auto_420_points[user_nick] += 1
+                                    with self.toke_data_lock:
+                                        self.auto_420_points[user_nick] = self.auto_420_points.get(user_nick, 0) + 1
+                                        self.save_toke_data(user_nick)
                                     self.active_420_windows[user_nick] = current_time
-                                    self.save_toke_data()
                                     
                                     period = "AM" if user_hour == 4 else "PM"
-                                    for channel in self.channels:
+                                    for channel in self.config.channels:
                                         self.send_message(channel, f"🕐 It's 4:20 {period} in {user_nick}'s bud-zone! They get +1 point! Use !churchbong {user_nick} to get a point too! 🌿")
                             else:
                                 # Not 4:20, clear the window if it exists
@@ -1632,75 +2032,130 @@ class IRCBot:
         self.timezone_check_thread = threading.Thread(target=check_420_times, daemon=True)
         self.timezone_check_thread.start()
         self.logger.info("Started 4:20 monitoring thread")
-    
+
+    def start_welcome_sequence(self):
+        """Identify with NickServ and join channels in a background thread"""
+        def welcome_sequence():
+            # Handle NickServ registration/identification
+            if self.config.nickserv_register and not self.nickserv_registered:
+                if self.config.nickserv_password and self.config.nickserv_email:
+                    self.logger.info("Attempting to register with NickServ...")
+                    self.send_raw(f"PRIVMSG NickServ :REGISTER {self.config.nickserv_password} {self.config.nickserv_email}")
+                    self.nickserv_registered = True
+                    time.sleep(2)  # Wait for registration response
+            elif self.config.nickserv_password and not self.config.nickserv_register:
+                # Just identify if already registered
+                self.logger.info("Identifying with NickServ...")
+                self.send_raw(f"PRIVMSG NickServ :IDENTIFY {self.config.nickserv_password}")
+                time.sleep(2)  # Wait for identification
+
+            if self.connected and self.config.channels:
+                channels = self.config.channels
+                self.send_many([f"JOIN {','.join(channels[i:i + JOIN_BATCH])}"
+                                for i in range(0, len(channels), JOIN_BATCH)])
+                self.logger.info(f"Joined {', '.join(self.config.channels)}")
+
+        # The waits above must not stall the listen loop, or PINGs go unanswered
+        welcome_thread = threading.Thread(target=welcome_sequence, daemon=True)
+        welcome_thread.start()
+
+    def handle_line(self, line, received_at):
+        """Handle a single raw line (bytes) received from the server"""
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("RECV: %s", line.decode('utf-8', errors='replace'))
+        
+        # Handle PING
+        if line.startswith(b"PING"):
+            self.handle_ping(line)
+            return
+        
+        # Only the welcome numeric and command PRIVMSGs are acted on, so skip
+        # ordinary chat and server noise before doing any parsing
+        if b" PRIVMSG " in line:
+            if self.command_marker not in line:
+                return
+        elif b" 001 " not in line:
+            return
+            
+        # Parse message
+        parsed_msg = self.parse_message(line)
+        if not parsed_msg:
+            return
+            
+        # Handle successful connection
+        if parsed_msg['command'] == '001':  # Welcome message
+            self.start_welcome_sequence()
+
+        # Handle channel messages and private messages
+        elif parsed_msg['command'] == 'PRIVMSG':
+            parsed_msg['time'] = received_at
+            # Channel messages and private messages (only !bud-zone) go to the worker
+            if parsed_msg['target'].startswith('#') or parsed_msg['target'] == self.config.nickname:
+                self.command_queue.put(parsed_msg)
+                
     def listen(self):
         """Main message listening loop"""
-        buffer = ""
-        self.start_time = time.time()
+        # Raw bytes are buffered and only complete lines are handed on, so the
+        # buffer is never re-copied or re-split as partial data accumulates
+        buffer = bytearray()
+        self.start_time = time.monotonic()  # For uptime; immune to clock changes
+        self.start_toke_flusher()
+        self.start_command_worker()
+        self.start_sender()
+        if threading.current_thread() is threading.main_thread():
+            # Exit normally on SIGTERM so the loop below still disconnects and
+            # flushes toke data, however the bot was started (run() or main.py)
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
         
         # Start the 4:20 monitoring thread
         # self.start_420_monitor()  # Disabled automatic 4:20 announcements
         
-        while self.connected:
-            try:
-                data = self.socket.recv(4096).decode('utf-8', errors='ignore')
-                if not data:
-                    break
+        # Waiting on a selector with a timeout, rather than blocking in recv(),
+        # lets the loop notice a failed send or shutdown without server traffic
+        selector = selectors.DefaultSelector()
+        selector.register(self.socket, selectors.EVENT_READ)
+        try:
+            while self.connected:
+                try:
+                    if not selector.select(LISTEN_POLL_INTERVAL):
+                        continue
+                    data = self.socket.recv(self.receive_chunk)
+                    if not data:
+                        break
                     
-                buffer += data
-                lines = buffer.split('\r\n')
-                buffer = lines[-1]  # Keep incomplete line in buffer
-                
-                for line in lines[:-1]:
-                    if line:
-                        self.logger.debug(f"RECV: {line}")
-                        
-                        # Handle PING
-                        if line.startswith("PING"):
-                            self.handle_ping(line)
-                            continue
-                            
-                        # Parse message
-                        parsed_msg = self.parse_message(line)
-                        if not parsed_msg:
-                            continue
-                            
-                        # Handle successful connection
-                        if parsed_msg['command'] == '001':  # Welcome message
-                            # Handle NickServ registration/identification
-                            if self.nickserv_register and not self.nickserv_registered:
-                                if self.nickserv_password and self.nickserv_email:
-                                    self.logger.info("Attempting to register with NickServ...")
-                                    self.send_raw(f"PRIVMSG NickServ :REGISTER {self.nickserv_password} {self.nickserv_email}")
-                                    self.nickserv_registered = True
-                                    time.sleep(2)  # Wait for registration response
-                            elif self.nickserv_password and not self.nickserv_register:
-                                # Just identify if already registered
-                                self.logger.info("Identifying with NickServ...")
-                                self.send_raw(f"PRIVMSG NickServ :IDENTIFY {self.nickserv_password}")
-                                time.sleep(2)  # Wait for identification
-                            
-                            for channel in self.channels:
-                                time.sleep(1)  # Rate limiting
-                                self.join_channel(channel)
-                                
-                        # Handle channel messages and private messages
-                        elif parsed_msg['command'] == 'PRIVMSG':
-                            if parsed_msg['target'].startswith('#'):
-                                # Channel message
-                                self.handle_command(parsed_msg)
-                            elif parsed_msg['target'] == self.nickname:
-                                # Private message - handle only !bud-zone command
-                                self.handle_private_command(parsed_msg)
+                    buffer += data
+                    received_at = time.time()  # One clock read for every line in this chunk
+                    line_end = buffer.find(b'\r\n')
+                    while line_end != -1:
+                        line = bytes(buffer[:line_end])
+                        del buffer[:line_end + 2]  # Keep incomplete line in buffer
+                        if line:
+                            self.handle_line(line, received_at)
+                        line_end = buffer.find(b'\r\n')
                                 
-            except Exception as e:
-                self.logger.error(f"Error in listen loop: {e}")
-                break
+                except Exception as e:
+                    self.logger.error(f"Error in listen loop: {e}")
+                    break
                 
-        self.disconnect()
+        finally:
+            selector.close()
+            self.disconnect()
         
     def disconnect(self):
         """Disconnect from IRC server"""
+        if self.command_thread:
+            # Let queued commands finish (and reply) before the socket closes
+            self.command_queue.put(None)
+            self.command_thread.join(timeout=5)
+            self.command_thread = None
+            
+        if self.sender_thread:
+            # Flush paced replies (including the worker's last ones) before QUIT
+            sender_thread = self.sender_thread
+            self.sender_thread = None
+            self.send_queue.put(None)
+            sender_thread.join(timeout=10)
+            
         if self.socket and self.connected:
             try:
                 self.send_raw("QUIT :Bot shutting down")
@@ -1714,6 +2169,7 @@ class IRCBot:
                 pass  # Ignore errors when closing
         
         self.connected = False
+        self.flush_toke_data()
         self.logger.info("Disconnected from server")
             
     def run(self):
@@ -1722,11 +2178,9 @@ class IRCBot:
         
         if self.connect():
             try:
-                self.listen()
+                self.listen()  # Disconnects on the way out, however it exits
             except KeyboardInterrupt:
                 self.logger.info("Received interrupt signal")
-            finally:
-                self.disconnect()
         else:
             self.logger.error("Failed to connect to server")
 
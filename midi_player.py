@@ -5,7 +5,7 @@ Allows users to create, edit, and play MIDI files via IRC commands
 """
 
 import os
-import json
+import msgspec
 import threading
 import time
 import logging
@@ -249,8 +249,12 @@ class MidiManager:
         
         try:
             filepath = os.path.join(self.storage_dir, f"{username}.json")
-            with open(filepath, 'w') as f:
-                json.dump(self.compositions[username].to_dict(), f, indent=2)
+            # Serialize first so the file gets one write instead of a write per token
+            data = msgspec.json.encode(self.compositions[username].to_dict())
+            tmp_path = filepath + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, filepath)
             return True
         except Exception as e:
             self.logger.error(f"Failed to save composition for {username}: {e}")
@@ -260,8 +264,8 @@ class MidiManager:
         """Load user's composition from file"""
         try:
             filepath = os.path.join(self.storage_dir, f"{username}.json")
-            with open(filepath, 'r') as f:
-                data = json.load(f)
+            with open(filepath, 'rb') as f:
+                data = msgspec.json.decode(f.read())
             self.compositions[username] = MidiComposition.from_dict(data)
             return True
         except Exception as e:
@@ -54,16 +54,16 @@ except ImportError as e:
     print(f"✗ datetime: {e}")
 
 try:
-    import pytz
-    print("✓ pytz")
+    import msgspec
+    print("✓ msgspec")
 except ImportError as e:
-    print(f"✗ pytz: {e}")
+    print(f"✗ msgspec: {e}")
 
 try:
     from zoneinfo import ZoneInfo
     print("✓ zoneinfo (Python 3.9+)")
-except ImportError:
-    print("⚠ zoneinfo (not available - using pytz fallback)")
+except ImportError as e:
+    print(f"✗ zoneinfo: {e}")
 
 try:
     import base64
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test script to verify !bud-zone location lookups resolve to the right timezone
+"""
+
+import sys
+
+import ircbot
+from ircbot import IRCBot
+
+# (location as typed after !bud-zone, expected timezone)
+LOCATION_CASES = (
+    ("tokyo", "Asia/Tokyo"),
+    ("new york, ny", "America/New_York"),
+    ("san fran", "America/Los_Angeles"),
+    ("york", "America/New_York"),
+    ("angeles", "America/Los_Angeles"),
+    ("Vancouver, BC", "America/Vancouver"),
+    ("Montreal, QC", "America/Montreal"),
+    ("Calgary, AB", "America/Calgary"),
+    ("Manchester, England", "Europe/London"),
+    ("Washington, D.C.", "America/New_York"),
+    ("Perth, Australia", "Australia/Perth"),
+    ("Melbourne, Australia", "Australia/Melbourne"),
+    ("London, Ontario", "America/Toronto"),
+    ("St. Louis, MO", "America/Chicago"),
+    ("Aurora, CO", "America/Denver"),
+    ("Los Angeles/CA", "America/Los_Angeles"),
+    (" , ", None),
+)
+
+
+# The pyahocorasick automaton and the n-gram fallback must agree
+MATCHERS = (("automaton", ircbot.TIMEZONE_AUTOMATON), ("n-gram", None))
+
+
+def lookup(location, automaton):
+    """Resolve a location the way !bud-zone does, bypassing the memo cache"""
+    bot = IRCBot.__new__(IRCBot)
+    saved = ircbot.TIMEZONE_AUTOMATON
+    ircbot.TIMEZONE_AUTOMATON = automaton
+    try:
+        ircbot.resolve_location.cache_clear()
+        return bot.get_timezone_from_location(" ".join(location.split()))
+    finally:
+        ircbot.TIMEZONE_AUTOMATON = saved
+        ircbot.resolve_location.cache_clear()
+
+
+def test_locations():
+    for matcher, automaton in MATCHERS:
+        for location, expected in LOCATION_CASES:
+            result = lookup(location, automaton)
+            assert result == expected, (matcher, location, result, expected)
+
+
+if __name__ == "__main__":
+    print("Testing location lookups...")
+    failures = 0
+    for matcher, automaton in MATCHERS:
+        if matcher == "automaton" and automaton is None:
+            print("(pyahocorasick not installed, automaton path skipped)")
+            continue
+        for location, expected in LOCATION_CASES:
+            result = lookup(location, automaton)
+            if result == expected:
+                print(f"✓ [{matcher}] {location!r} -> {result}")
+            else:
+                failures += 1
+                print(f"✗ [{matcher}] {location!r} -> {result} (expected {expected})")
+    print(f"\nAll tests complete! {failures} failure(s)")
+    sys.exit(1 if failures else 0)
@@ -5,7 +5,7 @@ Runs alongside the IRC bot to keep the Repl alive
 """
 from http.server import HTTPServer, BaseHTTPRequestHandler
 import threading
-import json
+import msgspec
 from datetime import datetime
 
 class PingHandler(BaseHTTPRequestHandler):
@@ -26,7 +26,7 @@ class PingHandler(BaseHTTPRequestHandler):
                 'message': 'IRC Bot is running! 🌿'
             }
             
-            self.wfile.write(json.dumps(status, indent=2).encode())
+            self.wfile.write(msgspec.json.format(msgspec.json.encode(status), indent=2))
             
         elif self.path == '/ping':
             # Simple ping endpoint
@@ -46,7 +46,7 @@ class PingHandler(BaseHTTPRequestHandler):
                 'timestamp': datetime.utcnow().isoformat()
             }
             
-            self.wfile.write(json.dumps(health).encode())
+            self.wfile.write(msgspec.json.encode(health))
             
         else:
             # 404 for other paths